@@ -1,23 +1,189 @@
 # a2a_bus.py
 # Simple in-process A2A message bus for agents.
+# mode="sync" runs handlers inline on the publisher's thread (default, used by tests/CLI);
+# mode="async" queues messages per topic and dispatches them from a worker thread pool.
+import time
+import threading
 from typing import Callable, Dict, Any
-from collections import defaultdict
+from collections import defaultdict, deque
 from threading import Lock
 
+from utils import logger
+from instrumentation import metrics
+
+BACKPRESSURE_POLICIES = ("block", "drop_oldest", "drop_new")
+
+
+class _HandlerStats:
+    __slots__ = ("topic", "label", "calls", "errors", "total_time", "max_time")
+
+    def __init__(self, topic: str, label: str):
+        self.topic = topic
+        self.label = label  # display only: lambdas and same-named methods share a qualname
+        self.calls = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+
 class A2ABus:
-    def __init__(self):
+    def __init__(self, mode: str = "sync", workers: int = 4, queue_size: int = 1000,
+                 backpressure: str = "block", block_timeout: float = None):
+        if mode not in ("sync", "async"):
+            raise ValueError(f"Unknown bus mode: {mode}")
+        if backpressure not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"Unknown backpressure policy: {backpressure}")
         self._subs = defaultdict(list)
         self._lock = Lock()
+        self.mode = mode
+        self.queue_size = queue_size
+        self.backpressure = backpressure
+        self.block_timeout = block_timeout
+        self._priorities: Dict[str, int] = {}
+        self._queues: Dict[str, deque] = {}
+        self._order = []  # topics sorted by priority, highest first
+        self._cond = threading.Condition(self._lock)
+        self._in_flight = 0
+        self._closed = False
+        # keyed by (topic, id(handler)); the subscription list keeps the handler alive
+        self._handler_stats: Dict[tuple, _HandlerStats] = {}
+        self._topic_stats = defaultdict(lambda: {"published": 0, "dropped": 0})
+        self._workers = []
+        if mode == "async":
+            for i in range(workers):
+                t = threading.Thread(target=self._worker, name=f"a2a-worker-{i}", daemon=True)
+                t.start()
+                self._workers.append(t)
 
     def subscribe(self, topic: str, handler: Callable[[Dict[str,Any]], None]):
         with self._lock:
             self._subs[topic].append(handler)
 
-    def publish(self, topic: str, message: Dict[str,Any]):
-        handlers = list(self._subs.get(topic, []))
-        for h in handlers:
+    def set_priority(self, topic: str, priority: int):
+        """Higher priority topics are dispatched first in async mode (default 0)."""
+        with self._lock:
+            self._priorities[topic] = priority
+            self._reorder()
+
+    def _reorder(self):
+        self._order = sorted(self._queues, key=lambda t: -self._priorities.get(t, 0))
+
+    def publish(self, topic: str, message: Dict[str,Any]) -> bool:
+        """
+        Deliver message to topic subscribers. In async mode returns False when the
+        message was dropped by the backpressure policy.
+        """
+        with self._lock:
+            handlers = list(self._subs.get(topic, []))
+            self._topic_stats[topic]["published"] += 1
+        if not handlers:
+            return True
+        with metrics.span("bus.publish", topic=topic, mode=self.mode):
+            if self.mode == "sync":
+                for h in handlers:
+                    self._call(topic, h, message)
+                return True
+            return self._enqueue(topic, message)
+
+    def _enqueue(self, topic: str, message: Dict[str, Any]) -> bool:
+        with self._cond:
+            q = self._queues.get(topic)
+            if q is None:
+                q = self._queues[topic] = deque()
+                self._reorder()
+            if len(q) >= self.queue_size:
+                if self.backpressure == "drop_new":
+                    self._topic_stats[topic]["dropped"] += 1
+                    return False
+                if self.backpressure == "drop_oldest":
+                    q.popleft()
+                    self._topic_stats[topic]["dropped"] += 1
+                else:
+                    ok = self._cond.wait_for(lambda: len(q) < self.queue_size or self._closed, self.block_timeout)
+                    if not ok or self._closed:
+                        self._topic_stats[topic]["dropped"] += 1
+                        return False
+            q.append(message)
+            self._cond.notify_all()
+        return True
+
+    def _next(self):
+        for topic in self._order:
+            q = self._queues[topic]
+            if q:
+                return topic, q.popleft()
+        return None
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                item = self._next()
+                while item is None:
+                    if self._closed:
+                        return
+                    self._cond.wait()
+                    item = self._next()
+                self._in_flight += 1
+                # a slot was freed for blocked publishers
+                self._cond.notify_all()
+                handlers = list(self._subs.get(item[0], []))
             try:
-                h(message)
-            except Exception as e:
-                # handlers should handle their own exceptions
-                print(f"A2A handler error: {e}")
+                for h in handlers:
+                    self._call(item[0], h, item[1])
+            finally:
+                with self._cond:
+                    self._in_flight -= 1
+                    self._cond.notify_all()
+
+    def _call(self, topic: str, handler: Callable, message: Dict[str, Any]):
+        name = getattr(handler, "__qualname__", repr(handler))
+        start = time.perf_counter()
+        error = False
+        try:
+            handler(message)
+        except Exception:
+            # handlers should handle their own exceptions
+            error = True
+            logger.exception("A2A handler %s failed", name)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            st = self._handler_stats.get((topic, id(handler)))
+            if st is None:
+                st = self._handler_stats[(topic, id(handler))] = _HandlerStats(topic, name)
+            st.calls += 1
+            st.errors += error
+            st.total_time += elapsed
+            st.max_time = max(st.max_time, elapsed)
+
+    def drain(self, timeout: float = None) -> bool:
+        """Wait until every queued message has been handled (async mode)."""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: self._in_flight == 0 and not any(self._queues.values()), timeout)
+
+    def close(self, timeout: float = 5.0):
+        if self.mode == "async":
+            self.drain(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        for t in self._workers:
+            t.join(timeout=1)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "queued": {t: len(q) for t, q in self._queues.items()},
+                "topics": {t: dict(s) for t, s in self._topic_stats.items()},
+                "handlers": [
+                    {
+                        "topic": s.topic,
+                        "handler": s.label,
+                        "calls": s.calls,
+                        "errors": s.errors,
+                        "avg_ms": round(s.total_time / s.calls * 1000, 3) if s.calls else 0.0,
+                        "max_ms": round(s.max_time * 1000, 3),
+                    } for s in self._handler_stats.values()
+                ],
+            }
@@ -0,0 +1,291 @@
+# analytics.py
+# Cohort analytics over stored interviews: score distribution per question and difficulty,
+# weakest topics per domain and question discrimination.
+#
+# Interactions are streamed from SQLiteStore session by session (iter_session_interactions)
+# in chunks of chunk_size rows. Each chunk becomes NumPy columns (question code, session code,
+# score) and is folded into two per-question arrays with bincount group-bys:
+#   hist     (questions x 11)  answer counts per score 0..10
+#   moments  (questions x 6)   n, Σx, Σx², Σr, Σr², Σxr of (item score x, rest score r)
+# where r is the mean score of the session's other answers; discrimination is corr(x, r).
+# Difficulty, domain and topic come from the question bank and are rolled up from the
+# per-question histograms when a report is built. Memory is bounded by the chunk size plus
+# the number of distinct questions, however many interactions are stored.
+#
+# refresh() is incremental from a high-water mark (the last interaction id folded in): a
+# session with new rows has its previous contribution subtracted and is added back whole,
+# so every aggregate stays exact. save_state()/load_state() keep this between runs.
+# Rows rewritten in place (tools/rescore.py, full session rewrites) need refresh(full=True).
+import csv
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except Exception:
+    NUMPY_AVAILABLE = False
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+    PYARROW_AVAILABLE = True
+except Exception:
+    PYARROW_AVAILABLE = False
+
+SCORES = 11  # 0..10
+N, SX, SXX, SR, SRR, SXR = range(6)
+
+
+def load_question_meta(question_bank_path: Path) -> Dict[str, Tuple[str, str, str]]:
+    """question id -> (domain, difficulty, topic) for a JSON or compact bank; topic defaults to the id."""
+    from compact_bank import CompactBank, is_compact_bank
+    from interviewer_agent import QuestionIndex
+
+    compact = is_compact_bank(question_bank_path)
+    if compact:
+        index = CompactBank(question_bank_path, cache_size=0)
+    else:
+        with open(question_bank_path, "r", encoding="utf-8") as f:
+            index = QuestionIndex(json.load(f))
+    iter_bucket = index.iter_bucket if compact else index.bucket
+    meta = {}
+    for domain, levels in index.difficulties.items():
+        for difficulty in levels:
+            for q in iter_bucket(domain, difficulty):
+                qid = q.get("id")
+                if qid is not None:
+                    meta.setdefault(qid, (domain, difficulty, q.get("topic") or qid))
+    if compact:
+        index.close()
+    return meta
+
+
+def _grow(arr, rows: int):
+    if rows <= arr.shape[0]:
+        return arr
+    out = np.zeros((max(rows, 2 * arr.shape[0]),) + arr.shape[1:], dtype=arr.dtype)
+    out[:arr.shape[0]] = arr
+    return out
+
+
+def _score_stats(hist) -> Dict[str, Any]:
+    """n, mean, std and median of score histograms (rows of 11 counts)."""
+    values = np.arange(SCORES, dtype=np.float64)
+    n = hist.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = hist @ values / n
+        var = hist @ (values ** 2) / n - mean ** 2
+        cum = np.cumsum(hist, axis=1)
+        median = np.argmax(cum >= (n[:, None] / 2.0), axis=1).astype(np.float64)
+    median[n == 0] = np.nan
+    return {"n": n, "mean": mean, "std": np.sqrt(np.maximum(var, 0.0)), "median": median}
+
+
+def _num(x, digits: int = 3):
+    return None if x is None or not np.isfinite(x) else round(float(x), digits)
+
+
+class CohortAnalytics:
+    """
+    Incrementally maintained cohort aggregates over one SQLiteStore.
+    question_meta (see load_question_meta) labels questions with domain, difficulty and topic.
+    """
+
+    def __init__(self, store, question_meta: Dict[str, Tuple[str, str, str]] = None):
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("Cohort analytics needs NumPy (pip install numpy)")
+        self.store = store
+        self.question_meta = question_meta or {}
+        self._reset()
+
+    def _reset(self):
+        self.high_water = 0
+        self.qids: List[str] = []
+        self.q_domain: List[str] = []  # session domain the question was first seen in (bank fallback)
+        self._codes: Dict[str, int] = {}
+        self.hist = np.zeros((0, SCORES), dtype=np.float64)
+        self.moments = np.zeros((0, 6), dtype=np.float64)
+
+    # ------------------------------
+    # folding rows in
+    # ------------------------------
+    def _code(self, qid: str, domain: str) -> int:
+        code = self._codes.get(qid)
+        if code is None:
+            code = self._codes[qid] = len(self.qids)
+            self.qids.append(qid)
+            self.q_domain.append(domain or "unknown")
+        return code
+
+    def _accumulate(self, rows: List[tuple], sign: float):
+        """Add (sign=1) or remove (sign=-1) the contribution of complete sessions' rows."""
+        if not rows:
+            return
+        q = np.fromiter((self._code(r[3] or "unknown", r[5]) for r in rows), dtype=np.int64, count=len(rows))
+        x = np.clip(np.fromiter((r[4] for r in rows), dtype=np.float64, count=len(rows)), 0, SCORES - 1)
+        # rows arrive grouped by session: a session code is the number of boundaries so far
+        sids = [r[1] for r in rows]
+        s = np.zeros(len(rows), dtype=np.int64)
+        s[1:] = np.cumsum([a != b for a, b in zip(sids[1:], sids[:-1])])
+        n_s = np.bincount(s)[s]
+        total = np.bincount(s, weights=x)[s]
+        eligible = n_s > 1  # a lone answer has no rest score
+        rest = np.where(eligible, (total - x) / np.maximum(n_s - 1, 1), 0.0)
+        w = eligible * sign
+
+        qn = len(self.qids)
+        self.hist = _grow(self.hist, qn)
+        self.moments = _grow(self.moments, qn)
+        self.hist[:qn] += sign * np.bincount(q * SCORES + x.astype(np.int64),
+                                             minlength=qn * SCORES).reshape(qn, SCORES)
+        for col, values in ((N, w), (SX, w * x), (SXX, w * x * x), (SR, w * rest),
+                            (SRR, w * rest * rest), (SXR, w * x * rest)):
+            self.moments[:qn, col] += np.bincount(q, weights=values, minlength=qn)
+
+    def _sessions(self, after_id: int, upto_id: int, chunk_size: int) -> Iterator[List[tuple]]:
+        """Batches of whole sessions: a session cut by a chunk boundary waits for its remaining rows."""
+        carry: List[tuple] = []
+        for chunk in self.store.iter_session_interactions(chunk_size, after_id, upto_id):
+            buf = carry + chunk
+            split = len(buf)
+            while split > 0 and buf[split - 1][1] == buf[-1][1]:
+                split -= 1
+            if split:
+                yield buf[:split]
+            carry = buf[split:]
+        if carry:
+            yield carry
+
+    def refresh(self, chunk_size: int = 50000, full: bool = False) -> Dict[str, Any]:
+        """Fold in interactions stored since the last refresh (everything with full=True)."""
+        start = time.perf_counter()
+        if full:
+            self._reset()
+        after, upto = self.high_water, self.store.max_interaction_id()
+        stats = {"rows": 0, "sessions": 0, "replaced_rows": 0}
+        if upto > after:
+            for batch in self._sessions(after, upto, chunk_size):
+                # rows folded in by an earlier refresh: take their session's old contribution out
+                old = [r for r in batch if r[0] <= after]
+                self._accumulate(old, -1.0)
+                self._accumulate(batch, 1.0)
+                stats["rows"] += len(batch)
+                stats["replaced_rows"] += len(old)
+                stats["sessions"] += len({r[1] for r in batch})
+        self.high_water = upto
+        stats.update(high_water=upto, questions=len(self.qids), seconds=round(time.perf_counter() - start, 3))
+        return stats
+
+    # ------------------------------
+    # reports
+    # ------------------------------
+    def _labels(self) -> List[Tuple[str, str, str]]:
+        return [self.question_meta.get(qid) or (self.q_domain[i], "unknown", qid) for i, qid in enumerate(self.qids)]
+
+    def question_stats(self) -> List[Dict[str, Any]]:
+        """Per question: counts per score, mean/std/median, and discrimination (item-rest correlation)."""
+        qn = len(self.qids)
+        hist, m = self.hist[:qn], self.moments[:qn]
+        st = _score_stats(hist)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            n = m[:, N]
+            cov = m[:, SXR] / n - (m[:, SX] / n) * (m[:, SR] / n)
+            var_x = m[:, SXX] / n - (m[:, SX] / n) ** 2
+            var_r = m[:, SRR] / n - (m[:, SR] / n) ** 2
+            disc = cov / np.sqrt(var_x * var_r)
+        disc[(n < 3) | ~(var_x > 1e-12) | ~(var_r > 1e-12)] = np.nan
+        out = []
+        for i, (domain, difficulty, topic) in enumerate(self._labels()):
+            row = {"question_id": self.qids[i], "domain": domain, "difficulty": difficulty, "topic": topic,
+                   "n": int(round(st["n"][i])), "mean": _num(st["mean"][i]), "std": _num(st["std"][i]),
+                   "median": _num(st["median"][i]), "discrimination": _num(disc[i]),
+                   "discrimination_n": int(round(n[i]))}
+            row.update({f"score_{k}": int(round(hist[i, k])) for k in range(SCORES)})
+            out.append(row)
+        return out
+
+    def _rollup(self, keys: List[tuple]) -> Tuple[List[tuple], Any]:
+        """Sum per-question histograms into groups: (group keys, group histograms)."""
+        codes: Dict[tuple, int] = {}
+        group = np.fromiter((codes.setdefault(k, len(codes)) for k in keys), dtype=np.int64, count=len(keys))
+        out = np.zeros((len(codes), SCORES))
+        np.add.at(out, group, self.hist[:len(keys)])
+        return list(codes), out
+
+    def difficulty_stats(self) -> List[Dict[str, Any]]:
+        """Score distribution per (domain, difficulty)."""
+        keys, hist = self._rollup([(d, lvl) for d, lvl, _ in self._labels()])
+        st = _score_stats(hist)
+        out = []
+        for i, (domain, difficulty) in enumerate(keys):
+            row = {"domain": domain, "difficulty": difficulty, "n": int(round(st["n"][i])),
+                   "mean": _num(st["mean"][i]), "std": _num(st["std"][i]), "median": _num(st["median"][i])}
+            row.update({f"score_{k}": int(round(hist[i, k])) for k in range(SCORES)})
+            out.append(row)
+        return sorted(out, key=lambda r: (r["domain"], r["difficulty"]))
+
+    def topic_stats(self, min_answers: int = 1) -> List[Dict[str, Any]]:
+        """Mean score per (domain, topic), weakest first within each domain."""
+        keys, hist = self._rollup([(d, t) for d, _, t in self._labels()])
+        st = _score_stats(hist)
+        out = [{"domain": domain, "topic": topic, "n": int(round(st["n"][i])),
+                "mean": _num(st["mean"][i]), "std": _num(st["std"][i])}
+               for i, (domain, topic) in enumerate(keys) if st["n"][i] >= max(min_answers, 1)]
+        return sorted(out, key=lambda r: (r["domain"], r["mean"], -r["n"]))
+
+    def weakest_topics(self, top: int = 3, min_answers: int = 5) -> Dict[str, List[Dict[str, Any]]]:
+        out: Dict[str, List[Dict[str, Any]]] = {}
+        for row in self.topic_stats(min_answers):
+            weakest = out.setdefault(row["domain"], [])
+            if len(weakest) < top:
+                weakest.append(row)
+        return out
+
+    # ------------------------------
+    # state and export
+    # ------------------------------
+    def save_state(self, path: Path):
+        path = Path(path)
+        meta = {"version": 1, "high_water": self.high_water, "qids": self.qids, "q_domain": self.q_domain}
+        tmp = path.with_name(path.name + ".tmp.npz")
+        qn = len(self.qids)
+        np.savez(tmp, meta=np.array(json.dumps(meta)), hist=self.hist[:qn], moments=self.moments[:qn])
+        tmp.replace(path)
+
+    @classmethod
+    def load_state(cls, store, path: Path, question_meta: Dict[str, Tuple[str, str, str]] = None) -> "CohortAnalytics":
+        """Analytics resumed from save_state(); a fresh one when the file does not exist."""
+        analytics = cls(store, question_meta)
+        if Path(path).exists():
+            with np.load(path, allow_pickle=False) as data:
+                meta = json.loads(str(data["meta"]))
+                analytics.hist = data["hist"].copy()
+                analytics.moments = data["moments"].copy()
+            analytics.high_water = meta["high_water"]
+            analytics.qids = meta["qids"]
+            analytics.q_domain = meta["q_domain"]
+            analytics._codes = {qid: i for i, qid in enumerate(analytics.qids)}
+        return analytics
+
+    def export(self, out_dir: Path, fmt: str = "csv", min_answers: int = 1) -> Dict[str, str]:
+        """Write question_stats, difficulty_stats and topic_stats as flat csv or parquet files."""
+        if fmt == "parquet" and not PYARROW_AVAILABLE:
+            raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow); use csv")
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        written = {}
+        for name, rows in (("question_stats", self.question_stats()), ("difficulty_stats", self.difficulty_stats()),
+                           ("topic_stats", self.topic_stats(min_answers))):
+            path = out_dir / f"{name}.{fmt}"
+            if fmt == "parquet":
+                pyarrow.parquet.write_table(pyarrow.Table.from_pylist(rows), path)
+            else:
+                with open(path, "w", newline="", encoding="utf-8") as f:
+                    writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else ["empty"])
+                    writer.writeheader()
+                    writer.writerows(rows)
+            written[name] = str(path)
+        return written
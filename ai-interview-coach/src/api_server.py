@@ -0,0 +1,250 @@
+# api_server.py
+# HTTP/JSON API over OrchestratorAgent as a plain ASGI application (no web framework needed).
+#
+#   POST /sessions                      {"user_id", "domain"}            -> {"session_id"}
+#   POST /sessions/{id}/next            {"difficulty"?, "time_limit"?}   -> {"id", "q", "difficulty", "time_remaining"}
+#   POST /sessions/{id}/answer          {"answer"}                       -> {"score", "feedback", "suggestions"}
+#   POST /sessions/{id}/finish                                           -> session summary
+#   POST /bank/reload                                                    -> {"reloaded"}
+#   GET  /stats, GET /health
+#
+# Run with any ASGI server (uvicorn api_server:app) or the small built-in one:
+#   cd src && python -m api_server --port 8000
+# Answers are graded on the event loop (OrchestratorAgent.asubmit_answer), so thousands of
+# gradings can be in flight; storage goes through the pooled, write-behind SQLite store.
+# Several worker processes (e.g. uvicorn --workers 4) can share sessions with
+# SESSION_BACKEND=sqlite or redis (see session_backend.py).
+import os
+import json
+import asyncio
+import argparse
+from pathlib import Path
+from typing import Any, Callable, Dict, Tuple
+
+from orchestrator_agent import OrchestratorAgent
+from session_backend import SessionConflict
+from utils import logger
+
+DEFAULT_BANK = Path(__file__).resolve().parent / "tools" / "question_bank.json"
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+# orchestrator errors are RuntimeErrors carrying these messages
+_ERROR_STATUS = {"Session not found": 404, "No current question": 409, "No questions available": 409}
+
+
+class APIServer:
+    """ASGI callable; the orchestrator is created on first use unless one is passed in."""
+
+    def __init__(self, orchestrator: OrchestratorAgent = None, question_bank_path: Path = None):
+        self._orch = orchestrator
+        self.question_bank_path = question_bank_path or Path(os.getenv("QUESTION_BANK_PATH", str(DEFAULT_BANK)))
+
+    @property
+    def orch(self) -> OrchestratorAgent:
+        if self._orch is None:
+            self._orch = OrchestratorAgent(self.question_bank_path)
+        return self._orch
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self._lifespan(receive, send)
+        if scope["type"] != "http":
+            return
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        try:
+            status, payload = 200, await self._route(scope["method"], scope["path"], body)
+        except HTTPError as e:
+            status, payload = e.status, {"error": str(e)}
+        except SessionConflict as e:
+            # other workers kept changing the session; the client may retry
+            status, payload = 409, {"error": str(e)}
+        except RuntimeError as e:
+            status, payload = _ERROR_STATUS.get(str(e), 500), {"error": str(e)}
+        except Exception as e:
+            logger.exception("API request %s %s failed", scope["method"], scope["path"])
+            status, payload = 500, {"error": str(e)}
+        data = json.dumps(payload).encode("utf-8")
+        await send({"type": "http.response.start", "status": status,
+                    "headers": [(b"content-type", b"application/json"),
+                                (b"content-length", str(len(data)).encode())]})
+        await send({"type": "http.response.body", "body": data})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                _ = self.orch
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if self._orch is not None:
+                    await asyncio.to_thread(self._orch.memory.flush)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    @staticmethod
+    def _json(body: bytes) -> Dict[str, Any]:
+        if not body:
+            return {}
+        try:
+            data = json.loads(body)
+        except ValueError:
+            raise HTTPError(400, "Request body is not valid JSON")
+        if not isinstance(data, dict):
+            raise HTTPError(400, "Request body must be a JSON object")
+        return data
+
+    async def _route(self, method: str, path: str, body: bytes) -> Dict[str, Any]:
+        parts = [p for p in path.split("/") if p]
+        if parts == ["health"]:
+            return {"status": "ok"}
+        if parts == ["stats"]:
+            stats = await asyncio.to_thread(self.orch.stats)
+            return json.loads(json.dumps(stats, default=str))
+        if method != "POST":
+            raise HTTPError(405, "Method not allowed")
+        data = self._json(body)
+        if parts == ["bank", "reload"]:
+            # the new bank is built on a worker thread; requests keep using the old one meanwhile
+            return {"reloaded": await asyncio.to_thread(self.orch.reload_bank)}
+        if parts == ["sessions"]:
+            if not data.get("user_id"):
+                raise HTTPError(400, "user_id is required")
+            sid = await asyncio.to_thread(self.orch.start_session, data["user_id"], data.get("domain", "java"))
+            return {"session_id": sid}
+        if len(parts) == 3 and parts[0] == "sessions":
+            return await self._session_action(parts[1], parts[2], data)
+        raise HTTPError(404, "Not found")
+
+    async def _session_action(self, sid: str, action: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        orch = self.orch
+        if action == "next":
+            # session backend loads and compare-and-set saves block: run them on a worker thread
+            return await asyncio.to_thread(self._next, sid, data)
+        if action == "answer":
+            if not isinstance(data.get("answer"), str):
+                raise HTTPError(400, "answer must be a string")
+            return await orch.asubmit_answer(sid, data["answer"])
+        if action == "finish":
+            # persisting waits for the write-behind queue: keep it off the event loop
+            return await asyncio.to_thread(orch.finish_session, sid)
+        raise HTTPError(404, "Not found")
+
+    def _next(self, sid: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        orch = self.orch
+        # no difficulty: adaptive, from the candidate's skill estimate
+        q = orch.ask_next(sid, data.get("difficulty"), data.get("time_limit"))
+        # never send the reference answer to the client
+        return {"id": q.get("id"), "q": q.get("q"), "difficulty": orch.current_difficulty(sid),
+                "time_remaining": orch.time_remaining(sid)}
+
+
+app = APIServer()
+
+
+# ------------------------------
+# Minimal HTTP/1.1 server for ASGI apps (keep-alive, Content-Length bodies only)
+# ------------------------------
+async def _read_request(reader: asyncio.StreamReader) -> Tuple[str, str, Dict[str, str], bytes]:
+    line = await reader.readline()
+    if not line:
+        raise EOFError
+    method, target, _ = line.decode("latin-1").split(" ", 2)
+    headers = {}
+    while True:
+        h = await reader.readline()
+        if h in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = h.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers.get("content-length", 0) or 0))
+    return method, target, headers, body
+
+
+async def _handle_connection(asgi_app, reader, writer):
+    try:
+        while True:
+            try:
+                method, target, headers, body = await _read_request(reader)
+            except (EOFError, asyncio.IncompleteReadError, ConnectionError, ValueError):
+                break
+            path, _, query = target.partition("?")
+            scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+                     "path": path, "query_string": query.encode(), "headers": [
+                         (k.encode(), v.encode()) for k, v in headers.items()]}
+            sent_body = False
+
+            async def receive():
+                nonlocal sent_body
+                if sent_body:
+                    return {"type": "http.disconnect"}
+                sent_body = True
+                return {"type": "http.request", "body": body, "more_body": False}
+
+            out = []
+
+            async def send(message):
+                if message["type"] == "http.response.start":
+                    out.append(f"HTTP/1.1 {message['status']} X\r\n".encode())
+                    for k, v in message.get("headers", []):
+                        out.append(k + b": " + v + b"\r\n")
+                    out.append(b"\r\n")
+                elif message["type"] == "http.response.body":
+                    out.append(message.get("body", b""))
+
+            await asgi_app(scope, receive, send)
+            writer.write(b"".join(out))
+            await writer.drain()
+            if headers.get("connection", "").lower() == "close":
+                break
+    finally:
+        writer.close()
+
+
+async def serve(asgi_app, host: str = "127.0.0.1", port: int = 8000, on_ready: Callable[[int], None] = None):
+    """Serve asgi_app until cancelled (runs its lifespan startup/shutdown around it); port=0 picks a free port."""
+    lifespan_events = asyncio.Queue()
+    await lifespan_events.put({"type": "lifespan.startup"})
+
+    async def lifespan_send(message):
+        pass
+
+    # run the startup half of the lifespan protocol, keep the shutdown for later
+    lifespan = asyncio.ensure_future(asgi_app({"type": "lifespan"}, lifespan_events.get, lifespan_send))
+    server = await asyncio.start_server(lambda r, w: _handle_connection(asgi_app, r, w), host, port,
+                                        backlog=4096)
+    bound = server.sockets[0].getsockname()[1]
+    logger.info("API server listening on http://%s:%d", host, bound)
+    if on_ready is not None:
+        on_ready(bound)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await lifespan_events.put({"type": "lifespan.shutdown"})
+        await lifespan
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Serve the interview orchestrator over HTTP/JSON.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8000)
+    args = ap.parse_args()
+    try:
+        asyncio.run(serve(app, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
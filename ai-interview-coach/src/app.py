@@ -1,5 +1,7 @@
-# app.py — FINAL VERSION (LIVE AUT0-REFRESH TIMER + AUTO-TIMEOUT + NO VOICE)
+# app.py — FINAL VERSION (SERVER-SIDE TIMER + CLIENT COUNTDOWN + AUTO-TIMEOUT + NO VOICE)
+import os
 import streamlit as st
+import streamlit.components.v1 as components
 from pathlib import Path
 from streamlit_autorefresh import st_autorefresh
 
@@ -11,11 +13,17 @@ from orchestrator_agent import OrchestratorAgent
 st.set_page_config(page_title="AI Interview Coach — Final", layout="wide")
 
 # ------------------------------------
-# LOAD ORCHESTRATOR (SINGLETON)
+# LOAD ORCHESTRATOR (ONE PER PROCESS)
 # ------------------------------------
-if "orch" not in st.session_state:
-    st.session_state["orch"] = OrchestratorAgent(Path("tools/question_bank.json"))
-orch = st.session_state["orch"]
+@st.cache_resource
+def get_orchestrator() -> OrchestratorAgent:
+    # shared by every browser session: the bank, indexes, evaluator and stores are built
+    # once; per-user state lives in the orchestrator's session map and st.session_state.
+    # QUESTION_BANK_PATH may point at a compact bank (tools/build_compact_bank.py)
+    return OrchestratorAgent(Path(os.getenv("QUESTION_BANK_PATH", "tools/question_bank.json")))
+
+
+orch = get_orchestrator()
 
 # ------------------------------------
 # SESSION STATE DEFAULTS
@@ -24,14 +32,13 @@ defaults = {
     "session_id": None,
     "current_q": None,
     "flow_index": 0,
-    "difficulty_flow": ["easy", "medium", "hard"],
+    # questions per interview; difficulty adapts to the candidate's skill estimate
+    "num_questions": 3,
     "last_evaluation": None,
     "username": "student1",
     "domain": "java",
     "session_summary": None,
-    "timer": 20,
-    "timer_expired": False,
-    "timer_running": False,  # NEW FLAG
+    "time_limit": 20,
 }
 for k, v in defaults.items():
     if k not in st.session_state:
@@ -41,7 +48,7 @@ for k, v in defaults.items():
 # HEADER
 # ------------------------------------
 st.title("Multi-Agent Interview Coach")
-st.write("Timer is LIVE and auto-submits when it reaches 0.")
+st.write("Each question is timed and auto-submits when the timer reaches 0.")
 
 # ------------------------------------
 # SIDEBAR
@@ -61,9 +68,6 @@ with st.sidebar:
         st.session_state["current_q"] = None
         st.session_state["last_evaluation"] = None
         st.session_state["session_summary"] = None
-        st.session_state["timer"] = 20
-        st.session_state["timer_expired"] = False
-        st.session_state["timer_running"] = False
         st.success(f"Session started for {st.session_state['username']}")
         st.rerun()
 
@@ -75,7 +79,6 @@ with st.sidebar:
             st.session_state["current_q"] = None
             st.session_state["flow_index"] = 0
             st.session_state["last_evaluation"] = None
-            st.session_state["timer_running"] = False
             st.success("Session finished — summary below.")
 
 st.markdown("---")
@@ -95,61 +98,42 @@ with col_main:
 
         # Load next question if needed
         if st.session_state["current_q"] is None:
-            if st.session_state["flow_index"] < len(st.session_state["difficulty_flow"]):
-                difficulty = st.session_state["difficulty_flow"][st.session_state["flow_index"]]
-                q = orch.ask_next(st.session_state["session_id"], difficulty)
+            if st.session_state["flow_index"] < st.session_state["num_questions"]:
+                q = orch.ask_next(st.session_state["session_id"], time_limit=st.session_state["time_limit"])
                 st.session_state["current_q"] = q
-                st.session_state["timer"] = 20
-                st.session_state["timer_running"] = True
-                st.session_state["timer_expired"] = False
             else:
                 st.info("Questions completed. Click Finish Session.")
                 st.stop()
 
         q = st.session_state["current_q"]
-        difficulty = st.session_state["difficulty_flow"][st.session_state["flow_index"]]
+        difficulty = orch.current_difficulty(st.session_state["session_id"]) or "medium"
 
         # Difficulty badge
         colors = {"easy": "#4CAF50", "medium": "#FFC107", "hard": "#F44336"}
         icons = {"easy": "🟢 EASY", "medium": "🟡 MEDIUM", "hard": "🔴 HARD"}
         st.markdown(
-            f"<span style='background:{colors[difficulty]};color:white;padding:6px 14px;"
-            f"border-radius:8px;font-weight:bold;'>{icons[difficulty]}</span>",
+            f"<span style='background:{colors.get(difficulty, '#607D8B')};color:white;padding:6px 14px;"
+            f"border-radius:8px;font-weight:bold;'>{icons.get(difficulty, difficulty.upper())}</span>",
             unsafe_allow_html=True
         )
 
         st.write(f"### {q.get('q')}")
 
         # ---------------------------------------------------------------------
-        # LIVE AUTO-REFRESH TIMER (THIS IS WHAT MAKES IT COUNT DOWN!!)
+        # TIMER: the orchestrator owns the deadline (monotonic clock) and submits
+        # TIMEOUT itself; the browser only counts down and reruns once at 0.
         # ---------------------------------------------------------------------
-        if st.session_state["timer_running"]:
-            st_autorefresh(interval=1000, key="refresh_timer")
-
-            # Decrease timer each refresh
-            if st.session_state["timer"] > 0:
-                st.session_state["timer"] -= 1
-            else:
-                st.session_state["timer_expired"] = True
-
-        # Display timer
-        st.markdown(
-            f"<h2 style='font-weight:bold;'>⏳ {st.session_state['timer']}s</h2>",
-            unsafe_allow_html=True
-        )
-
-        # Auto-submit when timer hits 0
-        if st.session_state["timer_expired"]:
-            st.info("⏱ Time's up! Auto-submitting answer…")
-            eval_res = orch.submit_answer(st.session_state["session_id"], "TIMEOUT")
-            st.session_state["last_evaluation"] = eval_res
+        timeout_res = orch.enforce_deadline(st.session_state["session_id"])
+        if timeout_res is not None:
+            st.info("⏱ Time's up! Answer auto-submitted.")
+            st.session_state["last_evaluation"] = timeout_res
             st.session_state["flow_index"] += 1
             st.session_state["current_q"] = None
-            st.session_state["timer"] = 20
-            st.session_state["timer_expired"] = False
-            st.session_state["timer_running"] = False
             st.rerun()
 
+        # filled in after the submit handling, so an answered question stops its countdown
+        timer_slot = st.empty()
+
         # -------------------------------
         # Text Answer Box
         # -------------------------------
@@ -160,16 +144,46 @@ with col_main:
         # Manual Submit
         # -------------------------------
         if st.button("Submit Answer"):
-            eval_res = orch.submit_answer(st.session_state["session_id"], user_answer)
+            st.write("### Evaluation")
+            score_box = st.empty()
+            feedback_box = st.empty()
+            suggestions_box = st.empty()
+            score_box.write("Score: …")
+
+            # render feedback progressively as the evaluator streams it
+            feedback, suggestions, eval_res = "", [], None
+            try:
+                for event in orch.submit_answer_stream(st.session_state["session_id"], user_answer):
+                    kind = event["type"]
+                    if kind == "score":
+                        score_box.write(f"Score: {event['score']}/10")
+                    elif kind == "feedback":
+                        feedback += event["text"]
+                        feedback_box.markdown(f"Feedback: {feedback}▌")
+                    elif kind == "suggestion":
+                        suggestions.append(event["text"])
+                        suggestions_box.markdown("Suggestions:\n" + "\n".join(f"- {s}" for s in suggestions))
+                    elif kind == "reset":
+                        feedback, suggestions = "", []
+                        feedback_box.empty()
+                        suggestions_box.empty()
+                    elif kind == "result":
+                        eval_res = event["result"]
+            except RuntimeError:
+                # the deadline timer auto-submitted the question after the check above
+                st.info("⏱ Time's up! Answer auto-submitted.")
+                eval_res = orch.enforce_deadline(st.session_state["session_id"])
+                if eval_res is None:
+                    # the timer is still recording it: nothing to show, move on
+                    st.session_state["flow_index"] += 1
+                    st.session_state["current_q"] = None
+                    st.rerun()
             st.session_state["last_evaluation"] = eval_res
 
-            st.write("### Evaluation")
-            st.write(f"Score: {eval_res.get('score')}/10")
-            st.write("Feedback:", eval_res.get("feedback"))
+            score_box.write(f"Score: {eval_res.get('score')}/10")
+            feedback_box.write(f"Feedback: {eval_res.get('feedback')}")
             if eval_res.get("suggestions"):
-                st.write("Suggestions:")
-                for s in eval_res["suggestions"]:
-                    st.write("-", s)
+                suggestions_box.markdown("Suggestions:\n" + "\n".join(f"- {s}" for s in eval_res["suggestions"]))
 
             # Show correct answer
             st.success(q.get("answer"))
@@ -177,7 +191,26 @@ with col_main:
             # Move to next question
             st.session_state["flow_index"] += 1
             st.session_state["current_q"] = None
-            st.session_state["timer_running"] = False
+
+        remaining = orch.time_remaining(st.session_state["session_id"])
+        if st.session_state["current_q"] is not None and remaining is not None:
+            with timer_slot.container():
+                components.html(
+                    f"""<h2 id="t" style="font-family:sans-serif;font-weight:bold;margin:0;"></h2>
+<script>
+const end = Date.now() + {remaining * 1000:.0f};
+function tick() {{
+  const s = Math.max(0, Math.ceil((end - Date.now()) / 1000));
+  document.getElementById("t").textContent = "⏳ " + s + "s";
+  if (s > 0) setTimeout(tick, 250);
+}}
+tick();
+</script>""",
+                    height=50,
+                )
+                # a single rerun just after the deadline (keyed per question)
+                st_autorefresh(interval=int(remaining * 1000) + 300, limit=2,
+                               key=f"deadline_{st.session_state['flow_index']}")
 
     else:
         st.info("Start a session to begin.")
@@ -190,6 +223,8 @@ with col_side:
     st.write("👤 Name:", st.session_state["username"])
     st.write("📘 Domain:", st.session_state["domain"])
     st.write("🔢 Question #:", st.session_state["flow_index"])
+    skill = orch.skill_estimate(st.session_state["username"], st.session_state["domain"])
+    st.write("📈 Skill:", f"{skill['rating']:.0f} ({skill['difficulty']}, {skill['n']} answers)")
 
     if st.session_state["last_evaluation"]:
         ev = st.session_state["last_evaluation"]
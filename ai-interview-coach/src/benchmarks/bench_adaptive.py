@@ -0,0 +1,115 @@
+# bench_adaptive.py
+# Adaptive difficulty (skill_model.py) vs the fixed easy -> medium -> hard flow.
+#
+# 1. selection: build the RatingIndex for one domain of --questions questions and time
+#    QuestionSampler.draw_near for sessions that have already seen a few questions.
+# 2. convergence: simulated candidates with a hidden skill answer questions; the expected
+#    score on a question follows the same Elo curve plus noise. Both schedules use the same
+#    SkillTracker update; only the choice of the next question differs. Reported: estimate
+#    error after k answers and how many answers it takes until the estimate stays within
+#    --tolerance of the true skill (every answer is one LLM grading call).
+#
+#   cd src && python -m benchmarks.bench_adaptive --questions 100000 --candidates 2000
+import argparse
+import random
+import statistics
+import time
+
+from instrumentation import Histogram
+from interviewer_agent import QuestionIndex, QuestionSampler
+from skill_model import DIFFICULTY_RATINGS, RatingIndex, SkillTracker, expected_score, question_rating
+
+LEVELS = ("easy", "medium", "hard")
+
+
+def _make_bank(n: int, seed: int = 3) -> dict:
+    """One domain, n questions spread over the three buckets, ratings jittered around each bucket."""
+    rng = random.Random(seed)
+    bank = {"sim": {level: [] for level in LEVELS}}
+    for i in range(n):
+        level = LEVELS[i % 3]
+        bank["sim"][level].append({"id": f"q{i}", "q": f"Question {i}?", "answer": "",
+                                   "rating": round(DIFFICULTY_RATINGS[level] + rng.uniform(-150, 150), 1)})
+    return bank
+
+
+def _selection(index: QuestionIndex, args):
+    start = time.perf_counter()
+    ratings = RatingIndex(index)
+    ratings.domain("sim")
+    build_ms = (time.perf_counter() - start) * 1000
+    hist = Histogram()
+    rng = random.Random(1)
+    for _ in range(args.draws // 10):
+        sampler = QuestionSampler(index, random.Random(rng.random()), ratings)
+        for _ in range(10):
+            target = rng.uniform(700, 1900)
+            t = time.perf_counter()
+            sampler.draw_near("sim", target)
+            hist.record(time.perf_counter() - t)
+    s = hist.summary()
+    print(f"selection over {args.questions} questions: index build {build_ms:.0f} ms, "
+          f"draw_near p50={s['p50_ms'] * 1000:.1f}us p99={s['p99_ms'] * 1000:.1f}us max={s['max_ms']:.3f}ms")
+
+
+def _simulate(index: QuestionIndex, adaptive: bool, args):
+    rng = random.Random(11)
+    ratings = RatingIndex(index)
+    tracker = SkillTracker()
+    errors = [[] for _ in range(args.max_answers)]
+    to_stable = []
+    for c in range(args.candidates):
+        true_skill = rng.uniform(800, 1800)
+        user = f"c{c}"
+        sampler = QuestionSampler(index, random.Random(rng.random()), ratings)
+        trace = []
+        for k in range(args.max_answers):
+            est = tracker.get(user, "sim")
+            if adaptive:
+                q, level = sampler.draw_near("sim", est.rating)
+            else:
+                level = LEVELS[k % 3]
+                q = sampler.draw("sim", level)
+            rating = question_rating(q, level)
+            p = expected_score(true_skill, rating) + rng.gauss(0, args.noise)
+            score = round(10 * min(1.0, max(0.0, p)))
+            tracker.update(user, "sim", rating, score)
+            err = abs(tracker.get(user, "sim").rating - true_skill)
+            errors[k].append(err)
+            trace.append(err)
+        # answers until the estimate enters the tolerance band and never leaves it again
+        stable = args.max_answers + 1
+        for k in range(args.max_answers - 1, -1, -1):
+            if trace[k] > args.tolerance:
+                break
+            stable = k + 1
+        to_stable.append(stable)
+    return errors, to_stable
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--questions", type=int, default=100000)
+    ap.add_argument("--draws", type=int, default=20000)
+    ap.add_argument("--candidates", type=int, default=2000)
+    ap.add_argument("--max-answers", type=int, default=15)
+    ap.add_argument("--noise", type=float, default=0.1, help="std-dev of the score noise (fraction of 10)")
+    ap.add_argument("--tolerance", type=float, default=100.0, help="rating points")
+    args = ap.parse_args()
+
+    index = QuestionIndex(_make_bank(args.questions))
+    _selection(index, args)
+
+    checkpoints = [k for k in (3, 5, 8, 10, 15) if k <= args.max_answers]
+    print(f"\nconvergence, {args.candidates} candidates (true skill 800-1800), tolerance ±{args.tolerance:.0f}:")
+    print(f"{'schedule':<10}" + "".join(f"  err@{k:<3}" for k in checkpoints) + "  answers to stable (mean / p90, "
+          f"never = {args.max_answers + 1})")
+    for label, adaptive in (("fixed", False), ("adaptive", True)):
+        errors, to_stable = _simulate(index, adaptive, args)
+        cols = "".join(f"  {statistics.mean(errors[k - 1]):6.0f} " for k in checkpoints)
+        p90 = sorted(to_stable)[int(0.9 * (len(to_stable) - 1))]
+        print(f"{label:<10}{cols}  {statistics.mean(to_stable):5.1f} / {p90}")
+
+
+if __name__ == "__main__":
+    main()
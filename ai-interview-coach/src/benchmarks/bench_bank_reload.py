@@ -0,0 +1,94 @@
+# bench_bank_reload.py
+# Request latency while the question bank is edited and reloaded --reloads times:
+#   inline:     the request that notices the edit rebuilds the bank itself (load on demand)
+#   background: InterviewerAgent.watch() rebuilds on its own thread and swaps the snapshot
+# Request threads draw a question for a fresh session and look one up by id, in a loop.
+# Each reload re-parses the JSON bank and rebuilds its similarity index.
+#
+#   cd src && python -m benchmarks.bench_bank_reload --domains 10 --per-bucket 60 --reloads 3
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from benchmarks.bench_bank_startup import _make_bank
+from instrumentation import Histogram
+
+
+def _edit(path: Path, bank: dict, n: int):
+    bank["domain0"]["easy"].append({"id": f"added{n}", "q": f"Added question {n}?", "answer": "added " * 40})
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(bank, f)
+    os.replace(tmp, path)
+
+
+def _run(mode: str, path: Path, bank: dict, args) -> Histogram:
+    from interviewer_agent import InterviewerAgent
+
+    agent = InterviewerAgent(path)
+    hist = Histogram()
+    stop = threading.Event()
+    seen_mtime = [agent.snapshot.mtime_ns]
+
+    def requests():
+        while not stop.is_set():
+            start = time.perf_counter()
+            if mode == "inline":
+                mtime = path.stat().st_mtime_ns
+                if mtime != seen_mtime[0]:
+                    seen_mtime[0] = mtime
+                    agent.reload()
+            q = agent.pick_question("domain0", "easy", sampler=agent.new_sampler())
+            agent.get_question(q["id"])
+            hist.record(time.perf_counter() - start)
+            time.sleep(args.think_ms / 1000.0)
+
+    if mode == "background":
+        agent.watch(args.watch_interval)
+    threads = [threading.Thread(target=requests) for _ in range(args.threads)]
+    for t in threads:
+        t.start()
+    for n in range(args.reloads):
+        time.sleep(args.gap)
+        _edit(path, bank, n)
+        deadline = time.monotonic() + 120
+        while agent.reloads <= n and time.monotonic() < deadline:
+            time.sleep(0.01)
+    time.sleep(args.gap)
+    stop.set()
+    for t in threads:
+        t.join()
+    agent.stop_watching()
+    assert agent.get_question(f"added{args.reloads - 1}") is not None
+    return hist
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--domains", type=int, default=10)
+    ap.add_argument("--per-bucket", type=int, default=60)
+    ap.add_argument("--answer-chars", type=int, default=400)
+    ap.add_argument("--reloads", type=int, default=3)
+    ap.add_argument("--threads", type=int, default=4)
+    ap.add_argument("--think-ms", type=float, default=1.0)
+    ap.add_argument("--gap", type=float, default=0.5, help="seconds between edits")
+    ap.add_argument("--watch-interval", type=float, default=0.05)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ("inline", "background"):
+            path = Path(tmp) / f"bank_{mode}.json"
+            bank = _make_bank(args.domains, args.per_bucket, args.answer_chars)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(bank, f)
+            s = _run(mode, path, bank, args).summary()
+            print(f"{mode:<11} requests={s['count']:>6} p50={s['p50_ms']:7.3f}ms p99={s['p99_ms']:8.3f}ms "
+                  f"max={s['max_ms']:9.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# bench_bank_startup.py
+# Cold start and resident memory of InterviewerAgent on a JSON bank vs the compact,
+# memory-mapped bank (compact_bank.py), for a synthetic bank with many domains and long
+# reference answers. Each measurement runs in a fresh interpreter: load the bank, draw
+# --draws questions from one domain, report wall time and RSS growth over the bare imports.
+# Both variants use the same prebuilt (memory-mapped) similarity index, so only bank loading differs.
+#
+#   cd src && python -m benchmarks.bench_bank_startup --domains 40 --per-bucket 150 --answer-chars 1500
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent
+WORDS = ("object class method thread memory heap stack garbage collector interface inheritance "
+         "polymorphism encapsulation abstraction generic stream lambda hash map list tree graph "
+         "queue latency complexity recursion iterator closure decorator module package").split()
+
+
+def _rss_kib() -> int:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _make_bank(domains: int, per_bucket: int, answer_chars: int, seed: int = 7) -> dict:
+    rng = random.Random(seed)
+
+    def text(n):
+        out, size = [], 0
+        while size < n:
+            w = rng.choice(WORDS)
+            out.append(w)
+            size += len(w) + 1
+        return " ".join(out)
+
+    bank = {}
+    for d in range(domains):
+        bank[f"domain{d}"] = {
+            level: [{"id": f"d{d}-{level[0]}{i}", "q": f"Question {i} about {text(60)}?", "answer": text(answer_chars)}
+                    for i in range(per_bucket)]
+            for level in ("easy", "medium", "hard")
+        }
+    return bank
+
+
+def _child(path: str, draws: int):
+    sys.path.insert(0, str(SRC))
+    from interviewer_agent import InterviewerAgent  # noqa: E402  (imports are not part of the measurement)
+    base = _rss_kib()
+    start = time.perf_counter()
+    agent = InterviewerAgent(Path(path))
+    loaded = time.perf_counter() - start
+    sampler = agent.new_sampler()
+    for i in range(draws):
+        q = agent.pick_question("domain0", ("easy", "medium", "hard")[i % 3], sampler=sampler)
+        assert q["answer"]
+    total = time.perf_counter() - start
+    print(json.dumps({"load_ms": loaded * 1000, "first_draws_ms": total * 1000, "rss_kib": _rss_kib() - base}))
+
+
+def _measure(path: Path, draws: int, env: dict) -> dict:
+    out = subprocess.run([sys.executable, "-m", "benchmarks.bench_bank_startup", "--child", str(path),
+                          "--draws", str(draws)], cwd=SRC, env=env, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--domains", type=int, default=40)
+    ap.add_argument("--per-bucket", type=int, default=150)
+    ap.add_argument("--answer-chars", type=int, default=1500)
+    ap.add_argument("--draws", type=int, default=10)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--child", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.child:
+        return _child(args.child, args.draws)
+
+    from compact_bank import convert_bank, reference_index_path
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path, qbank_path = Path(tmp) / "bank.json", Path(tmp) / "bank.qbank"
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(_make_bank(args.domains, args.per_bucket, args.answer_chars), f)
+        start = time.perf_counter()
+        stats = convert_bank(json_path, qbank_path)
+        print(f"bank: {stats['questions']} questions in {stats['domains']} domains, json "
+              f"{json_path.stat().st_size / 2**20:.1f} MiB, compact {stats['bytes'] / 2**20:.1f} MiB "
+              f"(converted + similarity index in {time.perf_counter() - start:.1f}s)")
+        env = dict(os.environ, SIMILARITY_INDEX_PATH=str(reference_index_path(qbank_path)))
+        for label, path in (("json", json_path), ("compact", qbank_path)):
+            runs = [_measure(path, args.draws, env) for _ in range(args.repeat)]
+            best = min(runs, key=lambda r: r["first_draws_ms"])
+            print(f"{label:<8} load {best['load_ms']:8.1f} ms   load+{args.draws} draws {best['first_draws_ms']:8.1f} ms"
+                  f"   RSS +{best['rss_kib'] / 1024:7.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# bench_cohort_analytics.py
+# CohortAnalytics.refresh over a synthetic database of --interactions rows: full build
+# throughput and peak memory, an incremental refresh after --new more rows (part of them
+# extending existing sessions), and per-session loading (load_session for every session,
+# the only way to get these numbers before) on the same data for comparison.
+#
+#   cd src && python -m benchmarks.bench_cohort_analytics --interactions 1000000
+import argparse
+import random
+import resource
+import tempfile
+import time
+from pathlib import Path
+
+from analytics import CohortAnalytics
+from storage.sqlite_store import SQLiteStore
+
+DOMAINS = ("java", "python", "dsa")
+
+
+def _fill(store: SQLiteStore, sessions: range, per_session: int, questions: int, rng: random.Random, start_seq=None):
+    batch_sessions, batch_rows = [], []
+    for s in sessions:
+        sid = f"s{s:08d}"
+        batch_sessions.append((sid, f"u{s % 5000}", DOMAINS[s % 3], 0.0))
+        skill = rng.uniform(0, 10)
+        seq0 = 0 if start_seq is None else start_seq
+        for k in range(per_session):
+            score = int(min(10, max(0, rng.gauss(skill, 2.5))))
+            batch_rows.append((sid, seq0 + k, {"time": 0.0, "question": {"id": f"{DOMAINS[s % 3]}{rng.randrange(questions)}"},
+                                               "evaluation": {"score": score}}))
+        if len(batch_rows) >= 20000:
+            store.write_batch(batch_sessions, batch_rows, [])
+            batch_sessions, batch_rows = [], []
+    if batch_rows:
+        store.write_batch(batch_sessions, batch_rows, [])
+
+
+def _peak_mib() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--interactions", type=int, default=1000000)
+    ap.add_argument("--per-session", type=int, default=8)
+    ap.add_argument("--questions", type=int, default=2000, help="distinct questions per domain")
+    ap.add_argument("--new", type=int, default=20000, help="rows added before the incremental refresh")
+    ap.add_argument("--chunk-size", type=int, default=50000)
+    ap.add_argument("--rescan-sessions", type=int, default=2000, help="sessions loaded one by one for comparison")
+    args = ap.parse_args()
+
+    rng = random.Random(9)
+    n_sessions = args.interactions // args.per_session
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteStore(Path(tmp) / "cohort.db")
+        start = time.perf_counter()
+        _fill(store, range(n_sessions), args.per_session, args.questions, rng)
+        print(f"filled {n_sessions * args.per_session} interactions in {time.perf_counter() - start:.1f}s "
+              f"(peak RSS {_peak_mib():.0f} MiB)")
+
+        base = _peak_mib()
+        analytics = CohortAnalytics(store)
+        stats = analytics.refresh(args.chunk_size)
+        print(f"full refresh:        {stats['rows']:>8} rows in {stats['seconds']:6.2f}s "
+              f"({stats['rows'] / stats['seconds']:,.0f} rows/s), peak RSS +{_peak_mib() - base:.0f} MiB")
+
+        # new sessions plus a few more answers for some existing ones
+        extend = range(0, n_sessions, max(1, n_sessions * args.per_session // args.new))
+        _fill(store, extend, 1, args.questions, rng, start_seq=args.per_session)
+        _fill(store, range(n_sessions, n_sessions + args.new // (2 * args.per_session)), args.per_session,
+              args.questions, rng)
+        stats = analytics.refresh(args.chunk_size)
+        print(f"incremental refresh: {stats['rows']:>8} rows in {stats['seconds']:6.2f}s "
+              f"({stats['sessions']} sessions touched, {stats['replaced_rows']} rows re-folded)")
+
+        start = time.perf_counter()
+        for s in range(min(args.rescan_sessions, n_sessions)):
+            store.load_session(f"s{s:08d}")
+        per_session = (time.perf_counter() - start) / min(args.rescan_sessions, n_sessions)
+        print(f"load_session rescan: {per_session * 1e3:.3f} ms/session -> "
+              f"~{per_session * n_sessions:.0f}s for all {n_sessions} sessions before aggregating anything")
+        worst = min(analytics.question_stats(), key=lambda r: r["mean"] if r["n"] else 99)
+        print(f"{len(analytics.qids)} questions; lowest mean {worst['question_id']} {worst['mean']} "
+              f"(discrimination {worst['discrimination']})")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
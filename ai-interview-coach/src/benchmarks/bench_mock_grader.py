@@ -0,0 +1,57 @@
+# bench_mock_grader.py
+# Answers/sec for the offline mock grader on short and long answers, and the keyword
+# matcher in substring-scan vs Aho-Corasick mode for small and large keyword tables.
+#
+#   cd src && python -m benchmarks.bench_mock_grader
+import argparse
+import random
+import time
+
+from tools.scoring_utils import KEYWORD_TABLES, KeywordMatcher, mock_evaluate_answer
+
+FILLER = ("the a of to and in that it is for on with as this by an be are or from at which "
+          "when because value memory object method call data structure runtime example").split()
+
+
+def _make_answer(n_words: int, keywords, rng: random.Random) -> str:
+    words = [rng.choice(FILLER) for _ in range(n_words)]
+    for _ in range(max(1, n_words // 20)):
+        words[rng.randrange(n_words)] = rng.choice(keywords)
+    return " ".join(words)
+
+
+def _rate(fn, items, min_time: float = 0.5) -> float:
+    n, start = 0, time.perf_counter()
+    while True:
+        for it in items:
+            fn(it)
+        n += len(items)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return n / elapsed
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--samples", type=int, default=200)
+    args = ap.parse_args()
+    rng = random.Random(42)
+    java_kws = [kw for words in KEYWORD_TABLES["java"]["categories"].values() for kw in words]
+    big_kws = java_kws + ["term%04d" % i for i in range(1000)]
+
+    for label, n_words in (("short", 15), ("long", 400)):
+        answers = [_make_answer(n_words, java_kws, rng) for _ in range(args.samples)]
+        rate = _rate(lambda a: mock_evaluate_answer("What is OOP in Java?", a, rng), answers)
+        print(f"mock_evaluate_answer {label:<5} ({n_words:>3} words): {rate:>10.0f} answers/sec")
+
+        for table, kws in (("java", java_kws), ("1k-keywords", big_kws)):
+            lowered = [a.lower() for a in answers]
+            for mode in (False, True):
+                m = KeywordMatcher(kws, use_automaton=mode)
+                rate = _rate(m.count_hits, lowered)
+                name = "aho-corasick" if mode else "substring"
+                print(f"  matcher {table:<12} {name:<13} {label:<5}: {rate:>10.0f} answers/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# bench_resilient_llm.py
+# Latency percentiles and fallback rate of the bare HTTP adapter vs ResilientLLM against the
+# local fake LLM server with a slow tail and injected errors.
+#
+#   cd src && python -m benchmarks.bench_resilient_llm --requests 200 --concurrency 16
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from instrumentation import Histogram
+from llm_adapters import HttpLLMAdapter, MockLLM
+from resilient_llm import CircuitBreaker, ResilientLLM
+from tools.fake_llm_server import start_server
+
+
+def _run(llm, n: int, concurrency: int):
+    hist = Histogram()
+    fallbacks = 0
+
+    def one(i):
+        start = time.perf_counter()
+        result = llm.evaluate("What is OOP in Java?", f"objects and classes with inheritance {i}", "")
+        return time.perf_counter() - start, result.get("fallback", False)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        for elapsed, fell_back in pool.map(one, range(n)):
+            hist.record(elapsed)
+            fallbacks += fell_back
+    return time.perf_counter() - start, hist.summary(), fallbacks
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=200)
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--latency", type=float, default=0.05)
+    ap.add_argument("--slow-rate", type=float, default=0.05)
+    ap.add_argument("--slow-latency", type=float, default=2.0)
+    ap.add_argument("--error-rate", type=float, default=0.1)
+    ap.add_argument("--throttle-rate", type=float, default=0.05)
+    args = ap.parse_args()
+    server, url = start_server(latency=args.latency, jitter=args.latency / 4, slow_rate=args.slow_rate,
+                               slow_latency=args.slow_latency, error_rate=args.error_rate,
+                               throttle_rate=args.throttle_rate, seed=7)
+    print(f"fake server {url}: {args.error_rate:.0%} errors, {args.throttle_rate:.0%} throttled, "
+          f"{args.slow_rate:.0%} take {args.slow_latency}s")
+
+    variants = [
+        ("bare http", HttpLLMAdapter(url)),
+        ("resilient", ResilientLLM(HttpLLMAdapter(url), MockLLM(), timeout=1.0, max_retries=2,
+                                   backoff_base=0.02, breaker=CircuitBreaker(50, 5.0))),
+        ("resilient+hedge", ResilientLLM(HttpLLMAdapter(url), MockLLM(), timeout=1.0, max_retries=2,
+                                         backoff_base=0.02, breaker=CircuitBreaker(50, 5.0),
+                                         hedge_after=args.latency * 3)),
+    ]
+    for name, llm in variants:
+        wall, s, fallbacks = _run(llm, args.requests, args.concurrency)
+        print(f"{name:<16} wall={wall:6.2f}s p50={s['p50_ms']:8.1f}ms p95={s['p95_ms']:8.1f}ms "
+              f"p99={s['p99_ms']:8.1f}ms max={s['max_ms']:8.1f}ms fallbacks={fallbacks}")
+        if hasattr(llm, "stats"):
+            print(f"  {llm.stats()}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# bench_session_scaling.py
+# Throughput of a pool of worker processes sharing sessions through SQLiteSessionBackend.
+# Every interview step (start, next, answer, finish) is a job on one shared queue, so
+# consecutive steps of one interview land on whichever worker is free: the "hops" column
+# counts steps served by a different process than the step before. Summaries are checked
+# for lost or duplicated answers. Scaling needs as many free cores as workers.
+#
+#   cd src && python -m benchmarks.bench_session_scaling --interviews 400 --workers 1,2,4
+import argparse
+import multiprocessing as mp
+import os
+import tempfile
+import time
+from pathlib import Path
+
+QUESTION_BANK = Path(__file__).resolve().parent.parent / "tools" / "question_bank.json"
+DIFFICULTIES = ("easy", "medium", "hard")
+ANSWER = "lists are mutable, tuples are immutable"
+
+
+def _burn(ms: float):
+    end = time.thread_time() + ms / 1000.0
+    while time.thread_time() < end:
+        pass
+
+
+def _worker(jobs, done, state_path: str, questions: int, work_ms: float):
+    from orchestrator_agent import OrchestratorAgent
+    from session_backend import SQLiteSessionBackend
+
+    orch = OrchestratorAgent(QUESTION_BANK, llm_adapter="mock", session_backend=SQLiteSessionBackend(Path(state_path)))
+    me = os.getpid()
+    while True:
+        job = jobs.get()
+        if job is None:
+            break
+        kind, key, k, last_pid, hops = job
+        hops += last_pid not in (None, me)
+        # stand-in for the rest of the request handling (HTTP parsing, auth, rendering, ...)
+        _burn(work_ms)
+        if kind == "start":
+            jobs.put(("next", orch.start_session(f"user{key}", "python"), 0, me, hops))
+        elif kind == "next":
+            orch.ask_next(key, DIFFICULTIES[k % len(DIFFICULTIES)])
+            jobs.put(("answer", key, k, me, hops))
+        elif kind == "answer":
+            orch.submit_answer(key, ANSWER)
+            jobs.put(("next", key, k + 1, me, hops) if k + 1 < questions else ("finish", key, 0, me, hops))
+        else:
+            done.put(("summary", orch.finish_session(key)["num_questions"], hops))
+    orch.memory.writer.close()
+    done.put(("stats", orch.backend.stats(), 0))
+
+
+def _run(n_workers: int, args, tmp: str) -> None:
+    state_path = os.path.join(tmp, f"state_{n_workers}.db")
+    jobs, done = mp.Queue(), mp.Queue()
+    procs = [mp.Process(target=_worker, args=(jobs, done, state_path, args.questions, args.work_ms))
+             for _ in range(n_workers)]
+    for p in procs:
+        p.start()
+    start = time.perf_counter()
+    for i in range(args.interviews):
+        jobs.put(("start", i, 0, None, 0))
+    counts, hops = [], 0
+    while len(counts) < args.interviews:
+        _, n, h = done.get()
+        counts.append(n)
+        hops += h
+    elapsed = time.perf_counter() - start
+    for _ in procs:
+        jobs.put(None)
+    conflicts = 0
+    for _ in procs:
+        _, stats, _ = done.get()
+        conflicts += stats["conflicts"]
+    for p in procs:
+        p.join()
+    steps = args.interviews * (2 + 2 * args.questions)
+    bad = sum(1 for n in counts if n != args.questions)
+    print(f"workers={n_workers:<3} {steps / elapsed:8.0f} steps/s {args.interviews / elapsed:7.1f} interviews/s "
+          f"hops={hops / steps:5.1%} cas_conflicts={conflicts} inconsistent={bad}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--interviews", type=int, default=400)
+    ap.add_argument("--questions", type=int, default=3)
+    ap.add_argument("--workers", default="1,2,4", help="comma-separated pool sizes to compare")
+    ap.add_argument("--work-ms", type=float, default=2.0, help="extra CPU per request (handler stand-in)")
+    args = ap.parse_args()
+    print(f"cpu cores: {os.cpu_count()}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # MemoryAgent keeps its database under ./storage: run inside a scratch directory
+        os.chdir(tmp)
+        for n in (int(w) for w in args.workers.split(",")):
+            _run(n, args, tmp)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# bench_shared_orchestrator.py
+# Per-browser-session startup time and memory: a new OrchestratorAgent per session (the old
+# st.session_state pattern) vs start_session() on one shared instance. Then N threads drive
+# the shared instance concurrently and the recorded histories are checked for consistency.
+#
+#   cd src && python -m benchmarks.bench_shared_orchestrator --sessions 50 --threads 16
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+QUESTION_BANK = Path(__file__).resolve().parent.parent / "tools" / "question_bank.json"
+
+
+def _measure(label: str, n: int, fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    keep = [fn(i) for i in range(n)]
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<28} {elapsed / n * 1000:8.2f} ms/session {current / n / 1024:8.1f} KiB/session")
+    return keep
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sessions", type=int, default=50)
+    ap.add_argument("--threads", type=int, default=16)
+    ap.add_argument("--answers", type=int, default=3)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # MemoryAgent keeps its database under ./storage: run inside a scratch directory
+        os.chdir(tmp)
+        from orchestrator_agent import OrchestratorAgent
+
+        def per_session(i):
+            orch = OrchestratorAgent(QUESTION_BANK, llm_adapter="mock")
+            return orch, orch.start_session(f"user{i}", "java")
+
+        for orch, _ in _measure("orchestrator per session", args.sessions, per_session):
+            orch.memory.writer.close()
+        shared = OrchestratorAgent(QUESTION_BANK, llm_adapter="mock")
+        _measure("shared orchestrator", args.sessions, lambda i: shared.start_session(f"user{i}", "java"))
+
+        def interview(i):
+            sid = shared.start_session(f"user{i}", "python")
+            for _ in range(args.answers):
+                shared.ask_next(sid, "easy")
+                shared.submit_answer(sid, "lists are mutable, tuples are immutable")
+            return shared.finish_session(sid)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.threads) as pool:
+            summaries = list(pool.map(interview, range(args.sessions * 4)))
+        elapsed = time.perf_counter() - start
+        bad = [s for s in summaries if s["num_questions"] != args.answers]
+        print(f"{len(summaries)} concurrent interviews on {args.threads} threads in {elapsed:.2f}s, "
+              f"inconsistent summaries: {len(bad)}")
+        shared.memory.writer.close()
+
+
+if __name__ == "__main__":
+    main()
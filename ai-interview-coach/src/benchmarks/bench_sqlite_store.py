@@ -0,0 +1,73 @@
+# bench_sqlite_store.py
+# Saves/sec and loads/sec for SQLiteStore under N concurrent threads,
+# legacy (connect-per-call, rollback journal) vs pooled WAL.
+#
+#   cd src && python -m benchmarks.bench_sqlite_store --threads 8 --ops 500
+import argparse
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from storage.sqlite_store import SQLiteStore
+
+
+def _session(i: int) -> dict:
+    return {
+        "user_id": f"user{i % 50}",
+        "domain": "java",
+        "created_at": time.time(),
+        "history": [{"time": time.time(), "question": {"id": f"j{k}", "q": "What is JVM?", "answer": "x" * 200},
+                     "evaluation": {"score": k % 10, "feedback": "ok", "suggestions": []}} for k in range(3)],
+        "weaknesses": {"j1": 1},
+    }
+
+
+def _run_threads(n_threads: int, fn) -> float:
+    barrier = threading.Barrier(n_threads + 1)
+
+    def worker(t):
+        barrier.wait()
+        fn(t)
+
+    threads = [threading.Thread(target=worker, args=(t,)) for t in range(n_threads)]
+    for th in threads:
+        th.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for th in threads:
+        th.join()
+    return time.perf_counter() - start
+
+
+def bench(label: str, store: SQLiteStore, n_threads: int, ops: int):
+    ids = [[str(uuid.uuid4()) for _ in range(ops)] for _ in range(n_threads)]
+
+    def do_saves(t):
+        for i, sid in enumerate(ids[t]):
+            store.save_session(sid, f"user{t}", _session(i))
+
+    def do_loads(t):
+        for sid in ids[t]:
+            store.load_session(sid)
+
+    total = n_threads * ops
+    save_s = _run_threads(n_threads, do_saves)
+    load_s = _run_threads(n_threads, do_loads)
+    print(f"{label:<8} threads={n_threads:<3} saves/sec={total / save_s:>10.0f}  loads/sec={total / load_s:>10.0f}")
+    store.close()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--threads", type=int, default=8)
+    ap.add_argument("--ops", type=int, default=300, help="operations per thread")
+    args = ap.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        bench("before", SQLiteStore(Path(tmp) / "legacy.db", pooled=False, wal=False), args.threads, args.ops)
+        bench("after", SQLiteStore(Path(tmp) / "pooled.db"), args.threads, args.ops)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# bench_timer_load.py
+# Server CPU for N candidates answering one timed question each, comparing
+#   tick:     the old 1-second st_autorefresh loop (one script rerun per user per second,
+#             the countdown decremented per rerun and TIMEOUT submitted by the client)
+#   deadline: server-side deadlines (one rerun when the question is shown, the orchestrator's
+#             deadline timer submits TIMEOUT, one rerun at the deadline to pick it up)
+# Streamlit itself is not involved: every rerun burns --rerun-cost-ms of CPU as a stand-in
+# for executing app.py, plus the real orchestrator calls the script makes.
+#
+#   cd src && python -m benchmarks.bench_timer_load --users 200 --time-limit 5
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+QUESTION_BANK = Path(__file__).resolve().parent.parent / "tools" / "question_bank.json"
+
+
+def _burn(ms: float):
+    end = time.thread_time() + ms / 1000.0
+    while time.thread_time() < end:
+        pass
+
+
+def _run_tick(orch, sids, time_limit: int, rerun_cost_ms: float) -> int:
+    timers = {sid: time_limit for sid in sids}
+    reruns = 0
+    for sid in sids:
+        orch.ask_next(sid, "easy")
+    for _ in range(time_limit + 1):
+        tick_start = time.monotonic()
+        for sid in sids:
+            reruns += 1
+            _burn(rerun_cost_ms)
+            orch.active_sessions.get(sid)
+            if timers[sid] > 0:
+                timers[sid] -= 1
+            elif timers[sid] == 0:
+                orch.submit_answer(sid, "TIMEOUT")
+                timers[sid] = -1
+        time.sleep(max(0.0, 1.0 - (time.monotonic() - tick_start)))
+    return reruns
+
+
+def _run_deadline(orch, sids, time_limit: int, rerun_cost_ms: float) -> int:
+    reruns = 0
+    for sid in sids:
+        reruns += 1
+        _burn(rerun_cost_ms)
+        orch.ask_next(sid, "easy", time_limit=time_limit)
+        orch.time_remaining(sid)
+    # browsers count down locally; the orchestrator's deadline timer submits TIMEOUT
+    time.sleep(time_limit + orch.deadline_grace + 0.3)
+    for sid in sids:
+        reruns += 1
+        _burn(rerun_cost_ms)
+        if orch.enforce_deadline(sid) is None:
+            raise RuntimeError(f"session {sid} was not timed out")
+    return reruns
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--users", type=int, default=200)
+    ap.add_argument("--time-limit", type=int, default=5)
+    ap.add_argument("--rerun-cost-ms", type=float, default=2.0, help="CPU per script rerun (app.py stand-in)")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # MemoryAgent keeps its database under ./storage: run inside a scratch directory
+        os.chdir(tmp)
+        from orchestrator_agent import OrchestratorAgent
+
+        for mode, run in (("tick", _run_tick), ("deadline", _run_deadline)):
+            orch = OrchestratorAgent(QUESTION_BANK, llm_adapter="mock")
+            sids = [orch.start_session(f"user{i}", "java") for i in range(args.users)]
+            cpu0, wall0 = time.process_time(), time.perf_counter()
+            reruns = run(orch, sids, args.time_limit, args.rerun_cost_ms)
+            cpu, wall = time.process_time() - cpu0, time.perf_counter() - wall0
+            timeouts = sum(1 for sid in sids if orch.active_sessions.get(sid)["scores"] == [0])
+            print(f"{mode:<9} users={args.users} reruns={reruns:>6} cpu={cpu:6.2f}s wall={wall:5.1f}s "
+                  f"cpu/user/question={cpu / args.users * 1000:6.1f}ms timeouts={timeouts}")
+            orch.memory.flush()
+
+
+if __name__ == "__main__":
+    main()
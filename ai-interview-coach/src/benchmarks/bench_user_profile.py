@@ -0,0 +1,73 @@
+# bench_user_profile.py
+# Reading a user's profile as history grows: rescanning every stored session of the user
+# (load_session per session, then aggregating) vs the maintained aggregates (load_user_profile).
+# Interactions are written through MemoryAgent, so the aggregate upserts are part of the
+# write-behind batches measured in the "write" column.
+#
+#   cd src && python -m benchmarks.bench_user_profile --sessions 10,100,1000 --per-session 10
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from instrumentation import Histogram
+
+
+def _rescan(memory, user_id: str) -> dict:
+    """What computing a profile took before the aggregates: every session, every row."""
+    domains = {}
+    for sid in memory.store.list_user_sessions(user_id):
+        sess = memory.store.load_session(sid) or {}
+        for entry in sess.get("history", []):
+            domains.setdefault(sess.get("domain"), []).append(entry["evaluation"].get("score", 0))
+    return {d: (len(s), statistics.mean(s)) for d, s in domains.items()}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sessions", default="10,100,1000", help="comma-separated history sizes (sessions per user)")
+    ap.add_argument("--per-session", type=int, default=10)
+    ap.add_argument("--reads", type=int, default=20)
+    args = ap.parse_args()
+
+    from memory_agent import MemoryAgent
+
+    rng = random.Random(5)
+    with tempfile.TemporaryDirectory() as tmp:
+        memory = MemoryAgent(Path(tmp) / "profiles.db")
+        written = 0
+        for n in (int(x) for x in args.sessions.split(",")):
+            user = f"user{n}"
+            start = time.perf_counter()
+            for s in range(n):
+                sid = memory.create_session(user)
+                memory.start_session(sid, user, ("java", "python", "dsa")[s % 3])
+                for i in range(args.per_session):
+                    memory.add_interaction(sid, {"id": f"q{i}", "q": "?", "answer": "ref"},
+                                           {"score": rng.randint(0, 10), "feedback": "ok"})
+                memory.persist_session(sid)
+                memory.sessions.pop(sid)
+            write_s = time.perf_counter() - start
+            written += n * args.per_session
+
+            old, new = Histogram(), Histogram()
+            for _ in range(args.reads):
+                t = time.perf_counter()
+                expected = _rescan(memory, user)
+                old.record(time.perf_counter() - t)
+                t = time.perf_counter()
+                profile = memory.load_user_profile(user)
+                new.record(time.perf_counter() - t)
+            for domain, (count, mean) in expected.items():
+                assert profile["domains"][domain]["n"] == count
+                assert abs(profile["domains"][domain]["mean"] - mean) < 1e-9
+            print(f"history={n * args.per_session:>6} answers  write {write_s * 1e6 / (n * args.per_session):6.0f} us/answer"
+                  f"   rescan p50={old.summary()['p50_ms']:9.2f}ms   profile p50={new.summary()['p50_ms']:6.3f}ms")
+        memory.writer.close()
+        memory.store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+# load_api.py
+# Load generator for api_server: N simulated candidates, each on its own keep-alive
+# connection, run start -> (next -> answer) x Q -> finish with think time in between.
+# Reports throughput and per-endpoint latency percentiles.
+#
+# By default the API runs in-process (own thread and event loop, mock adapter, scratch
+# directory); --url points it at an already running server instead.
+#
+#   cd src && python -m benchmarks.load_api --candidates 2000 --concurrency 500
+#   cd src && python -m benchmarks.load_api --url http://127.0.0.1:8000 --candidates 5000
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+
+from instrumentation import Histogram
+
+QUESTION_BANK = Path(__file__).resolve().parent.parent / "tools" / "question_bank.json"
+ANSWERS = [
+    "lists are mutable, tuples are immutable",
+    "the JVM runs bytecode and manages memory with a garbage collector",
+    "a hash map stores key value pairs with average O(1) lookup",
+    "I am not sure",
+]
+
+
+class Client:
+    """One HTTP/1.1 keep-alive connection speaking JSON."""
+
+    def __init__(self, host: str, port: int):
+        self.host, self.port = host, port
+        self.reader = self.writer = None
+
+    async def request(self, method: str, path: str, payload: dict = None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        body = json.dumps(payload).encode() if payload is not None else b""
+        self.writer.write(f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Type: application/json\r\n"
+                          f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+        await self.writer.drain()
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        return status, json.loads(await self.reader.readexactly(length))
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+class LoadStats:
+    def __init__(self):
+        self.latency = {}
+        self.errors = {}
+        self.requests = 0
+
+    def record(self, endpoint: str, seconds: float, status: int):
+        self.requests += 1
+        self.latency.setdefault(endpoint, Histogram()).record(seconds)
+        if status >= 400:
+            self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+
+async def _candidate(i: int, client: Client, stats: LoadStats, args):
+    async def call(endpoint, method, path, payload=None):
+        start = time.perf_counter()
+        status, data = await client.request(method, path, payload)
+        stats.record(endpoint, time.perf_counter() - start, status)
+        return status, data
+
+    async def think():
+        if args.think_ms:
+            await asyncio.sleep(random.uniform(0.5, 1.5) * args.think_ms / 1000.0)
+
+    _, data = await call("start", "POST", "/sessions", {"user_id": f"load{i}", "domain": random.choice(
+        ["java", "python", "dsa"])})
+    sid = data["session_id"]
+    for difficulty in (["easy", "medium", "hard"] * args.questions)[:args.questions]:
+        status, _ = await call("next", "POST", f"/sessions/{sid}/next", {"difficulty": difficulty})
+        if status != 200:
+            continue
+        await think()
+        await call("answer", "POST", f"/sessions/{sid}/answer", {"answer": random.choice(ANSWERS)})
+    await call("finish", "POST", f"/sessions/{sid}/finish")
+
+
+async def run_load(host: str, port: int, args) -> LoadStats:
+    stats = LoadStats()
+    gate = asyncio.Semaphore(args.concurrency)
+
+    async def one(i):
+        async with gate:
+            client = Client(host, port)
+            try:
+                await _candidate(i, client, stats, args)
+            except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+                stats.errors["connection"] = stats.errors.get("connection", 0) + 1
+                if stats.errors["connection"] == 1:
+                    print(f"candidate {i} failed: {e!r}")
+            finally:
+                await client.close()
+
+    await asyncio.gather(*(one(i) for i in range(args.candidates)))
+    return stats
+
+
+def _start_local_server():
+    """Run api_server in a background thread; returns (port, stop)."""
+    from api_server import APIServer, serve
+    from orchestrator_agent import OrchestratorAgent
+
+    orch = OrchestratorAgent(QUESTION_BANK, llm_adapter="mock")
+    ready = threading.Event()
+    holder = {}
+
+    def on_ready(port):
+        holder["port"] = port
+        ready.set()
+
+    def run():
+        loop = asyncio.new_event_loop()
+        holder["loop"] = loop
+        holder["task"] = loop.create_task(serve(APIServer(orch), "127.0.0.1", 0, on_ready))
+        try:
+            loop.run_until_complete(holder["task"])
+        except asyncio.CancelledError:
+            pass
+        finally:
+            loop.close()
+
+    thread = threading.Thread(target=run, name="api-server", daemon=True)
+    thread.start()
+    ready.wait(30)
+
+    def stop():
+        holder["loop"].call_soon_threadsafe(holder["task"].cancel)
+        thread.join(10)
+        orch.memory.writer.close()
+        return orch
+
+    return holder["port"], stop
+
+
+def _report(stats: LoadStats, elapsed: float, args):
+    print(f"{args.candidates} candidates (concurrency {args.concurrency}, {args.questions} questions each): "
+          f"{stats.requests} requests in {elapsed:.2f}s = {stats.requests / elapsed:,.0f} req/s, "
+          f"{args.candidates / elapsed:,.1f} interviews/s")
+    print(f"{'endpoint':<10}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'errors':>8}")
+    for endpoint in ("start", "next", "answer", "finish"):
+        h = stats.latency.get(endpoint)
+        if h is None:
+            continue
+        s = h.summary()
+        print(f"{endpoint:<10}{s['count']:>8}{s['p50_ms']:>10.2f}{s['p95_ms']:>10.2f}{s['p99_ms']:>10.2f}"
+              f"{s['max_ms']:>10.2f}{stats.errors.get(endpoint, 0):>8}")
+    if stats.errors.get("connection"):
+        print(f"connection errors: {stats.errors['connection']}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--url", help="target server (default: start one in-process with the mock adapter)")
+    ap.add_argument("--candidates", type=int, default=2000)
+    ap.add_argument("--concurrency", type=int, default=500, help="candidates in flight at once")
+    ap.add_argument("--questions", type=int, default=3)
+    ap.add_argument("--think-ms", type=float, default=0.0, help="mean pause between question and answer")
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+    random.seed(args.seed)
+
+    if args.url:
+        target = urlparse(args.url)
+        start = time.perf_counter()
+        stats = asyncio.run(run_load(target.hostname, target.port or 80, args))
+        _report(stats, time.perf_counter() - start, args)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # MemoryAgent keeps its database under ./storage: run inside a scratch directory
+        os.chdir(tmp)
+        port, stop = _start_local_server()
+        start = time.perf_counter()
+        stats = asyncio.run(run_load("127.0.0.1", port, args))
+        elapsed = time.perf_counter() - start
+        stop()
+        _report(stats, elapsed, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+# compact_bank.py
+# Compact on-disk question bank: one file, memory-mapped, nothing parsed up front.
+#
+#   header     "<8sQQ"  magic, directory offset, directory length
+#   text       UTF-8 blobs (ids, question texts, reference answers, extra-field JSON)
+#   buckets    per (domain, difficulty), domain by domain: fixed-size rows of
+#              (offset, length) pairs for id / q / answer / extra
+#   id table   fixed-size entries sorted by id bytes -> (domain no, difficulty no, position)
+#   directory  small JSON: domains, their difficulties and bucket table offsets
+#
+# Opening reads the header and the directory only. A bucket is a lazy sequence over its
+# row table, so drawing a question unpacks one row and decodes that question's text from
+# the mapping; get(id) binary-searches the id table. The OS pages in only what is touched.
+#
+#   cd src && python -m tools.build_compact_bank tools/question_bank.json tools/question_bank.qbank
+import os
+import json
+import mmap
+import struct
+import threading
+from collections.abc import Sequence
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+MAGIC = b"QBANK\x00\x01\x00"
+HEADER = struct.Struct("<8sQQ")
+ROW = struct.Struct("<QIQIQIQI")      # id, q, answer, extra: (offset, length) each
+ID_ENTRY = struct.Struct("<QIHHI")    # id offset, id length, domain no, difficulty no, position
+CORE_FIELDS = ("id", "q", "answer")
+
+
+def is_compact_bank(path: Path) -> bool:
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+class LazyBucket(Sequence):
+    """Read-only sequence of one (domain, difficulty) bucket; items are built on access."""
+    __slots__ = ("_bank", "_offset", "_count")
+
+    def __init__(self, bank: "CompactBank", offset: int, count: int):
+        self._bank = bank
+        self._offset = offset
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._count))]
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        return self._bank.question_at(self._offset + i * ROW.size)
+
+
+class CompactBank:
+    """
+    Memory-mapped bank with the lookup interface of interviewer_agent.QuestionIndex
+    (bucket, difficulties, get). Materialized questions are plain dicts, kept in an LRU
+    of cache_size entries (QUESTION_CACHE_SIZE env) so sessions share the same objects.
+    """
+
+    def __init__(self, path: Path, cache_size: int = None):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, dir_offset, dir_length = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a compact question bank")
+        directory = json.loads(self._mm[dir_offset:dir_offset + dir_length])
+        self.count = directory["count"]
+        self.difficulties: Dict[str, Tuple[str, ...]] = {}
+        self._tables: Dict[Tuple[str, str], Tuple[int, int]] = {}
+        self._table_offsets: List[List[int]] = []
+        for domain, levels in directory["domains"]:
+            self.difficulties[domain] = tuple(d for d, _, _ in levels)
+            self._table_offsets.append([off for _, off, _ in levels])
+            for difficulty, off, count in levels:
+                self._tables[(domain, difficulty)] = (off, count)
+        self._ids_offset, self._ids_count = directory["ids"]
+        self._buckets: Dict[Tuple[str, str], LazyBucket] = {}
+        self._lock = threading.Lock()
+        size = cache_size if cache_size is not None else int(os.getenv("QUESTION_CACHE_SIZE", "4096"))
+        self.question_at = lru_cache(maxsize=size)(self._materialize)
+
+    # ------------------------------
+    # QuestionIndex interface
+    # ------------------------------
+    def bucket(self, domain: str, difficulty: str) -> Sequence:
+        key = (domain, difficulty)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            off, count = self._tables.get(key, (0, 0))
+            with self._lock:
+                bucket = self._buckets.setdefault(key, LazyBucket(self, off, count))
+        return bucket
+
+    def get(self, question_id: str) -> Optional[Dict[str, Any]]:
+        if question_id is None:
+            return None
+        target = str(question_id).encode("utf-8")
+        lo, hi = 0, self._ids_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            id_off, id_len, domain_no, difficulty_no, pos = ID_ENTRY.unpack_from(
+                self._mm, self._ids_offset + mid * ID_ENTRY.size)
+            key = self._mm[id_off:id_off + id_len]
+            if key < target:
+                lo = mid + 1
+            elif key > target:
+                hi = mid
+            else:
+                return self.question_at(self._table_offsets[domain_no][difficulty_no] + pos * ROW.size)
+        return None
+
+    # ------------------------------
+    # rows
+    # ------------------------------
+    def _text(self, off: int, length: int) -> str:
+        return self._mm[off:off + length].decode("utf-8")
+
+    def _materialize(self, row_offset: int) -> Dict[str, Any]:
+        id_off, id_len, q_off, q_len, a_off, a_len, x_off, x_len = ROW.unpack_from(self._mm, row_offset)
+        q = {"id": self._text(id_off, id_len) if id_len else None,
+             "q": self._text(q_off, q_len), "answer": self._text(a_off, a_len)}
+        if x_len:
+            q.update(json.loads(self._text(x_off, x_len)))
+        return q
+
+    def iter_bucket(self, domain: str, difficulty: str) -> Iterator[Dict[str, Any]]:
+        """One bucket's questions in order, bypassing the LRU (for one-off index builds)."""
+        off, count = self._tables.get((domain, difficulty), (0, 0))
+        for i in range(count):
+            yield self._materialize(off + i * ROW.size)
+
+    def iter_questions(self) -> Iterator[Dict[str, Any]]:
+        """Every question in file order, without going through (and flushing) the LRU."""
+        for domain, levels in self.difficulties.items():
+            for difficulty in levels:
+                off, count = self._tables[(domain, difficulty)]
+                for i in range(count):
+                    yield self._materialize(off + i * ROW.size)
+
+    def close(self):
+        self.question_at.cache_clear()
+        self._mm.close()
+
+
+# ------------------------------
+# converter
+# ------------------------------
+def write_compact_bank(bank: Dict[str, Dict[str, List[Dict[str, Any]]]], out_path: Path) -> Dict[str, Any]:
+    """Write a parsed JSON bank in the compact format (atomically: temp file + rename)."""
+    out_path = Path(out_path)
+    tmp = out_path.with_name(out_path.name + ".tmp")
+    rows: Dict[Tuple[str, str], List[tuple]] = {}
+    ids: List[Tuple[bytes, int, int, int, int]] = []
+    count = 0
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, 0, 0))
+
+        def blob(data: bytes) -> Tuple[int, int]:
+            if not data:
+                return 0, 0
+            off = f.tell()
+            f.write(data)
+            return off, len(data)
+
+        for domain, levels in bank.items():
+            for difficulty, questions in levels.items():
+                bucket = rows.setdefault((domain, difficulty), [])
+                for q in questions or ():
+                    qid = q.get("id")
+                    id_bytes = str(qid).encode("utf-8") if qid is not None else b""
+                    extra = {k: v for k, v in q.items() if k not in CORE_FIELDS}
+                    id_ref = blob(id_bytes)
+                    bucket.append(id_ref + blob((q.get("q") or "").encode("utf-8"))
+                                  + blob((q.get("answer") or "").encode("utf-8"))
+                                  + blob(json.dumps(extra).encode("utf-8") if extra else b""))
+                    if id_bytes:
+                        ids.append((id_bytes, id_ref[0], len(rows) - 1, len(bucket) - 1))
+                    count += 1
+
+        directory = {"version": 1, "count": count, "domains": []}
+        table_pos: Dict[Tuple[str, str], Tuple[int, int]] = {}
+        for domain_no, (domain, levels) in enumerate(bank.items()):
+            entry = []
+            for difficulty_no, difficulty in enumerate(levels):
+                bucket = rows[(domain, difficulty)]
+                off = f.tell()
+                f.write(b"".join(ROW.pack(*r) for r in bucket))
+                entry.append([difficulty, off, len(bucket)])
+                table_pos[(domain, difficulty)] = (domain_no, difficulty_no)
+            directory["domains"].append([domain, entry])
+
+        # ids were numbered by bucket creation order; map them to (domain no, difficulty no)
+        bucket_keys = list(rows)
+        ids.sort(key=lambda e: e[0])
+        seen = set()
+        id_entries = []
+        for id_bytes, id_off, bucket_no, pos in ids:
+            if id_bytes in seen:
+                continue  # first occurrence wins, as in QuestionIndex
+            seen.add(id_bytes)
+            domain_no, difficulty_no = table_pos[bucket_keys[bucket_no]]
+            id_entries.append(ID_ENTRY.pack(id_off, len(id_bytes), domain_no, difficulty_no, pos))
+        directory["ids"] = [f.tell(), len(id_entries)]
+        f.write(b"".join(id_entries))
+
+        dir_bytes = json.dumps(directory).encode("utf-8")
+        dir_offset = f.tell()
+        f.write(dir_bytes)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, dir_offset, len(dir_bytes)))
+    os.replace(tmp, out_path)
+    return {"questions": count, "domains": len(bank), "bytes": out_path.stat().st_size}
+
+
+def reference_index_path(bank_path: Path) -> Path:
+    """Where the memory-mapped reference-answer index of a compact bank lives (<stem>_refindex.npy/.json)."""
+    bank_path = Path(bank_path)
+    return bank_path.with_name(bank_path.stem + "_refindex")
+
+
+def convert_bank(json_path: Path, out_path: Path, reference_index: bool = True) -> Dict[str, Any]:
+    """JSON bank -> compact bank, plus its prebuilt similarity index when NumPy is available."""
+    with open(json_path, "r", encoding="utf-8") as f:
+        bank = json.load(f)
+    stats = write_compact_bank(bank, out_path)
+    from similarity_index import NUMPY_AVAILABLE, ReferenceIndex
+    if reference_index and NUMPY_AVAILABLE:
+        # written after the bank so load_or_build sees it as up to date
+        ReferenceIndex.from_bank(bank).save(reference_index_path(out_path))
+        stats["reference_index"] = str(reference_index_path(out_path))
+    return stats
@@ -0,0 +1,79 @@
+# deadlines.py
+# One daemon thread firing callbacks at monotonic-clock deadlines (min-heap, lazy cancellation).
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, Dict, Hashable
+
+from utils import logger
+
+
+class DeadlineTimer:
+    """
+    schedule(key, deadline) replaces any earlier deadline for key and returns a token;
+    at the deadline callback(key, token) runs on the timer thread. cancel(key) drops it.
+    Superseded heap entries are skipped when they surface instead of being removed, so
+    scheduling and cancelling are O(log n) / O(1) and the thread sleeps until the next
+    deadline instead of polling.
+    """
+
+    def __init__(self, callback: Callable[[Hashable, int], None]):
+        self.callback = callback
+        self._heap = []
+        self._tokens: Dict[Hashable, int] = {}
+        self._seq = itertools.count(1)
+        self._cond = threading.Condition()
+        self._closed = False
+        self.fired = 0
+        self._thread = threading.Thread(target=self._run, name="deadline-timer", daemon=True)
+        self._thread.start()
+
+    def schedule(self, key: Hashable, deadline: float) -> int:
+        token = next(self._seq)
+        with self._cond:
+            self._tokens[key] = token
+            heapq.heappush(self._heap, (deadline, token, key))
+            # only wake the thread if this became the earliest deadline
+            if self._heap[0][1] == token:
+                self._cond.notify()
+        return token
+
+    def cancel(self, key: Hashable):
+        with self._cond:
+            self._tokens.pop(key, None)
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._tokens)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed:
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    deadline, token, key = self._heap[0]
+                    if self._tokens.get(key) != token:
+                        heapq.heappop(self._heap)
+                        continue
+                    delay = deadline - time.monotonic()
+                    if delay <= 0:
+                        heapq.heappop(self._heap)
+                        del self._tokens[key]
+                        break
+                    self._cond.wait(delay)
+                if self._closed:
+                    return
+                self.fired += 1
+            try:
+                self.callback(key, token)
+            except Exception:
+                logger.exception("Deadline callback for %s failed", key)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout=1)
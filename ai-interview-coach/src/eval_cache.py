@@ -0,0 +1,185 @@
+# eval_cache.py
+# Two-tier cache for evaluation results: in-memory LRU in front of an optional SQLite table.
+import os
+import time
+import json
+import sqlite3
+import hashlib
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Any, Optional
+
+
+def normalize_answer(answer: str) -> str:
+    """Case- and whitespace-insensitive form used for cache keys."""
+    return " ".join((answer or "").lower().split())
+
+
+def make_cache_key(question_id: str, answer: str, adapter_name: str) -> str:
+    answer_hash = hashlib.sha1(normalize_answer(answer).encode("utf-8")).hexdigest()
+    return f"{adapter_name}|{question_id}|{answer_hash}"
+
+
+class SQLiteCacheTier:
+    """
+    Persistent tier. Rows expire by TTL; when the table grows past max_entries
+    the least recently used rows are pruned (checked every prune_every writes).
+    """
+
+    def __init__(self, db_path: Path, ttl: float, max_entries: int = 100000, prune_every: int = 500):
+        db_path = Path(db_path)
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.prune_every = prune_every
+        self._writes = 0
+        self._lock = Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS eval_cache (
+                cache_key TEXT PRIMARY KEY,
+                value TEXT,
+                expires_at REAL,
+                last_used REAL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_eval_cache_last_used ON eval_cache(last_used)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM eval_cache WHERE cache_key = ?", (key,)
+            ).fetchone()
+            if not row:
+                return None
+            if row[1] is not None and row[1] < now:
+                self._conn.execute("DELETE FROM eval_cache WHERE cache_key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE eval_cache SET last_used = ? WHERE cache_key = ?", (now, key))
+            self._conn.commit()
+        return json.loads(row[0])
+
+    def put(self, key: str, value: Dict[str, Any]):
+        now = time.time()
+        expires_at = now + self.ttl if self.ttl else None
+        with self._lock:
+            self._conn.execute(
+                "REPLACE INTO eval_cache (cache_key, value, expires_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), expires_at, now)
+            )
+            self._writes += 1
+            if self._writes % self.prune_every == 0:
+                self._prune(now)
+            self._conn.commit()
+
+    def _prune(self, now: float):
+        self._conn.execute("DELETE FROM eval_cache WHERE expires_at IS NOT NULL AND expires_at < ?", (now,))
+        self._conn.execute("""
+            DELETE FROM eval_cache WHERE cache_key IN (
+                SELECT cache_key FROM eval_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?
+            )
+        """, (self.max_entries,))
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM eval_cache")
+            self._conn.commit()
+
+
+class EvalCache:
+    """
+    LRU + TTL cache of evaluation results keyed on (adapter, question id, normalized answer hash).
+    - get(key) / put(key, value)
+    - stats() -> hit/miss/eviction counters
+    An optional SQLiteCacheTier is consulted on memory misses and promoted on hit.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 3600.0, persistent: SQLiteCacheTier = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.persistent = persistent
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, value)
+        self._lock = Lock()
+        self.hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    make_key = staticmethod(make_cache_key)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                if item[0] is None or item[0] >= now:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return dict(item[1])
+                del self._data[key]
+                self.expirations += 1
+        if self.persistent is not None:
+            value = self.persistent.get(key)
+            if value is not None:
+                with self._lock:
+                    self.persistent_hits += 1
+                self._put_memory(key, value)
+                return dict(value)
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, value: Dict[str, Any]):
+        self._put_memory(key, value)
+        if self.persistent is not None:
+            self.persistent.put(key, value)
+
+    def _put_memory(self, key: str, value: Dict[str, Any]):
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (expires_at, dict(value))
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+        if self.persistent is not None:
+            self.persistent.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.persistent_hits + self.misses
+            return {
+                "size": len(self._data),
+                "hits": self.hits,
+                "persistent_hits": self.persistent_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round((self.hits + self.persistent_hits) / lookups, 4) if lookups else 0.0,
+            }
+
+
+def cache_from_env(mode: str = None, db_path: Path = None) -> Optional[EvalCache]:
+    """
+    Build the cache selected by EVAL_CACHE: "off" (default), "memory" or "sqlite".
+    Sizes/TTL come from EVAL_CACHE_SIZE / EVAL_CACHE_TTL; the SQLite file from EVAL_CACHE_DB.
+    """
+    mode = (mode or os.getenv("EVAL_CACHE") or "off").lower()
+    if mode in ("off", "none", "0", "false"):
+        return None
+    size = int(os.getenv("EVAL_CACHE_SIZE", "10000"))
+    ttl = float(os.getenv("EVAL_CACHE_TTL", "86400"))
+    persistent = None
+    if mode == "sqlite":
+        db_path = db_path or Path(os.getenv("EVAL_CACHE_DB", "storage/eval_cache.db"))
+        persistent = SQLiteCacheTier(db_path, ttl=ttl, max_entries=int(os.getenv("EVAL_CACHE_DB_SIZE", "100000")))
+    return EvalCache(max_entries=size, ttl=ttl, persistent=persistent)
@@ -0,0 +1,165 @@
+# eval_stream.py
+# Streaming evaluation events and an incremental parser for the grader's JSON reply.
+#
+# Every evaluate_stream() yields dict events, in arrival order:
+#   {"type": "score", "score": 7}
+#   {"type": "feedback", "text": "<next piece of feedback>"}
+#   {"type": "suggestion", "text": "<one complete suggestion>"}
+#   {"type": "reset"}                     # a failed stream was replaced; drop what was shown
+#   {"type": "result", "result": {...}}   # always last; identical to the non-streaming result
+import json
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+
+class EvaluationStreamParser:
+    """
+    Feed raw text chunks of a {"score", "feedback", "suggestions"} JSON object as they arrive.
+    feed() returns the events that became available: feedback is emitted character-wise as
+    its string streams in, the score once its number is complete, each suggestion once its
+    string closes. Text before the first "{" (e.g. a ```json fence) and after the object is
+    ignored; `value` holds json.loads() of the whole object once it has closed.
+    """
+
+    def __init__(self):
+        self.text: List[str] = []
+        self.started = False
+        self.done = False
+        self.value: Optional[Dict[str, Any]] = None
+        self.depth = 0
+        self.in_string = False
+        self.escape = ""
+        self.after_colon = False
+        self.key = None
+        self.last_string = None
+        self.chars: List[str] = []
+        self.scalar: List[str] = []
+        self._feedback: List[str] = []
+        self._events: List[Dict[str, Any]] = []
+
+    def _emit(self, event: Dict[str, Any]):
+        self._flush_feedback()
+        self._events.append(event)
+
+    def _flush_feedback(self):
+        if self._feedback:
+            self._events.append({"type": "feedback", "text": "".join(self._feedback)})
+            self._feedback = []
+
+    def _string_char(self, c: str):
+        self.chars.append(c)
+        if self.depth == 1 and self.after_colon and self.key == "feedback":
+            self._feedback.append(c)
+
+    def _close_string(self):
+        s = "".join(self.chars)
+        self.last_string = s
+        if self.depth == 1 and not self.after_colon:
+            self.key = s
+        elif self.depth == 2 and self.key == "suggestions":
+            self._emit({"type": "suggestion", "text": s})
+
+    def _finish_scalar(self):
+        if self.depth == 1 and self.key == "score" and self.scalar:
+            try:
+                self._emit({"type": "score", "score": int(float("".join(self.scalar)))})
+            except ValueError:
+                pass
+        self.scalar = []
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        for ch in chunk:
+            if self.done:
+                break
+            if not self.started:
+                if ch != "{":
+                    continue
+                self.started = True
+            self.text.append(ch)
+            if self.in_string:
+                if self.escape:
+                    self.escape += ch
+                    if (self.escape[1] != "u" and len(self.escape) == 2) or len(self.escape) == 6:
+                        self._string_char(json.loads('"' + self.escape + '"'))
+                        self.escape = ""
+                elif ch == "\\":
+                    self.escape = ch
+                elif ch == '"':
+                    self.in_string = False
+                    self._close_string()
+                else:
+                    self._string_char(ch)
+            elif ch == '"':
+                self.in_string = True
+                self.chars = []
+            elif ch in "{[":
+                self.depth += 1
+            elif ch in "}]":
+                self._finish_scalar()
+                self.depth -= 1
+                if self.depth == 0:
+                    self.done = True
+                    self.value = json.loads("".join(self.text))
+            elif self.depth == 1 and ch == ":":
+                self.after_colon = True
+            elif self.depth == 1 and ch == ",":
+                self._finish_scalar()
+                self.after_colon = False
+            elif self.depth == 1 and self.after_colon and not ch.isspace():
+                self.scalar.append(ch)
+        self._flush_feedback()
+        events, self._events = self._events, []
+        return events
+
+    def close(self) -> Dict[str, Any]:
+        """The parsed object; raises ValueError if the stream ended before it closed."""
+        if not self.done:
+            raise ValueError("evaluation stream ended before the JSON object was complete")
+        return self.value
+
+
+def events_from_result(result: Dict[str, Any], delay: float = 0.0, words_per_chunk: int = 3) -> Iterator[Dict[str, Any]]:
+    """Replay a finished result as stream events (for graders that cannot stream natively)."""
+    yield {"type": "score", "score": result.get("score", 0)}
+    words = str(result.get("feedback", "")).split(" ")
+    for i in range(0, len(words), words_per_chunk):
+        if delay:
+            time.sleep(delay)
+        piece = " ".join(words[i:i + words_per_chunk])
+        yield {"type": "feedback", "text": piece if i + words_per_chunk >= len(words) else piece + " "}
+    for s in result.get("suggestions", []) or []:
+        yield {"type": "suggestion", "text": s}
+    yield {"type": "result", "result": result}
+
+
+def events_from_text(chunks: Iterable[str], parse_result) -> Iterator[Dict[str, Any]]:
+    """Parse streamed JSON text into events; parse_result(value) builds the final result."""
+    parser = EvaluationStreamParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+        if parser.done:
+            break
+    yield {"type": "result", "result": parse_result(parser.close())}
+
+
+def stream_with_fallback(stream: Iterable[Dict[str, Any]], fallback) -> Iterator[Dict[str, Any]]:
+    """
+    Pass `stream` through; if it fails, replay fallback()'s result instead. When partial
+    events were already sent, a {"type": "reset"} event tells the consumer to discard them.
+    """
+    sent = False
+    try:
+        for event in stream:
+            sent = True
+            yield event
+        return
+    except Exception as e:
+        print("Streaming evaluation failed, falling back due to:", e)
+    finally:
+        # a consumer that stops early closes the source now, not whenever it is collected
+        close = getattr(stream, "close", None)
+        if close is not None:
+            close()
+    if sent:
+        yield {"type": "reset"}
+    yield from events_from_result(fallback())
@@ -1,16 +1,83 @@
 # evaluator_agent.py
-from llm_adapters import get_llm
+from llm_adapters import get_llm, SimilarityLLM
+from eval_cache import EvalCache, cache_from_env
+from grading_cascade import GradingCascade, cascade_from_env
+from instrumentation import metrics
+from eval_stream import events_from_result
 import os
 import json
+import asyncio
+import hashlib
+
+_DEFAULT = object()
 
 class EvaluatorAgent:
-    def __init__(self, llm_adapter: str = None):
+    def __init__(self, llm_adapter: str = None, cache: EvalCache = _DEFAULT,
+                 cascade: GradingCascade = _DEFAULT):
         adapter = llm_adapter or os.getenv("LLM_ADAPTER", "mock")
         self.llm = get_llm(adapter)
+        # cache: an EvalCache, None to disable, or default -> selected by EVAL_CACHE env
+        self.cache = cache_from_env() if cache is _DEFAULT else cache
+        if self.cache is not None and not getattr(self.llm, "deterministic", True):
+            # a noisy adapter (MockLLM unless MOCK_DETERMINISTIC=1) would disagree with its cache
+            self.cache = None
+        # cascade: cheap tiers tried before the adapter; None to disable, default -> EVAL_CASCADE env
+        if cascade is _DEFAULT:
+            # a similarity tier in front of the similarity adapter would only duplicate work
+            cascade = cascade_from_env(skip=("similarity",) if isinstance(self.llm, SimilarityLLM) else ())
+        self.cascade = cascade
+        # the similarity adapter finds the question's reference vector by id
+        self._pass_ids = isinstance(self.llm, SimilarityLLM)
+
+    @property
+    def adapter_name(self) -> str:
+        return getattr(self.llm, "name", type(self.llm).__name__)
+
+    def attach_reference_index(self, index):
+        """Hand the bank's precomputed reference vectors to adapters that can use them."""
+        if hasattr(self.llm, "attach_index"):
+            self.llm.attach_index(index)
+        if self.cascade is not None:
+            self.cascade.attach_index(index)
+
+    def _cache_key(self, question: dict, user_answer: str) -> str:
+        qid = question.get("id") or hashlib.sha1(question.get("q", "").encode("utf-8")).hexdigest()
+        return self.cache.make_key(qid, user_answer, self.adapter_name)
+
+    def _cache_get(self, question: dict, user_answer: str):
+        if self.cache is None:
+            return None, None
+        key = self._cache_key(question, user_answer)
+        return key, self.cache.get(key)
+
+    def _cache_put(self, key: str, raw: dict, result: dict):
+        # results produced by an adapter's degraded fallback are not worth pinning
+        if key is not None and not raw.get("fallback"):
+            self.cache.put(key, result)
+
+    def _cascade_grade(self, triple, question: dict):
+        """Raw result from the first confident cheap tier, or None when the adapter must grade."""
+        if self.cascade is None:
+            return None
+        with metrics.span("evaluator.cascade"):
+            verdict = self.cascade.grade(*triple, question_id=question.get("id"))
+        return None if verdict is None else verdict[0]
+
+    def _id_kwargs(self, question: dict) -> dict:
+        return {"question_id": question.get("id")} if self._pass_ids else {}
 
     def evaluate(self, question: dict, user_answer: str) -> dict:
+        key, cached = self._cache_get(question, user_answer)
+        if cached is not None:
+            return cached
+
         qtext = question.get("q", "")
         correct = question.get("answer", "")
+        raw = self._cascade_grade((qtext, user_answer, correct), question)
+        if raw is not None:
+            result = self._finalize(raw)
+            self._cache_put(key, raw, result)
+            return result
 
         prompt = f"""
 You are an interview evaluator. Compare the USER ANSWER with the CORRECT ANSWER.
@@ -34,8 +101,129 @@ CORRECT ANSWER: {correct}
 USER ANSWER: {user_answer}
 """
 
-        result = self.llm.evaluate(qtext, user_answer, correct)
+        with metrics.span("evaluator.llm", adapter=self.adapter_name):
+            raw = self.llm.evaluate(qtext, user_answer, correct, **self._id_kwargs(question))
+        result = self._finalize(raw)
+        self._cache_put(key, raw, result)
+        return result
+
+    async def aevaluate(self, question: dict, user_answer: str) -> dict:
+        """
+        Async counterpart of evaluate(). Adapters without a native aevaluate
+        are run on a worker thread so the event loop is never blocked.
+        """
+        key, cached = self._cache_get(question, user_answer)
+        if cached is not None:
+            return cached
+        triple = (question.get("q", ""), user_answer, question.get("answer", ""))
+        raw = self._cascade_grade(triple, question)
+        if raw is None:
+            raw = await self._aevaluate_raw(triple, self._id_kwargs(question))
+        result = self._finalize(raw)
+        self._cache_put(key, raw, result)
+        return result
+
+    def evaluate_stream(self, question: dict, user_answer: str):
+        """
+        Generator form of evaluate(): yields score/feedback/suggestion events as the adapter
+        produces them and ends with {"type": "result", "result": ...}, the same dict
+        evaluate() would return. Cached and cascade-settled answers are replayed at once.
+        """
+        key, cached = self._cache_get(question, user_answer)
+        if cached is not None:
+            yield from events_from_result(cached)
+            return
+        triple = (question.get("q", ""), user_answer, question.get("answer", ""))
+        raw = self._cascade_grade(triple, question)
+        if raw is not None:
+            result = self._finalize(raw)
+            self._cache_put(key, raw, result)
+            yield from events_from_result(result)
+            return
+        kwargs = self._id_kwargs(question)
+        # span covers the whole stream, including time the consumer spends between events
+        with metrics.span("evaluator.llm", adapter=self.adapter_name, mode="stream"):
+            if hasattr(self.llm, "evaluate_stream"):
+                stream = self.llm.evaluate_stream(*triple, **kwargs)
+            else:
+                stream = events_from_result(self.llm.evaluate(*triple, **kwargs))
+            for event in stream:
+                if event["type"] != "result":
+                    yield event
+                    continue
+                raw = event["result"]
+                result = self._finalize(raw)
+                self._cache_put(key, raw, result)
+                yield {"type": "result", "result": result}
+
+    def _batch_plan(self, items):
+        """
+        Split (question, answer) pairs into results settled by the cache or the cascade
+        and the triples that still need the adapter.
+        """
+        results, keys, pending, triples = [None] * len(items), [None] * len(items), [], []
+        for i, (question, user_answer) in enumerate(items):
+            keys[i], cached = self._cache_get(question, user_answer)
+            if cached is not None:
+                results[i] = cached
+                continue
+            triple = (question.get("q", ""), user_answer, question.get("answer", ""))
+            raw = self._cascade_grade(triple, question)
+            if raw is not None:
+                results[i] = self._finalize(raw)
+                self._cache_put(keys[i], raw, results[i])
+            else:
+                pending.append(i)
+                triples.append(triple)
+        return results, keys, pending, triples
+
+    def _batch_kwargs(self, items, pending) -> dict:
+        return {"question_ids": [items[i][0].get("id") for i in pending]} if self._pass_ids else {}
+
+    def _batch_merge(self, results, keys, pending, raws):
+        for i, raw in zip(pending, raws):
+            results[i] = self._finalize(raw)
+            self._cache_put(keys[i], raw, results[i])
+        return results
+
+    def evaluate_batch(self, items) -> list:
+        """
+        Grade a list of (question dict, user answer) pairs. Cache misses are sent to
+        the adapter as one packed request when it supports evaluate_batch.
+        """
+        items = list(items)
+        results, keys, pending, triples = self._batch_plan(items)
+        if not triples:
+            return results
+        with metrics.span("evaluator.llm_batch", adapter=self.adapter_name):
+            if hasattr(self.llm, "evaluate_batch"):
+                raws = self.llm.evaluate_batch(triples, **self._batch_kwargs(items, pending))
+            else:
+                raws = [self.llm.evaluate(*t) for t in triples]
+        return self._batch_merge(results, keys, pending, raws)
+
+    async def aevaluate_batch(self, items) -> list:
+        items = list(items)
+        results, keys, pending, triples = self._batch_plan(items)
+        if not triples:
+            return results
+        with metrics.span("evaluator.llm_batch", adapter=self.adapter_name, mode="async"):
+            if hasattr(self.llm, "aevaluate_batch"):
+                raws = await self.llm.aevaluate_batch(triples, **self._batch_kwargs(items, pending))
+            elif hasattr(self.llm, "evaluate_batch"):
+                raws = await asyncio.to_thread(self.llm.evaluate_batch, triples, **self._batch_kwargs(items, pending))
+            else:
+                raws = await asyncio.gather(*[self._aevaluate_raw(t) for t in triples])
+        return self._batch_merge(results, keys, pending, raws)
+
+    async def _aevaluate_raw(self, triple, kwargs: dict = None):
+        kwargs = kwargs or {}
+        with metrics.span("evaluator.llm", adapter=self.adapter_name, mode="async"):
+            if hasattr(self.llm, "aevaluate"):
+                return await self.llm.aevaluate(*triple, **kwargs)
+            return await asyncio.to_thread(self.llm.evaluate, *triple, **kwargs)
 
+    def _finalize(self, result: dict) -> dict:
         score = int(result.get("score", 0))
         score = max(0, min(score, 10))  # clamp to 0–10 safely
 
@@ -0,0 +1,145 @@
+# grading_cascade.py
+# Cheap grading tiers tried before the configured LLM adapter: rule checks, then local
+# similarity. A tier settles an answer only when its confidence reaches the tier's threshold.
+import os
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+
+from llm_adapters import SimilarityLLM
+from similarity_index import text_similarity
+
+TIMEOUT_ANSWER = "TIMEOUT"
+MIN_ANSWER_CHARS = 5  # same cut-off as mock_evaluate_answer
+
+
+class RuleTier:
+    """
+    Deterministic checks: timed-out, empty/too-short, and near-verbatim copies of the
+    reference answer. Returns (result, confidence) or None when no rule applies.
+    """
+    name = "rules"
+
+    def __init__(self, min_chars: int = MIN_ANSWER_CHARS, verbatim_similarity: float = 0.9):
+        self.min_chars = min_chars
+        self.verbatim_similarity = verbatim_similarity
+
+    def grade(self, question_text: str, user_answer: str, correct_answer: str,
+              question_id: str = None) -> Optional[Tuple[Dict[str, Any], float]]:
+        answer = (user_answer or "").strip()
+        if answer == TIMEOUT_ANSWER:
+            return {"score": 0, "feedback": "No answer was submitted before the time limit.",
+                    "suggestions": ["Practice answering within the time limit."]}, 1.0
+        if len(answer) < self.min_chars:
+            return {"score": 0, "feedback": "Answer too short.",
+                    "suggestions": ["Provide more detail in your explanation."]}, 1.0
+        if correct_answer:
+            sim = text_similarity(answer, correct_answer)
+            if sim >= self.verbatim_similarity:
+                return {"score": 10, "feedback": "Your answer matches the reference answer.",
+                        "suggestions": ["Explain the idea in your own words to show understanding."]}, sim
+        return None
+
+
+class SimilarityTier:
+    """
+    Local similarity grading. Inside the ambiguous band between the grader's low and high
+    bounds it abstains; outside it, confidence is the distance from the band edge as a
+    fraction of the way to 0 or 1 (0 at the edge, 1 at sim 0 or 1), so a threshold of 0.5
+    settles only answers at least halfway out.
+    """
+    name = "similarity"
+
+    def __init__(self, grader: SimilarityLLM = None):
+        self.grader = grader or SimilarityLLM()
+
+    def attach_index(self, index):
+        self.grader.attach_index(index)
+
+    def grade(self, question_text: str, user_answer: str, correct_answer: str,
+              question_id: str = None) -> Optional[Tuple[Dict[str, Any], float]]:
+        g = self.grader
+        sim = g.similarity(question_text, user_answer, correct_answer, question_id)
+        if sim <= g.low:
+            confidence = (g.low - sim) / g.low if g.low > 0 else 1.0
+        elif sim >= g.high:
+            confidence = (sim - g.high) / (1.0 - g.high) if g.high < 1.0 else 1.0
+        else:
+            return None
+        return g.result_for(g.score_for(sim), sim), min(1.0, max(0.0, confidence))
+
+
+TIERS = {"rules": RuleTier, "similarity": SimilarityTier}
+DEFAULT_THRESHOLDS = {"rules": 0.9, "similarity": 0.5}
+
+
+class GradingCascade:
+    """
+    Ordered (tier, threshold) pairs.
+    - grade(question_text, user_answer, correct_answer, question_id=None) -> (result, tier name) or None
+      when every tier abstained or was not confident enough (the answer goes to the LLM)
+    - stats(): per-tier hit counts/rates and how many answers fell through
+    """
+
+    def __init__(self, tiers: List[Tuple[Any, float]]):
+        self.tiers = list(tiers)
+        self._lock = Lock()
+        self.total = 0
+        self.fallthrough = 0
+        self._hits = {tier.name: 0 for tier, _ in self.tiers}
+
+    @property
+    def names(self) -> List[str]:
+        return [tier.name for tier, _ in self.tiers]
+
+    def attach_index(self, index):
+        for tier, _ in self.tiers:
+            if hasattr(tier, "attach_index"):
+                tier.attach_index(index)
+
+    def grade(self, question_text: str, user_answer: str, correct_answer: str,
+              question_id: str = None) -> Optional[Tuple[Dict[str, Any], str]]:
+        for tier, threshold in self.tiers:
+            verdict = tier.grade(question_text, user_answer, correct_answer, question_id)
+            if verdict is not None and verdict[1] >= threshold:
+                with self._lock:
+                    self.total += 1
+                    self._hits[tier.name] += 1
+                return verdict[0], tier.name
+        with self._lock:
+            self.total += 1
+            self.fallthrough += 1
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.total
+            rate = lambda n: round(n / total, 4) if total else 0.0
+            return {
+                "total": total,
+                "tiers": {name: {"hits": n, "hit_rate": rate(n)} for name, n in self._hits.items()},
+                "fallthrough": {"count": self.fallthrough, "rate": rate(self.fallthrough)},
+            }
+
+
+def cascade_from_spec(spec: str, skip: Tuple[str, ...] = ()) -> Optional[GradingCascade]:
+    """
+    Build a cascade from "tier[:threshold],..." e.g. "rules,similarity:0.7".
+    "off" or an empty spec disables it; tiers named in skip are left out.
+    """
+    spec = (spec or "").strip().lower()
+    if spec in ("", "off", "none", "0"):
+        return None
+    tiers = []
+    for part in spec.split(","):
+        name, _, threshold = part.strip().partition(":")
+        if not name or name in skip:
+            continue
+        if name not in TIERS:
+            raise ValueError(f"Unknown grading tier: {name}")
+        tiers.append((TIERS[name](), float(threshold) if threshold else DEFAULT_THRESHOLDS[name]))
+    return GradingCascade(tiers) if tiers else None
+
+
+def cascade_from_env(skip: Tuple[str, ...] = ()) -> Optional[GradingCascade]:
+    """EVAL_CASCADE: tier spec for cascade_from_spec (default "rules,similarity")."""
+    return cascade_from_spec(os.getenv("EVAL_CASCADE", "rules,similarity"), skip)
@@ -0,0 +1,243 @@
+# instrumentation.py
+# Lightweight span timers with log-bucketed latency histograms (p50/p95/p99) and pluggable exporters.
+#
+#   from instrumentation import metrics
+#   with metrics.span("evaluator.llm", adapter="gemini"):
+#       ...
+#
+# Disabled by default (METRICS=1 to enable): span() then returns a shared no-op context manager.
+import os
+import json
+import math
+import time
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from utils import logger
+
+_MIN_S = 1e-6                 # smallest bucket bound: 1µs
+_GROWTH = 2 ** 0.25           # ~19% relative error per bucket
+_LOG_GROWTH = math.log(_GROWTH)
+_N_BUCKETS = 128              # 1µs * 2**32 ≈ 71 minutes
+
+
+class Histogram:
+    """Fixed log-scale buckets: O(1) record, bounded memory, approximate percentiles."""
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self):
+        self.counts = [0] * _N_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        idx = 0 if seconds <= _MIN_S else min(_N_BUCKETS - 1, int(math.log(seconds / _MIN_S) / _LOG_GROWTH) + 1)
+        self.counts[idx] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, p: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = p / 100.0 * self.count
+        seen = 0
+        for idx, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank and c:
+                upper = _MIN_S * (_GROWTH ** idx)
+                return min(max(upper, self.min), self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(50) * 1000, 3),
+            "p95_ms": round(self.percentile(95) * 1000, 3),
+            "p99_ms": round(self.percentile(99) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("metrics", "key", "start")
+
+    def __init__(self, metrics: "Metrics", key: Tuple):
+        self.metrics = metrics
+        self.key = key
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics._record(self.key, time.perf_counter() - self.start, exc_type is not None)
+        return False
+
+
+# ------------------------------
+# Sinks
+# ------------------------------
+class LoggerSink:
+    """Write one summary line per series through utils.logger."""
+
+    def emit(self, snapshot: Dict[str, Any]):
+        for name, s in snapshot.items():
+            logger.info("metrics %s count=%d p50=%.3fms p95=%.3fms p99=%.3fms errors=%d",
+                        name, s["count"], s["p50_ms"], s["p95_ms"], s["p99_ms"], s.get("errors", 0))
+
+
+class JsonLinesSink:
+    """Append the whole snapshot as one JSON line per export."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def emit(self, snapshot: Dict[str, Any]):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"ts": time.time(), "metrics": snapshot}) + "\n")
+
+
+class PrometheusTextSink:
+    """Rewrite a node-exporter style textfile (summary quantiles in seconds)."""
+
+    def __init__(self, path: Path, prefix: str = "interview_coach"):
+        self.path = Path(path)
+        self.prefix = prefix
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def emit(self, snapshot: Dict[str, Any]):
+        lines = [f"# TYPE {self.prefix}_stage_seconds summary"]
+        for name, s in snapshot.items():
+            stage, _, label_str = name.partition("{")
+            labels = [f'stage="{stage}"'] + ([label_str.rstrip("}")] if label_str else [])
+            base = ",".join(labels)
+            for q, key in (("0.5", "p50_ms"), ("0.95", "p95_ms"), ("0.99", "p99_ms")):
+                lines.append(f'{self.prefix}_stage_seconds{{{base},quantile="{q}"}} {s[key] / 1000:.6f}')
+            lines.append(f"{self.prefix}_stage_seconds_count{{{base}}} {s['count']}")
+            lines.append(f"{self.prefix}_stage_seconds_sum{{{base}}} {s['mean_ms'] * s['count'] / 1000:.6f}")
+            lines.append(f"{self.prefix}_stage_errors_total{{{base}}} {s.get('errors', 0)}")
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+# ------------------------------
+# Registry
+# ------------------------------
+class Metrics:
+    """
+    Process-wide registry of stage timers.
+    - span(stage, **labels): context manager timing one stage
+    - snapshot(): {"stage{label=value}": {count, mean_ms, p50_ms, p95_ms, p99_ms, max_ms, errors}}
+    - add_sink(sink) / export() / start_exporter(interval)
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._hist: Dict[Tuple, Histogram] = {}
+        self._errors: Dict[Tuple, int] = {}
+        self._lock = threading.Lock()
+        self.sinks: List[Any] = []
+        self._exporter = None
+
+    def span(self, stage: str, **labels):
+        if not self.enabled:
+            return _NOOP
+        return _Span(self, (stage,) + tuple(sorted(labels.items())))
+
+    def observe(self, stage: str, seconds: float, **labels):
+        if self.enabled:
+            self._record((stage,) + tuple(sorted(labels.items())), seconds, False)
+
+    def _record(self, key: Tuple, seconds: float, error: bool):
+        with self._lock:
+            h = self._hist.get(key)
+            if h is None:
+                h = self._hist[key] = Histogram()
+            h.record(seconds)
+            if error:
+                self._errors[key] = self._errors.get(key, 0) + 1
+
+    @staticmethod
+    def _name(key: Tuple) -> str:
+        if len(key) == 1:
+            return key[0]
+        return key[0] + "{" + ",".join(f'{k}="{v}"' for k, v in key[1:]) + "}"
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            out = {}
+            for key, h in self._hist.items():
+                s = h.summary()
+                s["errors"] = self._errors.get(key, 0)
+                out[self._name(key)] = s
+            return out
+
+    def reset(self):
+        with self._lock:
+            self._hist.clear()
+            self._errors.clear()
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+
+    def export(self):
+        snap = self.snapshot()
+        for sink in self.sinks:
+            try:
+                sink.emit(snap)
+            except Exception as e:
+                logger.exception("Metrics sink %s failed: %s", type(sink).__name__, e)
+
+    def start_exporter(self, interval: float = 60.0):
+        """Export to every sink every `interval` seconds from a daemon thread."""
+        if self._exporter is not None:
+            return
+
+        def loop():
+            while True:
+                time.sleep(interval)
+                self.export()
+
+        self._exporter = threading.Thread(target=loop, name="metrics-exporter", daemon=True)
+        self._exporter.start()
+
+
+def _from_env() -> Metrics:
+    m = Metrics(enabled=os.getenv("METRICS", "0").lower() in ("1", "true", "yes"))
+    sink = os.getenv("METRICS_SINK", "")
+    if m.enabled and sink:
+        kind, _, path = sink.partition(":")
+        if kind == "log":
+            m.add_sink(LoggerSink())
+        elif kind == "jsonl":
+            m.add_sink(JsonLinesSink(Path(path or "logs/metrics.jsonl")))
+        elif kind == "prom":
+            m.add_sink(PrometheusTextSink(Path(path or "logs/metrics.prom")))
+        m.start_exporter(float(os.getenv("METRICS_INTERVAL", "60")))
+    return m
+
+
+metrics = _from_env()
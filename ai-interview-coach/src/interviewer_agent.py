@@ -1,23 +1,306 @@
 # interviewer_agent.py
+import os
 import json
 import random
+import threading
+import time
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
+
+from similarity_index import ReferenceIndex
+from compact_bank import CompactBank, is_compact_bank, reference_index_path
+from question_deck import Deck
+from skill_model import RatingIndex
+from utils import logger
+
+DIFFICULTIES = ("easy", "medium", "hard")
+
+
+class QuestionIndex:
+    """
+    Precomputed, read-only view of a question bank.
+    - buckets: (domain, difficulty) -> tuple of question dicts
+    - by_id: question id -> question dict
+    Built once at load time so pick_question never rescans the bank. Shared by every
+    session (and every orchestrator in the process): question dicts must not be mutated.
+    compact_bank.CompactBank offers the same interface over a memory-mapped file.
+    """
+
+    def __init__(self, bank: Dict[str, Dict[str, List[Dict[str, Any]]]]):
+        self.buckets: Dict[Tuple[str, str], Tuple[Dict[str, Any], ...]] = {}
+        self.by_id: Dict[str, Dict[str, Any]] = {}
+        self.difficulties: Dict[str, Tuple[str, ...]] = {}
+        for domain, levels in bank.items():
+            order = [d for d in DIFFICULTIES if d in levels] + [d for d in levels if d not in DIFFICULTIES]
+            self.difficulties[domain] = tuple(order)
+            for difficulty in order:
+                qs = tuple(levels.get(difficulty) or ())
+                self.buckets[(domain, difficulty)] = qs
+                for q in qs:
+                    self.by_id.setdefault(q.get("id"), q)
+
+    def bucket(self, domain: str, difficulty: str) -> Tuple[Dict[str, Any], ...]:
+        return self.buckets.get((domain, difficulty), ())
+
+    def get(self, question_id: str) -> Dict[str, Any]:
+        return self.by_id.get(question_id)
+
+
+class QuestionSampler:
+    """
+    Per-session sampling state: one deck per (domain, difficulty) plus the set of
+    question ids already served. Sampling without replacement is O(1) amortized;
+    draw_near (adaptive difficulty) is O(log n) through the snapshot's RatingIndex.
+    """
+
+    def __init__(self, index: QuestionIndex, rng: random.Random = None, ratings: RatingIndex = None):
+        self.index = index
+        self.rng = rng or random.Random()
+        self.ratings = ratings
+        self.seen = set()
+        self._decks: Dict[Tuple[str, str], Deck] = {}
+        self._rating_decks: Dict[Tuple[str, int], Deck] = {}
+
+    def _deck(self, domain: str, difficulty: str) -> Deck:
+        key = (domain, difficulty)
+        deck = self._decks.get(key)
+        if deck is None:
+            deck = Deck(len(self.index.bucket(domain, difficulty)))
+            self._decks[key] = deck
+        return deck
+
+    def exclude(self, ids):
+        self.seen.update(ids)
+
+    def _draw_from(self, domain: str, difficulty: str, exclude) -> Dict[str, Any]:
+        bucket = self.index.bucket(domain, difficulty)
+        deck = self._deck(domain, difficulty)
+        while deck.remaining:
+            q = bucket[deck.draw(self.rng)]
+            qid = q.get("id")
+            if qid in self.seen or (exclude and qid in exclude):
+                continue
+            self.seen.add(qid)
+            return q
+        return None
+
+    def draw(self, domain: str, difficulty: str, exclude=None) -> Dict[str, Any]:
+        q = self._draw_from(domain, difficulty, exclude)
+        if q is not None:
+            return q
+        # fallback: random from other difficulties, weighted by what is left in each deck
+        while True:
+            levels = [d for d in self.index.difficulties.get(domain, ()) if self._deck(domain, d).remaining]
+            if not levels:
+                raise RuntimeError("No questions available")
+            total = sum(self._deck(domain, d).remaining for d in levels)
+            r = self.rng.randrange(total)
+            for d in levels:
+                r -= self._deck(domain, d).remaining
+                if r < 0:
+                    break
+            q = self._draw_from(domain, d, exclude)
+            if q is not None:
+                return q
+
+    def draw_near(self, domain: str, rating: float) -> Tuple[Dict[str, Any], str]:
+        """Unseen question rated closest to `rating` (see skill_model): (question, difficulty)."""
+        if self.ratings is None:
+            self.ratings = RatingIndex(self.index)
+        found = self.ratings.nearest(domain, rating, self.seen, self.rng, decks=self._rating_decks)
+        if found is None:
+            raise RuntimeError("No questions available")
+        self.seen.add(found[0].get("id"))
+        return found
+
+
+class SharedBank:
+    """
+    Parsed bank plus the indexes built from it; read-only once constructed.
+    A JSON bank is parsed whole; a compact bank (tools/build_compact_bank.py) is memory-mapped
+    and questions are materialized on demand, so bank is None and index is a CompactBank.
+    """
+    __slots__ = ("bank", "index", "reference_index", "ratings", "mtime_ns")
+
+    def __init__(self, question_bank_path: Path, mtime_ns: int = None):
+        self.mtime_ns = mtime_ns
+        cache_path = os.getenv("SIMILARITY_INDEX_PATH")
+        cache_path = Path(cache_path) if cache_path else None
+        if is_compact_bank(question_bank_path):
+            self.bank = None
+            self.index = CompactBank(question_bank_path)
+            source = self.index
+            # the converter prebuilds the reference index next to the bank
+            cache_path = cache_path or reference_index_path(question_bank_path)
+        else:
+            with open(question_bank_path, "r", encoding="utf-8") as f:
+                self.bank = json.load(f)
+            self.index = QuestionIndex(self.bank)
+            source = self.bank
+        # reference-answer vectors for the similarity grader; SIMILARITY_INDEX_PATH keeps a
+        # memory-mapped copy on disk that is rebuilt only when the bank file changes
+        self.reference_index = ReferenceIndex.load_or_build(question_bank_path, source, cache_path)
+        # questions sorted by rating per domain for adaptive difficulty (built on first use)
+        self.ratings = RatingIndex(self.index)
+
+
+_SHARED_BANKS: Dict[Tuple[str, int], SharedBank] = {}
+_SHARED_LOCK = threading.Lock()
+
+
+def load_shared_bank(question_bank_path: Path) -> SharedBank:
+    """
+    Process-wide cache of parsed banks keyed by (resolved path, mtime): every
+    InterviewerAgent on the same file shares one copy; editing the file loads a new one.
+    Banks are built outside the lock, so a slow load never blocks other lookups.
+    """
+    path = Path(question_bank_path).resolve()
+    key = (str(path), path.stat().st_mtime_ns)
+    with _SHARED_LOCK:
+        shared = _SHARED_BANKS.get(key)
+    if shared is not None:
+        return shared
+    built = SharedBank(path, key[1])
+    with _SHARED_LOCK:
+        shared = _SHARED_BANKS.get(key)
+        if shared is None:
+            shared = built
+            # older versions of the same file are no longer reachable through the cache
+            for old in [k for k in _SHARED_BANKS if k[0] == key[0]]:
+                del _SHARED_BANKS[old]
+            _SHARED_BANKS[key] = shared
+        return shared
+
 
 class InterviewerAgent:
+    """
+    Picks questions from the current bank snapshot (a SharedBank).
+    reload() builds a snapshot of the edited file off the request path and swaps it in with
+    one reference assignment. Samplers keep the snapshot they were created from, so a session
+    mid-interview sees a consistent bank and exclusion list; new sessions get the new one.
+    watch(interval) polls the file's mtime from a daemon thread.
+    """
+
     def __init__(self, question_bank_path: Path):
-        with open(question_bank_path, "r", encoding="utf-8") as f:
-            self.bank = json.load(f)
+        self.question_bank_path = Path(question_bank_path)
+        self._snapshot = load_shared_bank(question_bank_path)
+        self._reload_lock = threading.Lock()
+        self._listeners = []
+        self._watcher = None
+        self._watch_stop = threading.Event()
+        self.reloads = 0
+        self.reload_errors = 0
+        self.last_reload_ms = None
         # track per-session pointers externally (or orchestrator will manage)
 
-    def pick_question(self, domain: str, difficulty: str, exclude_ids=None) -> Dict[str,Any]:
-        exclude_ids = exclude_ids or []
-        candidates = self.bank.get(domain, {}).get(difficulty, [])
-        candidates = [c for c in candidates if c["id"] not in exclude_ids]
-        if not candidates:
-            # fallback: random from other difficulties
-            all_qs = sum([self.bank.get(domain, {}).get(d, []) for d in ["easy","medium","hard"]], [])
-            candidates = [c for c in all_qs if c["id"] not in exclude_ids]
-            if not candidates:
-                raise RuntimeError("No questions available")
-        return random.choice(candidates)
+    # the current snapshot; read it once per operation when several parts must agree
+    @property
+    def snapshot(self) -> SharedBank:
+        return self._snapshot
+
+    @property
+    def bank(self):
+        return self._snapshot.bank
+
+    @property
+    def index(self):
+        return self._snapshot.index
+
+    @property
+    def reference_index(self) -> ReferenceIndex:
+        return self._snapshot.reference_index
+
+    # ------------------------------
+    # hot reload
+    # ------------------------------
+    def add_reload_listener(self, fn):
+        """fn(snapshot) runs after every successful swap (on the reloading thread)."""
+        self._listeners.append(fn)
+
+    def reload(self) -> bool:
+        """
+        Load the bank file again if it changed and swap it in. Returns False when the file
+        is unchanged or the new version fails to load (the current snapshot stays in use).
+        """
+        with self._reload_lock:
+            start = time.perf_counter()
+            try:
+                snapshot = load_shared_bank(self.question_bank_path)
+            except Exception:
+                self.reload_errors += 1
+                logger.exception("Reloading question bank %s failed; keeping the loaded version",
+                                 self.question_bank_path)
+                return False
+            if snapshot is self._snapshot:
+                return False
+            self._snapshot = snapshot
+            self.reloads += 1
+            self.last_reload_ms = round((time.perf_counter() - start) * 1000, 3)
+        logger.info(f"Question bank {self.question_bank_path} reloaded in {self.last_reload_ms} ms")
+        for fn in self._listeners:
+            try:
+                fn(snapshot)
+            except Exception:
+                logger.exception("Question bank reload listener failed")
+        return True
+
+    def reload_in_background(self) -> threading.Thread:
+        thread = threading.Thread(target=self.reload, name="bank-reload", daemon=True)
+        thread.start()
+        return thread
+
+    def watch(self, interval: float = 2.0):
+        """Reload whenever the bank file's mtime changes (checked every interval seconds)."""
+        if self._watcher is not None:
+            return
+
+        def run():
+            last = self._snapshot.mtime_ns
+            while not self._watch_stop.wait(interval):
+                try:
+                    mtime = self.question_bank_path.stat().st_mtime_ns
+                except OSError:
+                    continue  # mid-replace; look again next tick
+                if mtime != last:
+                    last = mtime
+                    self.reload()
+
+        self._watch_stop.clear()
+        self._watcher = threading.Thread(target=run, name="bank-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        if self._watcher is not None:
+            self._watch_stop.set()
+            self._watcher.join(timeout=1)
+            self._watcher = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": str(self.question_bank_path),
+            "mtime_ns": self._snapshot.mtime_ns,
+            "reloads": self.reloads,
+            "reload_errors": self.reload_errors,
+            "last_reload_ms": self.last_reload_ms,
+            "watching": self._watcher is not None,
+        }
+
+    def new_sampler(self) -> QuestionSampler:
+        """Create the per-session sampling state the orchestrator keeps for each session."""
+        snapshot = self._snapshot
+        return QuestionSampler(snapshot.index, ratings=snapshot.ratings)
+
+    def get_question(self, question_id: str) -> Dict[str, Any]:
+        return self.index.get(question_id)
+
+    def pick_question(self, domain: str, difficulty: str, exclude_ids=None,
+                      sampler: QuestionSampler = None) -> Dict[str, Any]:
+        if sampler is not None:
+            return sampler.draw(domain, difficulty, exclude_ids)
+        # stateless call: a throwaway sampler seeded with the exclusion set
+        exclude = exclude_ids if isinstance(exclude_ids, (set, frozenset)) else set(exclude_ids or [])
+        return QuestionSampler(self.index, random).draw(domain, difficulty, exclude)
+
+    def pick_adaptive(self, domain: str, rating: float, sampler: QuestionSampler = None) -> Tuple[Dict[str, Any], str]:
+        """Most informative question for a candidate rated `rating`: (question, difficulty)."""
+        return (sampler or self.new_sampler()).draw_near(domain, rating)
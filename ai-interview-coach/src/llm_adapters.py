@@ -1,10 +1,17 @@
 # llm_adapters.py
 import os
 import json
-from typing import Dict, Any
+import time
+import asyncio
+import codecs
+import urllib.request
+from typing import Dict, Any, Iterator, List, Tuple
 
 # Mock evaluator (keeps previous behavior for offline mode)
-from tools.scoring_utils import mock_evaluate_answer
+from tools.scoring_utils import mock_evaluate_answer, stable_rng
+from similarity_index import ReferenceIndex, text_similarity
+from resilient_llm import resilient_from_env
+from eval_stream import events_from_result, events_from_text, stream_with_fallback
 
 # Try to import Google Generative AI (Gemini) SDK
 try:
@@ -14,13 +21,158 @@ except Exception:
     GEMINI_SDK_AVAILABLE = False
 
 class MockLLM:
+    name = "mock"
+
+    def __init__(self, deterministic: bool = None):
+        # deterministic: seed the score noise from (question, answer) so results are cacheable;
+        # default from MOCK_DETERMINISTIC (off: the classic random noise)
+        if deterministic is None:
+            deterministic = os.getenv("MOCK_DETERMINISTIC", "0").lower() in ("1", "true", "yes")
+        self.deterministic = deterministic
+
+    def _grade(self, question_text: str, user_answer: str) -> Dict[str, Any]:
+        rng = stable_rng(question_text, user_answer or "") if self.deterministic else None
+        return mock_evaluate_answer(question_text, user_answer, rng)
+
     def evaluate(self, question_text: str, user_answer: str, correct_answer: str) -> Dict[str, Any]:
         """
         Mock evaluate signature matches the real adapter.
         """
         # Use existing mock evaluator which expects (question, answer)
         # We'll provide user_answer for scoring.
-        return mock_evaluate_answer(question_text, user_answer)
+        return self._grade(question_text, user_answer)
+
+    async def aevaluate(self, question_text: str, user_answer: str, correct_answer: str) -> Dict[str, Any]:
+        # Pure CPU and fast: no need to leave the event loop.
+        return self.evaluate(question_text, user_answer, correct_answer)
+
+    def evaluate_batch(self, items: List[Tuple[str, str, str]]) -> List[Dict[str, Any]]:
+        """items: (question_text, user_answer, correct_answer) triples; results come back in order."""
+        return [self.evaluate(*it) for it in items]
+
+    async def aevaluate_batch(self, items: List[Tuple[str, str, str]]) -> List[Dict[str, Any]]:
+        return self.evaluate_batch(items)
+
+    def evaluate_stream(self, question_text: str, user_answer: str, correct_answer: str) -> Iterator[Dict[str, Any]]:
+        """Stream events (see eval_stream); the mock has nothing to stream, so it replays its result."""
+        return events_from_result(self.evaluate(question_text, user_answer, correct_answer))
+
+class FakeLatencyLLM(MockLLM):
+    """
+    Mock grader that sleeps before answering, to exercise the async/concurrent
+    paths locally the way a remote LLM would (adapter name: "fake").
+    """
+    name = "fake"
+
+    def __init__(self, latency: float = None, deterministic: bool = None):
+        super().__init__(deterministic)
+        self.latency = float(os.getenv("FAKE_LLM_LATENCY", "0.5") if latency is None else latency)
+
+    def evaluate(self, question_text: str, user_answer: str, correct_answer: str) -> Dict[str, Any]:
+        time.sleep(self.latency)
+        return super().evaluate(question_text, user_answer, correct_answer)
+
+    async def aevaluate(self, question_text: str, user_answer: str, correct_answer: str) -> Dict[str, Any]:
+        await asyncio.sleep(self.latency)
+        return self._grade(question_text, user_answer)
+
+    def evaluate_batch(self, items: List[Tuple[str, str, str]]) -> List[Dict[str, Any]]:
+        # one simulated round-trip for the whole batch, like a packed LLM request
+        time.sleep(self.latency)
+        return [self._grade(q, a) for q, a, _ in items]
+
+    async def aevaluate_batch(self, items: List[Tuple[str, str, str]]) -> List[Dict[str, Any]]:
+        await asyncio.sleep(self.latency)
+        return [self._grade(q, a) for q, a, _ in items]
+
+    def evaluate_stream(self, question_text: str, user_answer: str, correct_answer: str) -> Iterator[Dict[str, Any]]:
+        # a fifth of the latency before the first token, the rest spread over the feedback
+        result = self._grade(question_text, user_answer)
+        time.sleep(self.latency * 0.2)
+        chunks = max(1, len(str(result.get("feedback", "")).split()) // 3)
+        return events_from_result(result, delay=self.latency * 0.8 / chunks)
+
+class SimilarityLLM:
+    """
+    Offline, deterministic grader (adapter name: "similarity"): cosine similarity between
+    the user answer and the question's reference answer over hashed char n-gram TF-IDF
+    vectors, mapped linearly onto 0-10 between SIMILARITY_LOW and SIMILARITY_HIGH.
+    Uses the bank's precomputed ReferenceIndex once attached, otherwise compares the two
+    texts directly. The reference row is looked up by question_id (the evaluator passes
+    the question's id; texts can repeat across domains); callers without an id fall back
+    to the question text.
+    """
+    name = "similarity"
+
+    def __init__(self, index: ReferenceIndex = None, low: float = None, high: float = None):
+        self.index = index
+        self.low = float(os.getenv("SIMILARITY_LOW", "0.12") if low is None else low)
+        self.high = float(os.getenv("SIMILARITY_HIGH", "0.7") if high is None else high)
+
+    def attach_index(self, index: ReferenceIndex):
+        self.index = index
+
+    def similarity(self, question_text: str, user_answer: str, correct_answer: str, question_id: str = None) -> float:
+        if not (user_answer or "").strip():
+            return 0.0
+        row = None
+        if self.index is not None:
+            row = (self.index.row_for(question_id=question_id) if question_id
+                   else self.index.row_for(question_text=question_text))
+        if row is not None:
+            return self.index.similarity_to_row(row, user_answer)
+        return text_similarity(user_answer, correct_answer or "")
+
+    def score_for(self, sim: float) -> int:
+        frac = (sim - self.low) / (self.high - self.low) if self.high > self.low else float(sim >= self.high)
+        return int(round(max(0.0, min(1.0, frac)) * 10))
+
+    def prefilter(self, question_text: str, user_answer: str, correct_answer: str,
+                  question_id: str = None) -> Dict[str, Any]:
+        """
+        Cheap verdict for answers that are empty or clearly off-topic (similarity at or
+        below the low bound); None when the answer needs a real grader.
+        """
+        sim = self.similarity(question_text, user_answer, correct_answer, question_id)
+        if sim > self.low:
+            return None
+        return self.result_for(0, sim)
+
+    def result_for(self, score: int, sim: float) -> Dict[str, Any]:
+        if score >= 8:
+            feedback = "Your answer closely matches the reference answer."
+            suggestions = ["Add an example to show deeper understanding."]
+        elif score >= 5:
+            feedback = "Your answer covers part of the reference answer."
+            suggestions = ["Cover the remaining key points of the topic.", "Use the precise technical terms."]
+        elif score > 0:
+            feedback = "Your answer only touches on the expected points."
+            suggestions = ["Review the core definition of the topic.", "Structure the answer around the key concepts."]
+        else:
+            feedback = "Your answer does not address the question."
+            suggestions = ["Review the topic and try answering the question directly."]
+        return {"score": score, "feedback": feedback, "suggestions": suggestions, "similarity": round(sim, 4)}
+
+    def evaluate(self, question_text: str, user_answer: str, correct_answer: str,
+                 question_id: str = None) -> Dict[str, Any]:
+        sim = self.similarity(question_text, user_answer, correct_answer, question_id)
+        return self.result_for(self.score_for(sim), sim)
+
+    async def aevaluate(self, question_text: str, user_answer: str, correct_answer: str,
+                        question_id: str = None) -> Dict[str, Any]:
+        return self.evaluate(question_text, user_answer, correct_answer, question_id)
+
+    def evaluate_batch(self, items: List[Tuple[str, str, str]], question_ids: List[str] = None) -> List[Dict[str, Any]]:
+        ids = question_ids or [None] * len(items)
+        return [self.evaluate(*it, question_id=qid) for it, qid in zip(items, ids)]
+
+    async def aevaluate_batch(self, items: List[Tuple[str, str, str]],
+                              question_ids: List[str] = None) -> List[Dict[str, Any]]:
+        return self.evaluate_batch(items, question_ids)
+
+    def evaluate_stream(self, question_text: str, user_answer: str, correct_answer: str,
+                        question_id: str = None) -> Iterator[Dict[str, Any]]:
+        return events_from_result(self.evaluate(question_text, user_answer, correct_answer, question_id))
 
 class GeminiAdapter:
     def __init__(self, model: str = "gemini-pro"):
@@ -31,6 +183,7 @@ class GeminiAdapter:
             raise RuntimeError("google.generativeai SDK is not installed in this environment.")
         genai.configure(api_key=api_key)
         self.model = model
+        self.name = f"gemini:{model}"
 
     def _build_prompt(self, question_text: str, user_answer: str, correct_answer: str) -> str:
         """
@@ -63,57 +216,252 @@ Important: Output must be valid JSON and nothing else.
 """
         return prompt
 
-    def evaluate(self, question_text: str, user_answer: str, correct_answer: str) -> Dict[str, Any]:
+    def _build_batch_prompt(self, items: List[Tuple[str, str, str]]) -> str:
+        """
+        Pack several (question, user answer, reference answer) triples into one prompt
+        that asks for a JSON array with one result object per item, in order.
+        """
+        blocks = []
+        for i, (question_text, user_answer, correct_answer) in enumerate(items):
+            blocks.append(f"""### ITEM {i}
+QUESTION:
+{question_text}
+
+REFERENCE (Correct) ANSWER:
+{correct_answer}
+
+USER ANSWER:
+{user_answer}
+""")
+        joined = "\n".join(blocks)
+        prompt = f"""
+You are an experienced interview evaluator.
+
+For EACH item below, compare the USER ANSWER with the CORRECT ANSWER (reference). Evaluate accuracy, completeness, and clarity.
+
+Return ONLY a valid JSON array with exactly {len(items)} objects, in item order, each with the exact keys: item, score, feedback, suggestions.
+
+JSON format:
+[
+  {{"item": 0, "score": <integer 0-10>, "feedback": "<brief constructive feedback>", "suggestions": ["<suggestion1>", "<suggestion2>"]}}
+]
+
+{joined}
+Important: Output must be valid JSON and nothing else.
+"""
+        return prompt
+
+    def _generate_text(self, prompt: str, max_output_tokens: int = 512) -> str:
+        # Use genai.generate (SDK versions vary — this attempts a safe call)
+        resp = genai.generate(model=self.model, prompt=prompt, max_output_tokens=max_output_tokens)
+        # The response shape may differ between SDK versions. Try to extract text robustly.
+        text = None
+        # Newer SDK returns resp.result[0].content[0].text (or resp.output[0].content[0].text)
+        if hasattr(resp, "result"):
+            try:
+                text = resp.result[0].content[0].text
+            except Exception:
+                text = str(resp)
+        else:
+            # Some versions return resp.text or str(resp)
+            text = getattr(resp, "text", None) or str(resp)
+
+        # Try to find JSON within the text (strip surrounding whitespace)
+        text = text.strip()
+        # If the model added backticks or code fences, try to clean them
+        if text.startswith("```"):
+            # remove code fences
+            parts = text.split("```")
+            # pick the longest chunk that looks like JSON
+            text = max(parts, key=len).strip()
+            # drop a language tag such as ```json
+            if text[:4].lower() == "json":
+                text = text[4:].strip()
+        return text
+
+    def _stream_text(self, prompt: str, max_output_tokens: int = 512) -> Iterator[str]:
+        # streaming needs the GenerativeModel API; older SDKs raise here and callers fall back
+        model = genai.GenerativeModel(self.model)
+        resp = model.generate_content(prompt, stream=True,
+                                      generation_config={"max_output_tokens": max_output_tokens})
+        for chunk in resp:
+            text = getattr(chunk, "text", None)
+            if text:
+                yield text
+
+    @staticmethod
+    def _parse_result(parsed: Dict[str, Any]) -> Dict[str, Any]:
+        # Ensure keys
+        score = int(parsed.get("score", 0))
+        feedback = parsed.get("feedback", "")
+        suggestions = parsed.get("suggestions", []) or []
+        # Normalize suggestions to list of strings
+        suggestions = [str(s) for s in suggestions][:5]
+        return {"score": score, "feedback": feedback, "suggestions": suggestions}
+
+    def evaluate_raw(self, question_text: str, user_answer: str, correct_answer: str) -> Dict[str, Any]:
+        """Single grading call that raises on transport or parse errors (used by ResilientLLM)."""
         prompt = self._build_prompt(question_text, user_answer, correct_answer)
+        text = self._generate_text(prompt)
+        # Parse JSON
+        return self._parse_result(json.loads(text))
+
+    def evaluate(self, question_text: str, user_answer: str, correct_answer: str) -> Dict[str, Any]:
         try:
-            # Use genai.generate (SDK versions vary — this attempts a safe call)
-            resp = genai.generate(model=self.model, prompt=prompt, max_output_tokens=512)
-            # The response shape may differ between SDK versions. Try to extract text robustly.
-            text = None
-            # Newer SDK returns resp.result[0].content[0].text (or resp.output[0].content[0].text)
-            if hasattr(resp, "result"):
-                try:
-                    text = resp.result[0].content[0].text
-                except Exception:
-                    text = str(resp)
-            else:
-                # Some versions return resp.text or str(resp)
-                text = getattr(resp, "text", None) or str(resp)
-
-            # Try to find JSON within the text (strip surrounding whitespace)
-            text = text.strip()
-            # If the model added backticks or code fences, try to clean them
-            if text.startswith("```"):
-                # remove code fences
-                parts = text.split("```")
-                # pick the longest chunk that looks like JSON
-                text = max(parts, key=len).strip()
-
-            # Parse JSON
-            parsed = json.loads(text)
-            # Ensure keys
-            score = int(parsed.get("score", 0))
-            feedback = parsed.get("feedback", "")
-            suggestions = parsed.get("suggestions", []) or []
-            # Normalize suggestions to list of strings
-            suggestions = [str(s) for s in suggestions][:5]
-            return {"score": score, "feedback": feedback, "suggestions": suggestions}
+            return self.evaluate_raw(question_text, user_answer, correct_answer)
         except Exception as e:
             # On any failure, fall back to mock grader
             print("GeminiAdapter.evaluate fallback to mock due to:", e)
-            return mock_evaluate_answer(question_text, user_answer)
+            result = mock_evaluate_answer(question_text, user_answer)
+            result["fallback"] = True
+            return result
+
+    def evaluate_stream_raw(self, question_text: str, user_answer: str, correct_answer: str) -> Iterator[Dict[str, Any]]:
+        """Stream events parsed from the model's JSON as it is generated; raises on failure."""
+        prompt = self._build_prompt(question_text, user_answer, correct_answer)
+        return events_from_text(self._stream_text(prompt), self._parse_result)
+
+    def evaluate_stream(self, question_text: str, user_answer: str, correct_answer: str) -> Iterator[Dict[str, Any]]:
+        return stream_with_fallback(self.evaluate_stream_raw(question_text, user_answer, correct_answer),
+                                    lambda: self.evaluate(question_text, user_answer, correct_answer))
+
+    def evaluate_batch(self, items: List[Tuple[str, str, str]]) -> List[Dict[str, Any]]:
+        """
+        Grade several answers with one request. If the reply is not a JSON array
+        with one well-formed object per item, every item is graded individually.
+        """
+        items = list(items)
+        if len(items) <= 1:
+            return [self.evaluate(*it) for it in items]
+        try:
+            return self.evaluate_batch_raw(items)
+        except Exception as e:
+            print("GeminiAdapter.evaluate_batch falling back to per-item grading due to:", e)
+            return [self.evaluate(*it) for it in items]
+
+    def evaluate_batch_raw(self, items: List[Tuple[str, str, str]]) -> List[Dict[str, Any]]:
+        """One packed request; raises unless the reply has one well-formed result per item."""
+        items = list(items)
+        if len(items) == 1:
+            return [self.evaluate_raw(*items[0])]
+        prompt = self._build_batch_prompt(items)
+        text = self._generate_text(prompt, max_output_tokens=256 * len(items) + 256)
+        parsed = json.loads(text)
+        if not isinstance(parsed, list) or len(parsed) != len(items):
+            raise ValueError(f"expected a JSON array of {len(items)} results")
+        # honour explicit item indexes if the model reordered the array
+        if all(isinstance(p, dict) and isinstance(p.get("item"), int) for p in parsed):
+            parsed = sorted(parsed, key=lambda p: p["item"])
+        return [self._parse_result(p) for p in parsed]
+
+    async def aevaluate(self, question_text: str, user_answer: str, correct_answer: str) -> Dict[str, Any]:
+        # The SDK call is blocking; run it on a worker thread so the event loop stays free.
+        return await asyncio.to_thread(self.evaluate, question_text, user_answer, correct_answer)
+
+    async def aevaluate_batch(self, items: List[Tuple[str, str, str]]) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self.evaluate_batch, items)
+
+class HttpLLMAdapter:
+    """
+    Grader behind a JSON-over-HTTP endpoint (adapter name: "http", URL from LLM_HTTP_URL).
+    POST {"question", "answer", "reference"} -> {"score", "feedback", "suggestions"}
+    POST {"items": [{...}, ...]} -> {"results": [{...}, ...]}
+    POST {..., "stream": true} -> the same JSON object, sent incrementally
+    tools/fake_llm_server.py implements it with configurable latency and errors.
+    """
+    name = "http"
+
+    def __init__(self, url: str = None, timeout: float = 30.0):
+        self.url = url or os.getenv("LLM_HTTP_URL", "http://127.0.0.1:8765/evaluate")
+        self.timeout = timeout
+
+    def _post(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        req = urllib.request.Request(self.url, data=json.dumps(payload).encode("utf-8"),
+                                     headers={"Content-Type": "application/json"}, method="POST")
+        # non-2xx replies raise urllib.error.HTTPError
+        with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+            return json.loads(resp.read().decode("utf-8"))
+
+    @staticmethod
+    def _payload(question_text: str, user_answer: str, correct_answer: str) -> Dict[str, str]:
+        return {"question": question_text, "answer": user_answer, "reference": correct_answer}
+
+    def evaluate_raw(self, question_text: str, user_answer: str, correct_answer: str) -> Dict[str, Any]:
+        return GeminiAdapter._parse_result(self._post(self._payload(question_text, user_answer, correct_answer)))
+
+    def _stream_text(self, payload: Dict[str, Any]) -> Iterator[str]:
+        req = urllib.request.Request(self.url, data=json.dumps(dict(payload, stream=True)).encode("utf-8"),
+                                     headers={"Content-Type": "application/json"}, method="POST")
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+            while True:
+                data = resp.read1(4096)
+                if not data:
+                    break
+                yield decoder.decode(data)
+
+    def evaluate_stream_raw(self, question_text: str, user_answer: str, correct_answer: str) -> Iterator[Dict[str, Any]]:
+        payload = self._payload(question_text, user_answer, correct_answer)
+        return events_from_text(self._stream_text(payload), GeminiAdapter._parse_result)
+
+    def evaluate_stream(self, question_text: str, user_answer: str, correct_answer: str) -> Iterator[Dict[str, Any]]:
+        return stream_with_fallback(self.evaluate_stream_raw(question_text, user_answer, correct_answer),
+                                    lambda: self.evaluate(question_text, user_answer, correct_answer))
+
+    def evaluate_batch_raw(self, items: List[Tuple[str, str, str]]) -> List[Dict[str, Any]]:
+        items = list(items)
+        results = self._post({"items": [self._payload(*it) for it in items]}).get("results")
+        if not isinstance(results, list) or len(results) != len(items):
+            raise ValueError(f"expected {len(items)} results")
+        return [GeminiAdapter._parse_result(r) for r in results]
+
+    def evaluate(self, question_text: str, user_answer: str, correct_answer: str) -> Dict[str, Any]:
+        try:
+            return self.evaluate_raw(question_text, user_answer, correct_answer)
+        except Exception as e:
+            print("HttpLLMAdapter.evaluate fallback to mock due to:", e)
+            result = mock_evaluate_answer(question_text, user_answer)
+            result["fallback"] = True
+            return result
+
+    def evaluate_batch(self, items: List[Tuple[str, str, str]]) -> List[Dict[str, Any]]:
+        items = list(items)
+        try:
+            return self.evaluate_batch_raw(items)
+        except Exception as e:
+            print("HttpLLMAdapter.evaluate_batch falling back to per-item grading due to:", e)
+            return [self.evaluate(*it) for it in items]
+
+    async def aevaluate(self, question_text: str, user_answer: str, correct_answer: str) -> Dict[str, Any]:
+        return await asyncio.to_thread(self.evaluate, question_text, user_answer, correct_answer)
+
+    async def aevaluate_batch(self, items: List[Tuple[str, str, str]]) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self.evaluate_batch, items)
 
 def get_llm(adapter: str = None):
     """
     Factory to get an LLM adapter.
-    adapter: "gemini" or "mock" (default picks env LLM_ADAPTER or 'mock')
+    adapter: "gemini", "http", "similarity", "fake" or "mock" (default picks env LLM_ADAPTER or 'mock')
+    Remote adapters are wrapped in ResilientLLM (deadlines, retries, rate limit, circuit
+    breaker, hedging; see resilient_llm.resilient_from_env) unless LLM_RESILIENT=0.
     """
     adapter = (adapter or os.getenv("LLM_ADAPTER") or "mock").lower()
+    if adapter == "fake":
+        return FakeLatencyLLM()
+    if adapter == "similarity":
+        return SimilarityLLM()
+    if adapter == "http":
+        return _resilient(HttpLLMAdapter())
     if adapter == "gemini":
         try:
-            return GeminiAdapter()
+            return _resilient(GeminiAdapter())
         except Exception as e:
             print("Failed to initialize GeminiAdapter:", e)
             print("Falling back to MockLLM.")
             return MockLLM()
     return MockLLM()
+
+def _resilient(inner):
+    if os.getenv("LLM_RESILIENT", "1").lower() in ("0", "false", "no"):
+        return inner
+    return resilient_from_env(inner, fallback=MockLLM())
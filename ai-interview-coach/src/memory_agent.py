@@ -3,8 +3,43 @@ import time
 import uuid
 import json
 from pathlib import Path
-from typing import Dict, Any
-from storage.sqlite_store import SQLiteStore
+from typing import Dict, Any, List, Tuple
+import os
+import threading
+from storage.sqlite_store import SQLiteStore, WEAK_SCORE
+from storage.write_behind import WriteBehindQueue
+from session_store import BoundedSessionStore
+
+
+class InteractionRecord:
+    """
+    Compact history entry (one per answered question). Supports the dict-style
+    reads the rest of the code uses (entry.get("question"), entry["evaluation"]).
+    The question dict is the shared, read-only question from the bank, not a copy.
+    """
+    __slots__ = ("time", "question", "evaluation", "user_answer")
+
+    def __init__(self, time: float, question: Dict[str, Any], evaluation: Dict[str, Any], user_answer: str = None):
+        self.time = time
+        self.question = question
+        self.evaluation = evaluation
+        self.user_answer = user_answer
+
+    def get(self, key: str, default=None):
+        value = getattr(self, key, None) if key in self.__slots__ else None
+        return default if value is None else value
+
+    def __getitem__(self, key: str):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def to_dict(self) -> Dict[str, Any]:
+        d = {"time": self.time, "question": self.question, "evaluation": self.evaluation}
+        if self.user_answer is not None:
+            d["user_answer"] = self.user_answer
+        return d
+
 
 class MemoryAgent:
     """
@@ -14,20 +49,51 @@ class MemoryAgent:
     - add_interaction(session_id, question_entry, response)
     - record_answer(session_id, question, evaluation)  # alias
     - persist_session(session_id)
+    - flush()  # wait for queued writes
     - load_user_profile(user_id) / save_user_profile(user_id, profile)
+    - load_skill(user_id, topic) / save_skill(user_id, topic, rating, n)
+
+    durability (or MEMORY_DURABILITY env):
+    - "async"   (default) interactions are queued and written behind in small batches
+    - "sync"    same queue, but add_interaction waits until its row is committed
+    - "session" nothing is written until persist_session (legacy behaviour)
+
+    Live sessions are held in a BoundedSessionStore (SESSION_MAX / SESSION_IDLE_TTL env):
+    idle or least-recently-used sessions are spilled to SQLite and reloaded on next access.
     """
 
-    def __init__(self, db_path: Path = None):
+    DURABILITY_MODES = ("async", "sync", "session")
+
+    def __init__(self, db_path: Path = None, durability: str = None,
+                 max_sessions: int = None, idle_ttl: float = None):
         if db_path is None:
             db_path = Path("storage/interview_sessions.db")
         db_path.parent.mkdir(parents=True, exist_ok=True)
 
-        # Thread-safe SQLite store (uses new connection per call)
+        # Thread-safe SQLite store (one pooled connection per thread, WAL journal)
         self.store = SQLiteStore(db_path)
 
         # In-memory active sessions
         # structure: { session_id: {user_id, domain, created_at, history: [...], weaknesses: {...} } }
-        self.sessions: Dict[str, Dict[str, Any]] = {}
+        self.sessions = BoundedSessionStore(
+            max_sessions=max_sessions or int(os.getenv("SESSION_MAX", "1000")),
+            idle_ttl=float(os.getenv("SESSION_IDLE_TTL", "1800")) if idle_ttl is None else idle_ttl,
+            on_evict=self._spill,
+            loader=self._reload,
+        )
+        # session_id -> number of history entries already written as interaction rows
+        self._persisted: Dict[str, int] = {}
+        # striped per-session locks: history appends and their persistence bookkeeping stay
+        # consistent when one MemoryAgent is shared by every browser session in the process
+        self._locks = [threading.Lock() for _ in range(64)]
+
+        self.durability = (durability or os.getenv("MEMORY_DURABILITY") or "async").lower()
+        if self.durability not in self.DURABILITY_MODES:
+            raise ValueError(f"Unknown durability mode: {self.durability}")
+        self.writer = WriteBehindQueue(self.store) if self.durability != "session" else None
+
+    def _lock_for(self, session_id: str) -> threading.Lock:
+        return self._locks[hash(session_id) % len(self._locks)]
 
     # ------------------------------
     # Session lifecycle helpers
@@ -64,85 +130,227 @@ class MemoryAgent:
         else:
             self.sessions[session_id]["user_id"] = user_id
             self.sessions[session_id]["domain"] = domain
+        if self.writer is not None:
+            self._enqueue_header(session_id, self.sessions[session_id])
+
+    def _enqueue_header(self, session_id: str, sess: Dict[str, Any]):
+        self.writer.put(*self._header(session_id, sess))
+
+    @staticmethod
+    def _header(session_id: str, sess: Dict[str, Any]) -> Tuple[str, tuple]:
+        return "session", (session_id, sess.get("user_id", "unknown"), sess.get("domain"), sess.get("created_at"))
+
+    def _enqueue_pending(self, session_id: str, sess: Dict[str, Any]):
+        """Queue every history entry of the session not handed to the writer yet."""
+        self._put(self._pending(session_id, sess))
+
+    def _pending(self, session_id: str, sess: Dict[str, Any]) -> List[Tuple[str, tuple]]:
+        history = sess.get("history", [])
+        done = self._persisted.get(session_id, 0)
+        self._persisted[session_id] = len(history)
+        return [("interaction", (session_id, seq, history[seq])) for seq in range(done, len(history))]
+
+    def _put(self, writes: List[Tuple[str, tuple]]):
+        for kind, payload in writes:
+            self.writer.put(kind, payload)
 
     # ------------------------------
     # Recording interactions
     # ------------------------------
-    def add_interaction(self, session_id: str, question_entry: Dict[str, Any], response: Dict[str, Any]):
+    def add_interaction(self, session_id: str, question_entry: Dict[str, Any], response: Dict[str, Any],
+                        user_answer: str = None):
         """
         Called by orchestrator when an answer is evaluated.
-        Stores question + evaluation in session history and updates weaknesses.
+        Stores question + evaluation (and the raw answer, when given) in session history and updates weaknesses.
         """
         sess = self.sessions.get(session_id)
         if sess is None:
             raise KeyError(f"Session not found: {session_id}")
+        with self._lock_for(session_id):
+            writes = self._add_interaction(session_id, sess, question_entry, response, user_answer)
+            if writes:
+                self._put(writes)
+        if self.writer is not None and self.durability == "sync":
+            self.writer.flush()
 
-        entry = {
-            "time": time.time(),
-            "question": {
-                "id": question_entry.get("id"),
-                "q": question_entry.get("q"),
-                "answer": question_entry.get("answer", "")
-            },
-            "evaluation": response
-        }
-        sess["history"].append(entry)
+    def _add_interaction(self, session_id: str, sess: Dict[str, Any], question_entry: Dict[str, Any],
+                         response: Dict[str, Any], user_answer: str) -> List[Tuple[str, tuple]]:
+        """Update sess in place; returns the (kind, payload) records for the writer (none without one)."""
+        sess["history"].append(InteractionRecord(time.time(), question_entry, response, user_answer))
 
         # update weaknesses (simple heuristic: score < 6 considered weakness)
         score = int(response.get("score", 0))
         qid = question_entry.get("id")
-        if score < 6 and qid:
+        if score < WEAK_SCORE and qid:
             sess["weaknesses"].setdefault(qid, 0)
             sess["weaknesses"][qid] += 1
 
+        if self.writer is None:
+            return []
+        # append-only records; the background writer batches them into one transaction
+        writes = self._pending(session_id, sess)
+        if score < WEAK_SCORE and qid:
+            writes.append(("weakness", (session_id, qid, sess["weaknesses"][qid])))
+        # O(1) upserts into the user's profile aggregates (see load_user_profile)
+        writes.append(("profile", self._profile_update(sess, sess["history"][-1])))
+        return writes
+
+    @staticmethod
+    def _profile_update(sess: Dict[str, Any], entry) -> tuple:
+        evaluation = entry.get("evaluation") or {}
+        return (sess.get("user_id") or "unknown", sess.get("domain") or "unknown",
+                (entry.get("question") or {}).get("id"), int(evaluation.get("score", 0)), entry.get("time"))
+
+    def record_interaction(self, session_id: str, sess: Dict[str, Any], question_entry: Dict[str, Any],
+                           response: Dict[str, Any], user_answer: str = None):
+        """
+        add_interaction() for a session held outside self.sessions (e.g. in a SessionBackend):
+        sess is updated in place and the writer records for its new history entry are returned
+        instead of queued. The caller hands them to queue_writes() once its copy of sess is
+        saved, so a save retried on a newer copy does not count the answer twice.
+        """
+        with self._lock_for(session_id):
+            self._persisted[session_id] = len(sess["history"])
+            try:
+                writes = self._add_interaction(session_id, sess, question_entry, response, user_answer)
+            finally:
+                self._persisted.pop(session_id, None)
+        if writes:
+            writes.insert(0, self._header(session_id, sess))
+        return writes
+
+    def queue_writes(self, session_id: str, writes: List[Tuple[str, tuple]]):
+        """Queue records returned by record_interaction()."""
+        if self.writer is None or not writes:
+            return
+        with self._lock_for(session_id):
+            self._put(writes)
+        if self.durability == "sync":
+            self.writer.flush()
+
     # alias for older code naming
-    def record_answer(self, session_id: str, question: Dict[str, Any], evaluation: Dict[str, Any]):
-        self.add_interaction(session_id, question, evaluation)
+    def record_answer(self, session_id: str, question: Dict[str, Any], evaluation: Dict[str, Any],
+                      user_answer: str = None):
+        self.add_interaction(session_id, question, evaluation, user_answer)
 
     # ------------------------------
     # Persistence
     # ------------------------------
     def persist_session(self, session_id: str):
         """
-        Serialize the session safely to JSON and save to SQLite.
+        Save the session to SQLite incrementally: the header row is upserted and
+        only history entries not written yet become new interaction rows.
         """
         sess = self.sessions.get(session_id)
         if not sess:
             return
-        try:
-            safe_sess = json.loads(json.dumps(sess, default=str))
-        except Exception:
-            safe_sess = {
-                "user_id": sess.get("user_id"),
-                "domain": sess.get("domain"),
-                "history": [],
-                "weaknesses": sess.get("weaknesses", {})
-            }
-        # Use SQLiteStore.save_session(session_id, user_id, data)
-        self.store.save_session(session_id, sess.get("user_id", "unknown"), safe_sess)
+        self._persist(session_id, sess)
+        self.flush()
+
+    def persist_record(self, session_id: str, sess: Dict[str, Any]):
+        """persist_session() for a session held outside self.sessions (see record_interaction)."""
+        with self._lock_for(session_id):
+            # with a writer every entry was queued by record_interaction; otherwise write them all now
+            self._persisted[session_id] = 0 if self.writer is None else len(sess.get("history", []))
+            try:
+                self._persist_locked(session_id, sess)
+            finally:
+                self._persisted.pop(session_id, None)
+        self.flush()
+
+    def _persist(self, session_id: str, sess: Dict[str, Any]):
+        with self._lock_for(session_id):
+            self._persist_locked(session_id, sess)
+
+    def _persist_locked(self, session_id: str, sess: Dict[str, Any]):
+        if self.writer is not None:
+            # rows and weakness counters were queued as they happened; only the tail is left
+            self._enqueue_header(session_id, sess)
+            self._enqueue_pending(session_id, sess)
+            return
+        user_id = sess.get("user_id", "unknown")
+        done = self._persisted.get(session_id, 0)
+        history = sess.get("history", [])
+        self.store.upsert_session(session_id, user_id, sess.get("domain"), sess.get("created_at"))
+        self.store.append_interactions(session_id, done, history[done:], sess.get("weaknesses", {}))
+        if done < len(history):
+            self.store.update_profiles([self._profile_update(sess, e) for e in history[done:]])
+        self._persisted[session_id] = len(history)
+
+    def _spill(self, session_id: str, sess: Dict[str, Any], reason: str):
+        """Eviction hook: make sure the session is (being) written, then forget it."""
+        with self._lock_for(session_id):
+            self._persist_locked(session_id, sess)
+            self._persisted.pop(session_id, None)
+
+    def spill_session(self, session_id: str):
+        """Write out and drop a resident session now (reloaded lazily on next access)."""
+        sess = self.sessions.pop(session_id)
+        if sess is not None:
+            self._spill(session_id, sess, "explicit")
+
+    def _reload(self, session_id: str):
+        # make sure rows still sitting in the write-behind queue are visible
+        self.flush()
+        data = self.store.load_session(session_id)
+        if data and "history" in data:
+            self._persisted[session_id] = len(data["history"])
+            return data
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        out = {"sessions": self.sessions.stats()}
+        if self.writer is not None:
+            out["writer"] = self.writer.stats()
+        return out
+
+    def flush(self, timeout: float = None) -> bool:
+        """Block until queued writes are committed (no-op in "session" durability)."""
+        if self.writer is None:
+            return True
+        return self.writer.flush(timeout)
 
     def load_session(self, session_id: str):
         """
         Load a persisted session from storage into memory and return it.
         """
-        data = self.store.load_session(session_id)
+        data = self._reload(session_id)
         if data:
             self.sessions[session_id] = data
         return data
 
+    # ------------------------------
+    # Skill estimates (adaptive difficulty)
+    # ------------------------------
+    def load_skill(self, user_id: str, topic: str):
+        """(rating, n) saved for user_id on topic by an earlier session, or None."""
+        self.flush()
+        return self.store.load_skill(user_id, topic)
+
+    def save_skill(self, user_id: str, topic: str, rating: float, n: int):
+        if self.writer is not None:
+            self.writer.put("skill", (user_id, topic, rating, n))
+        else:
+            self.store.save_skills([(user_id, topic, rating, n)])
+
     # ------------------------------
     # User profile helpers (lightweight)
     # ------------------------------
+    PROFILE_AGGREGATES = ("interactions", "domains", "weaknesses", "recent_scores")
+
     def load_user_profile(self, user_id: str) -> Dict[str, Any]:
         """
-        Load profile stored under a special session key 'profile_<user_id>'.
+        Saved profile fields plus running aggregates, kept up to date by add_interaction:
+        interactions, domains {domain: {n, mean, variance, last_at}}, weaknesses
+        {question_id: count} and recent_scores (last PROFILE_RECENT_WINDOW answers).
+        A primary-key read, however long the user's history is.
         """
-        profile_sid = f"profile_{user_id}"
-        data = self.store.load_session(profile_sid)
-        return data or {}
+        # make sure aggregate updates still sitting in the write-behind queue are visible
+        self.flush()
+        return self.store.load_profile(user_id)
 
     def save_user_profile(self, user_id: str, profile: Dict[str, Any]):
-        profile_sid = f"profile_{user_id}"
-        safe_profile = json.loads(json.dumps(profile, default=str))
-        # store as a session row with the profile key
-        self.store.save_session(profile_sid, user_id, safe_profile)
+        # aggregates are maintained by the store; only the free-form fields are saved
+        safe_profile = json.loads(json.dumps(
+            {k: v for k, v in profile.items() if k not in self.PROFILE_AGGREGATES}, default=str))
+        self.store.save_profile_extra(user_id, safe_profile)
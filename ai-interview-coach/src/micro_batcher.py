@@ -0,0 +1,91 @@
+# micro_batcher.py
+# Gathers concurrent grading requests for a few milliseconds and sends them as one batch.
+import asyncio
+import threading
+from typing import Any, Dict, List, Tuple
+
+
+class _LoopBatch:
+    """Requests waiting on one event loop and that loop's dispatch timer."""
+    __slots__ = ("pending", "timer")
+
+    def __init__(self):
+        self.pending: List[Tuple[Dict[str, Any], str, asyncio.Future]] = []
+        self.timer = None
+
+
+class MicroBatcher:
+    """
+    Async micro-batcher in front of EvaluatorAgent.aevaluate_batch.
+    - submit(question, answer) -> evaluation dict (awaitable)
+    A batch is dispatched when max_batch requests are waiting or max_wait_ms has
+    passed since the first one arrived, whichever comes first.
+    Batches are kept per event loop (futures and timers belong to one loop), so one
+    instance can be shared by loops running in several threads.
+    """
+
+    def __init__(self, evaluator, max_batch: int = 16, max_wait_ms: float = 5.0):
+        self.evaluator = evaluator
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._batches: Dict[asyncio.AbstractEventLoop, _LoopBatch] = {}
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, question: Dict[str, Any], answer: str) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        full = None
+        with self._lock:
+            batch = self._batches.get(loop)
+            if batch is None:
+                for old in [l for l in self._batches if l.is_closed()]:
+                    del self._batches[old]
+                batch = self._batches[loop] = _LoopBatch()
+            batch.pending.append((question, answer, fut))
+            if len(batch.pending) >= self.max_batch:
+                full = self._take(batch)
+            elif batch.timer is None:
+                batch.timer = loop.call_later(self.max_wait, self._flush, loop)
+        if full:
+            asyncio.ensure_future(self._dispatch(full))
+        return await fut
+
+    @staticmethod
+    def _take(batch: _LoopBatch) -> list:
+        if batch.timer is not None:
+            batch.timer.cancel()
+            batch.timer = None
+        items, batch.pending = batch.pending, []
+        return items
+
+    def _flush(self, loop):
+        # timer callback, on `loop`
+        with self._lock:
+            batch = self._batches.get(loop)
+            items = self._take(batch) if batch is not None else []
+        if items:
+            asyncio.ensure_future(self._dispatch(items))
+
+    async def _dispatch(self, batch):
+        with self._lock:
+            self.batches += 1
+            self.items += len(batch)
+        try:
+            results = await self.evaluator.aevaluate_batch([(q, a) for q, a, _ in batch])
+        except Exception as e:
+            for _, _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        for (_, _, fut), res in zip(batch, results):
+            if not fut.done():
+                fut.set_result(res)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+        }
@@ -1,88 +1,540 @@
 # orchestrator_agent.py
+import os
+import time
+import uuid
+import asyncio
+import threading
 from pathlib import Path
 from interviewer_agent import InterviewerAgent
 from evaluator_agent import EvaluatorAgent
 from memory_agent import MemoryAgent
 from a2a_bus import A2ABus
+from micro_batcher import MicroBatcher
+from session_store import BoundedSessionStore
+from session_backend import SessionBackend, SessionConflict, backend_from_env
+from deadlines import DeadlineTimer
+from skill_model import SkillEstimate, SkillTracker, question_rating
+from grading_cascade import TIMEOUT_ANSWER, RuleTier
 from utils import logger
+from instrumentation import metrics
+
+
+def _to_wall(monotonic_deadline: float) -> float:
+    return time.time() + (monotonic_deadline - time.monotonic())
+
+
+def _to_monotonic(wall_deadline: float) -> float:
+    return time.monotonic() + (wall_deadline - time.time())
+
 
 class OrchestratorAgent:
-    def __init__(self, question_bank_path: Path, llm_adapter: str = None):
-        self.bus = A2ABus()
+    """
+    Thread-safe: one instance can serve every user in the process (app.py shares it via
+    st.cache_resource). Shared parts (question bank, indexes, evaluator, stores) are
+    read-only or internally locked; each session's mutable state has its own lock.
+
+    With a session backend (session_backend=..., or SESSION_BACKEND env) sessions are not
+    resident: every call loads the session record, and updates are written back with
+    compare-and-set, so any worker process sharing the backend can serve any session.
+
+    ask_next(session_id) without a difficulty is adaptive: it serves the unseen question rated
+    closest to the candidate's current skill estimate for the domain (skill_model.py), and
+    every graded answer updates that estimate.
+    """
+
+    def __init__(self, question_bank_path: Path, llm_adapter: str = None, max_concurrent_evals: int = None,
+                 batch_window_ms: float = None, max_batch: int = 16, session_backend: SessionBackend = None):
+        # A2A_BUS_MODE=async moves subscriber work (analytics sinks etc.) off the request path
+        self.bus = A2ABus(mode=os.getenv("A2A_BUS_MODE", "sync"),
+                          workers=int(os.getenv("A2A_BUS_WORKERS", "4")),
+                          backpressure=os.getenv("A2A_BUS_BACKPRESSURE", "block"))
         self.interviewer = InterviewerAgent(question_bank_path)
         self.evaluator = EvaluatorAgent(llm_adapter)
+        self.evaluator.attach_reference_index(self.interviewer.reference_index)
+        # a reloaded bank brings its own reference vectors; QUESTION_BANK_WATCH=<seconds> polls the file
+        self.interviewer.add_reload_listener(
+            lambda snapshot: self.evaluator.attach_reference_index(snapshot.reference_index))
+        watch = float(os.getenv("QUESTION_BANK_WATCH", "0"))
+        if watch > 0:
+            self.interviewer.watch(watch)
         # MemoryAgent will create/open DB at storage/interview_sessions.db by default
         self.memory = MemoryAgent()
-        self.active_sessions = {}  # session_id -> state
+        # session_id -> state; idle/overflow sessions are spilled to SQLite and reloaded on demand
+        self.active_sessions = BoundedSessionStore(
+            max_sessions=int(os.getenv("SESSION_MAX", "1000")),
+            idle_ttl=float(os.getenv("SESSION_IDLE_TTL", "1800")),
+            on_evict=self._spill_state,
+            loader=self._reload_state,
+        )
+        # async mode: cap on gradings in flight at once (semaphore is created lazily inside the loop)
+        self.max_concurrent_evals = max_concurrent_evals or int(os.getenv("MAX_CONCURRENT_EVALS", "100"))
+        # one semaphore per event loop: an asyncio.Semaphore is bound to the loop it first waits on
+        self._eval_semaphores = {}
+        self._eval_semaphores_lock = threading.Lock()
+        # async mode: optional micro-batching of concurrent submissions (0 disables)
+        if batch_window_ms is None:
+            batch_window_ms = float(os.getenv("EVAL_BATCH_WINDOW_MS", "0"))
+        self.batcher = MicroBatcher(self.evaluator, max_batch, batch_window_ms) if batch_window_ms > 0 else None
+        # per-question time limit in seconds (0 = untimed; ask_next(time_limit=...) overrides).
+        # Deadlines use the monotonic clock; an unanswered question is submitted as TIMEOUT by the
+        # deadline timer, and answers arriving later than deadline + grace are graded as TIMEOUT.
+        self.question_time_limit = float(os.getenv("QUESTION_TIME_LIMIT", "0"))
+        self.deadline_grace = float(os.getenv("QUESTION_DEADLINE_GRACE", "1.0"))
+        self.deadlines = DeadlineTimer(self._on_deadline)
+        self._timeout_rules = RuleTier()
+        # externalized sessions (None = resident in active_sessions) and how often an update
+        # is retried on a newer copy after losing a compare-and-set race
+        self.backend = session_backend if session_backend is not None else backend_from_env()
+        self.cas_retries = int(os.getenv("SESSION_CAS_RETRIES", "20"))
+        # per-(user, topic) skill estimates: a bounded cache over the memory store. The estimate a
+        # session adapts to lives in its state (state["skills"]), so every worker sees the same one
+        self.skills = SkillTracker(loader=self.memory.load_skill, saver=self.memory.save_skill)
 
     def start_session(self, user_id: str, domain: str = "java"):
-        # create session id and initialize memory
-        session_id = self.memory.create_session(user_id)
-        # also set domain explicitly
-        self.memory.start_session(session_id, user_id, domain)
-        # orchestrator-local state
+        with metrics.span("orchestrator.start_session"):
+            return self._start_session(user_id, domain)
+
+    def _start_session(self, user_id: str, domain: str):
+        if self.backend is not None:
+            # the whole live session (memory history + orchestrator state) is one backend record
+            session_id = str(uuid.uuid4())
+            self.backend.save(session_id, {
+                "user_id": user_id,
+                "domain": domain,
+                "created_at": time.time(),
+                "history": [],
+                "weaknesses": {},
+                "orchestrator": {"questions_asked": [], "current_q": None, "paused": False, "scores": []},
+            }, 0)
+        else:
+            # create session id and initialize memory
+            session_id = self.memory.create_session(user_id)
+            # also set domain explicitly
+            self.memory.start_session(session_id, user_id, domain)
+            # orchestrator-local state
+            state = {
+                "session_id": session_id,
+                "user_id": user_id,
+                "domain": domain,
+                "questions_asked": [],
+                "sampler": self.interviewer.new_sampler(),
+                "current_q": None,
+                "paused": False,
+                "scores": [],
+                "difficulty": None,
+                "skills": {},
+                "deadline": None,
+                "timeout_result": None,
+                "lock": threading.RLock(),
+            }
+            self.active_sessions[session_id] = state
+        logger.info(f"Started session {session_id} for user {user_id} domain {domain}")
+        # broadcast
+        self.bus.publish("session_started", {"session_id": session_id, "user_id": user_id, "domain": domain})
+        return session_id
+
+    # ------------------------------
+    # Session state (de)serialization: eviction spills and the session backend
+    # ------------------------------
+    def _compact_state(self, state: dict) -> dict:
+        compact = {
+            "questions_asked": [q.get("id") for q in state["questions_asked"]],
+            "current_q": (state.get("current_q") or {}).get("id"),
+            "paused": state.get("paused", False),
+            "scores": state.get("scores", []),
+            "difficulty": state.get("difficulty"),
+            "skills": state.get("skills", {}),
+        }
+        # monotonic time is per-process: deadlines are kept as wall-clock time outside it
+        if state.get("deadline") is not None:
+            compact["deadline_at"] = _to_wall(state["deadline"])
+        if state.get("claimed") is not None:
+            q, deadline = state["claimed"]
+            compact["claimed"] = q.get("id")
+            compact["claimed_deadline_at"] = None if deadline is None else _to_wall(deadline)
+        if state.get("timeout_result") is not None:
+            compact["timeout_result"] = state["timeout_result"]
+        return compact
+
+    def _restore_state(self, session_id: str, user_id: str, domain: str, saved: dict) -> dict:
+        asked = [q for q in (self.interviewer.get_question(qid) for qid in saved["questions_asked"]) if q]
+        sampler = self.interviewer.new_sampler()
+        sampler.exclude(saved["questions_asked"])
         state = {
             "session_id": session_id,
             "user_id": user_id,
             "domain": domain,
-            "questions_asked": [],
-            "current_q": None,
-            "paused": False,
-            "scores": []
+            "questions_asked": asked,
+            "sampler": sampler,
+            "current_q": self.interviewer.get_question(saved["current_q"]) if saved.get("current_q") else None,
+            "paused": saved.get("paused", False),
+            "scores": saved.get("scores", []),
+            "difficulty": saved.get("difficulty"),
+            "skills": dict(saved.get("skills") or {}),
+            "deadline": None,
+            "timeout_result": saved.get("timeout_result"),
+            "lock": threading.RLock(),
         }
-        self.active_sessions[session_id] = state
-        logger.info(f"Started session {session_id} for user {user_id} domain {domain}")
-        # broadcast
-        self.bus.publish("session_started", {"session_id": session_id, "user_id": user_id, "domain": domain})
-        return session_id
+        if state["current_q"] is not None and saved.get("deadline_at") is not None:
+            state["deadline"] = _to_monotonic(saved["deadline_at"])
+        claimed = self.interviewer.get_question(saved["claimed"]) if saved.get("claimed") else None
+        if claimed is not None:
+            deadline_at = saved.get("claimed_deadline_at")
+            state["claimed"] = (claimed, None if deadline_at is None else _to_monotonic(deadline_at))
+        return state
 
-    def ask_next(self, session_id: str, difficulty: str):
-        state = self.active_sessions.get(session_id)
-        if not state:
-            raise RuntimeError("Session not found")
-        exclude = [q.get("id") for q in state["questions_asked"]]
-        q = self.interviewer.pick_question(state["domain"], difficulty, exclude)
-        state["current_q"] = q
-        state["questions_asked"].append(q)
+    def _spill_state(self, session_id: str, state: dict, reason: str):
+        self.memory.store.save_session_extra(session_id, state["user_id"], state["domain"],
+                                             {"orchestrator": self._compact_state(state)})
+        self.memory.spill_session(session_id)
+        logger.info(f"Evicted session {session_id} ({reason})")
+        self.bus.publish("session_evicted", {"session_id": session_id, "reason": reason,
+                                             "stats": self.active_sessions.stats()})
+
+    def _reload_state(self, session_id: str):
+        sess = self.memory.sessions.get(session_id)
+        if not sess:
+            return None
+        saved = (self.memory.store.load_session_extra(session_id) or {}).get("orchestrator")
+        if saved is None:
+            # finished (or never started through the orchestrator): nothing to resume
+            return None
+        state = self._restore_state(session_id, sess.get("user_id"), sess.get("domain"), saved)
+        logger.info(f"Reloaded session {session_id}")
+        if state["deadline"] is not None:
+            self.deadlines.schedule(session_id, state["deadline"] + self.deadline_grace)
+        return state
+
+    def _load_shared(self, session_id: str):
+        loaded = self.backend.load(session_id)
+        if loaded is None:
+            return None, 0
+        record, version = loaded
+        state = self._restore_state(session_id, record.get("user_id"), record.get("domain"),
+                                    record["orchestrator"])
+        state["record"] = record
+        return state, version
+
+    def _peek(self, session_id: str):
+        """Current state of a session for reading, or None."""
+        if self.backend is None:
+            return self.active_sessions.get(session_id)
+        return self._load_shared(session_id)[0]
+
+    def _mutate(self, session_id: str, fn, state: dict = None):
+        """
+        Apply fn(state) to one session atomically; returns (state, fn's result).
+        Resident sessions run fn under their lock. With a session backend fn runs on a freshly
+        loaded copy written back by compare-and-set; on a conflict fn is re-run on the newer
+        copy, so fn must only change the state it is given. Raises RuntimeError("Session not found").
+        """
+        if self.backend is None:
+            state = state or self.active_sessions.get(session_id)
+            if not state:
+                raise RuntimeError("Session not found")
+            with state["lock"]:
+                return state, fn(state)
+        for _ in range(self.cas_retries + 1):
+            state, version = self._load_shared(session_id)
+            if state is None:
+                raise RuntimeError("Session not found")
+            result = fn(state)
+            record = state["record"]
+            record["orchestrator"] = self._compact_state(state)
+            try:
+                self.backend.save(session_id, record, version)
+                return state, result
+            except SessionConflict:
+                continue
+        raise SessionConflict(f"Session {session_id} kept changing; gave up after {self.cas_retries} retries")
+
+    def ask_next(self, session_id: str, difficulty: str = None, time_limit: float = None):
+        with metrics.span("orchestrator.ask_next"):
+            return self._ask_next(session_id, difficulty, time_limit)
+
+    def _ask_next(self, session_id: str, difficulty: str = None, time_limit: float = None):
+        limit = self.question_time_limit if time_limit is None else time_limit
+
+        def ask(state):
+            with metrics.span("interviewer.pick_question"):
+                if difficulty is None:
+                    skill = self._session_skill(state, state["domain"])
+                    q, level = self.interviewer.pick_adaptive(state["domain"], skill.rating, sampler=state["sampler"])
+                else:
+                    q = self.interviewer.pick_question(state["domain"], difficulty, sampler=state["sampler"])
+                    level = difficulty
+            state["current_q"] = q
+            state["difficulty"] = level
+            state["questions_asked"].append(q)
+            state["timeout_result"] = None
+            state["deadline"] = time.monotonic() + limit if limit else None
+            return q, state["deadline"]
+
+        _, (q, deadline) = self._mutate(session_id, ask)
+        if deadline is not None:
+            self.deadlines.schedule(session_id, deadline + self.deadline_grace)
+        else:
+            self.deadlines.cancel(session_id)
         self.bus.publish("question_asked", {"session_id": session_id, "question": q})
         return q
 
-    def submit_answer(self, session_id: str, answer_text: str):
-        state = self.active_sessions.get(session_id)
+    # ------------------------------
+    # Question deadlines
+    # ------------------------------
+    def time_remaining(self, session_id: str):
+        """Seconds left on the current question (never negative); None when untimed or idle."""
+        state = self._peek(session_id)
+        if not state or not state.get("current_q") or state.get("deadline") is None:
+            return None
+        return max(0.0, state["deadline"] - time.monotonic())
+
+    def enforce_deadline(self, session_id: str):
+        """
+        Submit TIMEOUT for an expired current question and return its evaluation. Also hands
+        back a timeout the deadline timer already recorded. None if nothing has expired.
+        """
+        state = self._peek(session_id)
         if not state:
-            raise RuntimeError("Session not found")
-        q = state.get("current_q")
-        if not q:
-            raise RuntimeError("No current question")
-        # evaluate with evaluator (evaluator expects question dict + user answer)
-        eval_result = self.evaluator.evaluate(q, answer_text)
-        # update orchestrator state
-        state["scores"].append(eval_result.get("score", 0))
-        # record to memory
-        self.memory.add_interaction(session_id, q, eval_result)
+            return None
+        if state.get("timeout_result") is not None:
+            def take(s):
+                result, s["timeout_result"] = s.get("timeout_result"), None
+                return result
+            return self._mutate(session_id, take, state)[1]
+        deadline = state.get("deadline")
+        if not state.get("current_q") or deadline is None or time.monotonic() < deadline:
+            return None
+        return self._submit_timeout(session_id)
+
+    def _on_deadline(self, session_id: str, token: int):
+        # timer thread; spilled sessions are re-armed when they are reloaded
+        if self.backend is None and session_id not in self.active_sessions:
+            return
+        result = self._submit_timeout(session_id)
+        if result is not None:
+            def keep(s):
+                s["timeout_result"] = result
+            try:
+                self._mutate(session_id, keep)
+            except RuntimeError:
+                pass
+
+    def _submit_timeout(self, session_id: str):
+        try:
+            state, q, _ = self._claim_question(session_id, TIMEOUT_ANSWER)
+        except RuntimeError:
+            return None  # answered meanwhile
+        try:
+            # the rule tier settles a timeout on its own: no LLM call on the shared timer thread
+            eval_result = self._timeout_rules.grade(q.get("q", ""), TIMEOUT_ANSWER, q.get("answer", ""))[0]
+            self.bus.publish("question_timed_out", {"session_id": session_id, "question": q})
+            return self._record_evaluation(session_id, state, q, TIMEOUT_ANSWER, eval_result)
+        except Exception:
+            # not re-armed (the deadline has passed); enforce_deadline() retries on the next poll
+            self._release_question(session_id, state, rearm=False)
+            raise
+
+    def _claim_question(self, session_id: str, answer_text: str):
+        """
+        Detach the current question for grading, so a concurrent submit (on any worker) or the
+        deadline timer cannot grade it twice. Answers arriving after deadline + grace become
+        TIMEOUT. Returns (state, question, answer_text); _release_question() undoes the claim.
+        """
+        def claim(state):
+            q = state.get("current_q")
+            if not q:
+                raise RuntimeError("No current question")
+            deadline = state.get("deadline")
+            late = deadline is not None and time.monotonic() > deadline + self.deadline_grace
+            state["current_q"] = None
+            state["claimed"] = (q, deadline)
+            return q, late
+
+        state, (q, late) = self._mutate(session_id, claim)
+        self.deadlines.cancel(session_id)
+        return state, q, TIMEOUT_ANSWER if late else answer_text
+
+    def _release_question(self, session_id: str, state: dict, rearm: bool = True):
+        def release(s):
+            claimed = s.pop("claimed", None)
+            if claimed is None or s.get("current_q") is not None:
+                return None
+            s["current_q"], s["deadline"] = claimed
+            return s["deadline"]
+
+        try:
+            _, deadline = self._mutate(session_id, release, state)
+        except RuntimeError:
+            return
+        if deadline is not None and rearm:
+            self.deadlines.schedule(session_id, deadline + self.deadline_grace)
+
+    def submit_answer(self, session_id: str, answer_text: str):
+        with metrics.span("orchestrator.submit_answer"):
+            state, q, answer_text = self._claim_question(session_id, answer_text)
+            try:
+                # evaluate with evaluator (evaluator expects question dict + user answer)
+                eval_result = self.evaluator.evaluate(q, answer_text)
+            except Exception:
+                self._release_question(session_id, state)
+                raise
+            return self._record_evaluation(session_id, state, q, answer_text, eval_result)
+
+    def submit_answer_stream(self, session_id: str, answer_text: str):
+        """
+        Streaming mode of submit_answer(): yields the evaluator's events (see eval_stream)
+        so a UI can render feedback as it arrives. The interaction is recorded just before
+        the final {"type": "result"} event; abandoning the stream earlier records nothing.
+        """
+        with metrics.span("orchestrator.submit_answer", mode="stream"):
+            state, q, answer_text = self._claim_question(session_id, answer_text)
+            recorded = False
+            try:
+                for event in self.evaluator.evaluate_stream(q, answer_text):
+                    if event["type"] == "result":
+                        self._record_evaluation(session_id, state, q, answer_text, event["result"])
+                        recorded = True
+                    yield event
+            finally:
+                if not recorded:
+                    # the question can be answered again
+                    self._release_question(session_id, state)
+
+    async def asubmit_answer(self, session_id: str, answer_text: str):
+        """
+        Async mode of submit_answer(): grading runs on the event loop, bounded by
+        max_concurrent_evals, so a server process can keep many gradings in flight.
+        """
+        with metrics.span("orchestrator.submit_answer", mode="async"):
+            return await self._asubmit_answer(session_id, answer_text)
+
+    async def _off_loop(self, fn, *args):
+        """Run fn on a worker thread when it loads/saves through the session backend (blocking I/O)."""
+        if self.backend is None:
+            return fn(*args)
+        return await asyncio.to_thread(fn, *args)
+
+    def _eval_semaphore(self) -> asyncio.Semaphore:
+        """The running loop's grading semaphore (max_concurrent_evals per loop)."""
+        loop = asyncio.get_running_loop()
+        with self._eval_semaphores_lock:
+            sem = self._eval_semaphores.get(loop)
+            if sem is None:
+                # a waited-on semaphore references its loop, so closed loops are dropped here
+                for old in [l for l in self._eval_semaphores if l.is_closed()]:
+                    del self._eval_semaphores[old]
+                sem = self._eval_semaphores[loop] = asyncio.Semaphore(self.max_concurrent_evals)
+        return sem
+
+    async def _asubmit_answer(self, session_id: str, answer_text: str):
+        # detach the question now so a second submit for the same session fails fast
+        state, q, answer_text = await self._off_loop(self._claim_question, session_id, answer_text)
+        try:
+            async with self._eval_semaphore():
+                if self.batcher is not None:
+                    eval_result = await self.batcher.submit(q, answer_text)
+                else:
+                    eval_result = await self.evaluator.aevaluate(q, answer_text)
+        except Exception:
+            await self._off_loop(self._release_question, session_id, state)
+            raise
+        return await self._off_loop(self._record_evaluation, session_id, state, q, answer_text, eval_result)
+
+    def _record_evaluation(self, session_id: str, state: dict, q: dict, answer_text: str, eval_result: dict):
+        def record(s):
+            # update orchestrator state
+            s["scores"].append(eval_result.get("score", 0))
+            # record to memory
+            writes = None
+            with metrics.span("memory.add_interaction"):
+                if self.backend is None:
+                    self.memory.add_interaction(session_id, q, eval_result, answer_text)
+                else:
+                    # queued below, once this copy of the record is the one saved
+                    writes = self.memory.record_interaction(session_id, s["record"], q, eval_result, answer_text)
+            # the session's skill estimates move with the record (re-computed on a CAS retry)
+            skills = self._update_skills(s, q, eval_result.get("score", 0))
+            # clear current question
+            s["current_q"] = None
+            s["deadline"] = None
+            s.pop("claimed", None)
+            return s["user_id"], writes, skills
+
+        _, (user_id, writes, skills) = self._mutate(session_id, record, state)
+        if writes:
+            self.memory.queue_writes(session_id, writes)
+        for topic, est in skills:
+            self.skills.remember(user_id, topic, est)
         # broadcast evaluation
         self.bus.publish("answer_evaluated", {
             "session_id": session_id, "question": q, "answer": answer_text, "evaluation": eval_result
         })
-        # clear current question
-        state["current_q"] = None
         return eval_result
 
+    def _session_skill(self, state: dict, topic: str) -> SkillEstimate:
+        """The session's estimate for topic, seeded on first use from the store (from the
+        cache for resident sessions; another worker may have written it otherwise)."""
+        saved = state["skills"].get(topic)
+        if saved is None:
+            est = self.skills.get(state["user_id"], topic, fresh=self.backend is not None)
+            saved = state["skills"][topic] = [est.rating, est.n]
+        return SkillEstimate(*saved)
+
+    def _update_skills(self, state: dict, q: dict, score) -> list:
+        """Fold one graded answer into the session's estimates; returns [(topic, estimate)]."""
+        rating = question_rating(q, state.get("difficulty"))
+        try:
+            score = float(score or 0)
+        except (TypeError, ValueError):
+            score = 0.0
+        # questions tagged with a finer topic also feed that topic's estimate
+        topics = [state["domain"]]
+        if q.get("topic") and q["topic"] != state["domain"]:
+            topics.append(q["topic"])
+        updated = []
+        for topic in topics:
+            est = self.skills.step(self._session_skill(state, topic), rating, score)
+            state["skills"][topic] = [est.rating, est.n]
+            updated.append((topic, est))
+        return updated
+
+    def current_difficulty(self, session_id: str):
+        """Difficulty of the question last asked in the session (None before the first one)."""
+        state = self._peek(session_id)
+        return state.get("difficulty") if state else None
+
+    def skill_estimate(self, user_id: str, topic: str) -> dict:
+        """{"rating", "n", "difficulty"} for a user on a domain/topic."""
+        return self.skills.get(user_id, topic).to_dict()
+
     def pause_session(self, session_id: str):
-        s = self.active_sessions.get(session_id)
-        if s:
-            s["paused"] = True
-            self.bus.publish("session_paused", {"session_id": session_id})
+        self._set_paused(session_id, True)
 
     def resume_session(self, session_id: str):
-        s = self.active_sessions.get(session_id)
-        if s:
-            s["paused"] = False
-            self.bus.publish("session_resumed", {"session_id": session_id})
+        self._set_paused(session_id, False)
+
+    def _set_paused(self, session_id: str, paused: bool):
+        def apply(s):
+            s["paused"] = paused
+        try:
+            self._mutate(session_id, apply)
+        except RuntimeError:
+            return
+        self.bus.publish("session_paused" if paused else "session_resumed", {"session_id": session_id})
 
     def finish_session(self, session_id: str):
+        with metrics.span("orchestrator.finish_session"):
+            return self._finish_session(session_id)
+
+    def _finish_session(self, session_id: str):
         # Build rich summary from MemoryAgent sessions data (not just scores)
-        sess = self.memory.sessions.get(session_id)
+        record = None
+        if self.backend is not None:
+            loaded = self.backend.load(session_id)
+            record = loaded[0] if loaded else None
+            sess = record
+        else:
+            sess = self.memory.sessions.get(session_id)
         if not sess:
             # if memory persisted earlier, try loading
             loaded = self.memory.load_session(session_id)
@@ -116,15 +568,53 @@ class OrchestratorAgent:
 
         # persist to DB
         try:
-            self.memory.persist_session(session_id)
+            with metrics.span("memory.persist_session"):
+                if record is not None:
+                    self.memory.persist_record(session_id, record)
+                else:
+                    self.memory.persist_session(session_id)
         except Exception as e:
             logger.exception("Failed to persist session: %s", e)
 
         # broadcast
         self.bus.publish("session_finished", {"session_id": session_id, "summary": summary})
 
-        # remove from active sessions if present
-        if session_id in self.active_sessions:
-            del self.active_sessions[session_id]
+        # remove from active sessions if present (and drop the resume state kept for eviction)
+        self.deadlines.cancel(session_id)
+        if self.backend is not None:
+            self.backend.delete(session_id)
+            return summary
+        self.active_sessions.pop(session_id)
+        if sess.get("orchestrator"):
+            self.memory.store.save_session_extra(session_id, sess.get("user_id"), sess.get("domain"), {})
 
         return summary
+
+    def reload_bank(self) -> bool:
+        """Pick up an edited question bank (see InterviewerAgent.reload). True if a new version was loaded."""
+        reloaded = self.interviewer.reload()
+        if reloaded:
+            self.bus.publish("bank_reloaded", self.interviewer.stats())
+        return reloaded
+
+    def stats(self) -> dict:
+        """Snapshot of stage latencies (p50/p95/p99 per stage/adapter) and component counters."""
+        out = {
+            "stages": metrics.snapshot(),
+            "active_sessions": self.active_sessions.stats(),
+            "memory": self.memory.stats(),
+            "bus": self.bus.stats(),
+            "bank": self.interviewer.stats(),
+            "skills": self.skills.stats(),
+        }
+        if self.evaluator.cache is not None:
+            out["eval_cache"] = self.evaluator.cache.stats()
+        if hasattr(self.evaluator.llm, "stats"):
+            out["llm"] = self.evaluator.llm.stats()
+        if self.evaluator.cascade is not None:
+            out["cascade"] = self.evaluator.cascade.stats()
+        if self.batcher is not None:
+            out["batcher"] = self.batcher.stats()
+        if self.backend is not None:
+            out["session_backend"] = self.backend.stats()
+        return out
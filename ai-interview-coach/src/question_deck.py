@@ -0,0 +1,26 @@
+# question_deck.py
+# Sampling without replacement over a fixed-size range of positions (one question bucket,
+# or one run of equally rated questions).
+import random
+from typing import Dict
+
+
+class Deck:
+    """
+    Lazy Fisher-Yates shuffle over one bucket.
+    Only swapped positions are stored, so a draw is O(1) and memory is O(draws),
+    regardless of how large the bucket is.
+    """
+    __slots__ = ("remaining", "swaps")
+
+    def __init__(self, size: int):
+        self.remaining = size
+        self.swaps: Dict[int, int] = {}
+
+    def draw(self, rng: random.Random) -> int:
+        r = rng.randrange(self.remaining)
+        last = self.remaining - 1
+        pos = self.swaps.get(r, r)
+        self.swaps[r] = self.swaps.pop(last, last)
+        self.remaining = last
+        return pos
@@ -0,0 +1,282 @@
+# resilient_llm.py
+# Adapter wrapper for remote graders: per-call deadlines, retries with jittered exponential
+# backoff, a token-bucket rate limiter, a circuit breaker and hedged requests.
+#
+#   llm = ResilientLLM(GeminiAdapter(), fallback=MockLLM(), timeout=8, rate=2, hedge_after=1.5)
+#
+# The wrapped adapter should expose evaluate_raw()/evaluate_batch_raw() that raise on failure;
+# plain evaluate()/evaluate_batch() are used otherwise.
+import os
+import time
+import random
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+from utils import logger
+from eval_stream import events_from_result, stream_with_fallback
+
+
+class TokenBucket:
+    """Allow `rate` calls per second on average with bursts of up to `burst`."""
+
+    def __init__(self, rate: float, burst: float = None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: float = None) -> bool:
+        """Take one token, sleeping until one is available; False if that would exceed timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return True
+                wait_s = (1.0 - self.tokens) / self.rate
+            if deadline is not None and now + wait_s > deadline:
+                return False
+            time.sleep(wait_s)
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `failure_threshold` consecutive failures; open -> half_open after
+    `reset_timeout` seconds, letting one trial call through; its outcome closes or reopens.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.opens = 0
+        self._trial = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                self._trial = False
+            if self.state == "half_open" and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+
+    def release_trial(self):
+        """Give back a half-open trial that ended without a verdict (e.g. an abandoned stream)."""
+        with self._lock:
+            if self.state == "half_open":
+                self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.opens += 1
+                    logger.warning("LLM circuit breaker opened after %d failures", self.failures)
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+
+class ResilientLLM:
+    """
+    Wraps a grading adapter. Every attempt waits for a rate-limit token, runs on a worker
+    thread under a deadline and, with hedge_after set, fires a duplicate request if the
+    first has not answered in time (the first reply wins). Failed attempts are retried with
+    full-jitter exponential backoff; when retries run out or the breaker is open, the
+    fallback grader answers and the result is flagged "fallback".
+    Timed-out calls cannot be cancelled; they finish in the background and are ignored.
+    """
+
+    def __init__(self, inner, fallback=None, timeout: float = 10.0, max_retries: int = 2,
+                 backoff_base: float = 0.25, backoff_max: float = 4.0, rate: float = None,
+                 burst: float = None, breaker: CircuitBreaker = None, hedge_after: float = None,
+                 max_workers: int = 32):
+        self.inner = inner
+        self.fallback = fallback
+        self.name = getattr(inner, "name", type(inner).__name__)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.breaker = breaker or CircuitBreaker()
+        self.hedge_after = hedge_after
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-call")
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(
+            ("calls", "attempts", "retries", "timeouts", "errors", "rate_limited",
+             "short_circuited", "fallbacks", "hedges", "hedge_wins"), 0)
+
+    def _inc(self, key: str, n: int = 1):
+        with self._lock:
+            self._counts[key] += n
+
+    # ------------------------------
+    # attempt machinery
+    # ------------------------------
+    def _attempt(self, fn: Callable, args: Tuple) -> Any:
+        start = time.monotonic()
+        if self.bucket is not None and not self.bucket.acquire(self.timeout):
+            self._inc("rate_limited")
+            raise TimeoutError("rate limit wait exceeded the call deadline")
+        remaining = self.timeout - (time.monotonic() - start)
+        primary = self._pool.submit(fn, *args)
+        futures = [primary]
+        if self.hedge_after is not None and self.hedge_after < remaining:
+            done, _ = wait(futures, timeout=self.hedge_after)
+            if not done and (self.bucket is None or self.bucket.acquire(0)):
+                self._inc("hedges")
+                futures.append(self._pool.submit(fn, *args))
+        pending = set(futures)
+        while pending:
+            left = self.timeout - (time.monotonic() - start)
+            if left <= 0:
+                break
+            done, pending = wait(pending, timeout=left, return_when=FIRST_COMPLETED)
+            for f in done:
+                if f.exception() is None:
+                    if f is not primary:
+                        self._inc("hedge_wins")
+                    return f.result()
+            if not pending:
+                # every request failed: surface the first error
+                raise next(iter(done)).exception()
+        self._inc("timeouts")
+        raise TimeoutError(f"LLM call exceeded {self.timeout:.1f}s deadline")
+
+    def _call(self, fn: Callable, args: Tuple, fallback: Callable) -> Any:
+        self._inc("calls")
+        for attempt in range(self.max_retries + 1):
+            if not self.breaker.allow():
+                self._inc("short_circuited")
+                break
+            if attempt:
+                self._inc("retries")
+            self._inc("attempts")
+            try:
+                result = self._attempt(fn, args)
+                self.breaker.record_success()
+                return result
+            except Exception as e:
+                self._inc("errors")
+                self.breaker.record_failure()
+                logger.warning("LLM attempt %d/%d failed: %s", attempt + 1, self.max_retries + 1, e)
+            if attempt < self.max_retries:
+                time.sleep(random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt)))
+        self._inc("fallbacks")
+        return fallback()
+
+    def _fallback_one(self, question_text: str, user_answer: str, correct_answer: str) -> Dict[str, Any]:
+        if self.fallback is None:
+            raise RuntimeError("LLM unavailable and no fallback grader configured")
+        result = dict(self.fallback.evaluate(question_text, user_answer, correct_answer))
+        result["fallback"] = True
+        return result
+
+    # ------------------------------
+    # adapter interface
+    # ------------------------------
+    def evaluate(self, question_text: str, user_answer: str, correct_answer: str) -> Dict[str, Any]:
+        fn = getattr(self.inner, "evaluate_raw", self.inner.evaluate)
+        args = (question_text, user_answer, correct_answer)
+        return self._call(fn, args, lambda: self._fallback_one(*args))
+
+    def evaluate_batch(self, items: List[Tuple[str, str, str]]) -> List[Dict[str, Any]]:
+        items = list(items)
+        fn = getattr(self.inner, "evaluate_batch_raw", None) or getattr(self.inner, "evaluate_batch", None)
+        if fn is None:
+            return [self.evaluate(*it) for it in items]
+        return self._call(fn, (items,), lambda: [self._fallback_one(*it) for it in items])
+
+    def evaluate_stream(self, question_text: str, user_answer: str, correct_answer: str) -> Iterator[Dict[str, Any]]:
+        """
+        Stream through the inner adapter while the breaker allows it. A failed stream is
+        replaced by the retrying evaluate() path (see eval_stream.stream_with_fallback).
+        The deadline and hedging apply only to that non-streaming path.
+        """
+        args = (question_text, user_answer, correct_answer)
+        fn = getattr(self.inner, "evaluate_stream_raw", None)
+        if fn is None:
+            return events_from_result(self.evaluate(*args))
+        return self._stream(fn, args)
+
+    def _stream(self, fn: Callable, args: Tuple) -> Iterator[Dict[str, Any]]:
+        # the breaker is asked once iteration starts: a stream never started holds no trial
+        if not self.breaker.allow():
+            yield from events_from_result(self.evaluate(*args))
+            return
+        yield from stream_with_fallback(self._tracked_stream(fn, args), lambda: self.evaluate(*args))
+
+    def _tracked_stream(self, fn: Callable, args: Tuple) -> Iterator[Dict[str, Any]]:
+        """Runs on a breaker admission taken by the caller and always settles it."""
+        self._inc("calls")
+        self._inc("attempts")
+        outcome = None
+        try:
+            if self.bucket is not None and not self.bucket.acquire(self.timeout):
+                self._inc("rate_limited")
+                raise TimeoutError("rate limit wait exceeded the call deadline")
+            yield from fn(*args)
+            outcome = "success"
+        except Exception:
+            self._inc("errors")
+            outcome = "failure"
+            raise
+        finally:
+            if outcome == "success":
+                self.breaker.record_success()
+            elif outcome == "failure":
+                self.breaker.record_failure()
+            else:
+                # closed early by the consumer (GeneratorExit): no verdict on the backend
+                self.breaker.release_trial()
+
+    async def aevaluate(self, question_text: str, user_answer: str, correct_answer: str) -> Dict[str, Any]:
+        return await asyncio.to_thread(self.evaluate, question_text, user_answer, correct_answer)
+
+    async def aevaluate_batch(self, items: List[Tuple[str, str, str]]) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self.evaluate_batch, items)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out = dict(self._counts)
+        out["breaker"] = {"state": self.breaker.state, "opens": self.breaker.opens}
+        return out
+
+
+def resilient_from_env(inner, fallback=None) -> ResilientLLM:
+    """
+    LLM_TIMEOUT (s, default 10), LLM_MAX_RETRIES (2), LLM_RATE (calls/s, unset = unlimited),
+    LLM_BURST, LLM_BREAKER_FAILURES (5), LLM_BREAKER_RESET (s, 30), LLM_HEDGE_MS (unset = off).
+    """
+    rate = os.getenv("LLM_RATE")
+    burst = os.getenv("LLM_BURST")
+    hedge = os.getenv("LLM_HEDGE_MS")
+    return ResilientLLM(
+        inner, fallback,
+        timeout=float(os.getenv("LLM_TIMEOUT", "10")),
+        max_retries=int(os.getenv("LLM_MAX_RETRIES", "2")),
+        rate=float(rate) if rate else None,
+        burst=float(burst) if burst else None,
+        breaker=CircuitBreaker(int(os.getenv("LLM_BREAKER_FAILURES", "5")),
+                               float(os.getenv("LLM_BREAKER_RESET", "30"))),
+        hedge_after=float(hedge) / 1000.0 if hedge else None,
+    )
@@ -0,0 +1,292 @@
+# session_backend.py
+# Externalized live-session state with optimistic concurrency (versioned compare-and-set), so
+# several worker processes can share sessions:
+#   InProcessBackend      one process (threads / several orchestrators in one process)
+#   SQLiteSessionBackend  worker processes on one machine sharing a SQLite file
+#   RedisSessionBackend   Redis-compatible server (redis-py); FakeRedis stands in locally
+#
+# SESSION_BACKEND=local keeps the orchestrator's resident sessions (default, no backend).
+import os
+import json
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from storage.sqlite_store import SQLiteStore
+
+try:
+    import redis
+    from redis.exceptions import WatchError
+    REDIS_AVAILABLE = True
+except Exception:
+    redis = None
+    REDIS_AVAILABLE = False
+
+    class WatchError(Exception):
+        """A watched key changed before EXEC (mirrors redis.exceptions.WatchError)."""
+
+
+class SessionConflict(Exception):
+    """The record was changed by another writer since it was loaded."""
+
+
+def _encode(obj):
+    # history entries are InteractionRecord objects until their first round trip
+    return obj.to_dict() if hasattr(obj, "to_dict") else str(obj)
+
+
+def dump_record(record: Dict[str, Any]) -> str:
+    return json.dumps(record, default=_encode, separators=(",", ":"))
+
+
+class SessionBackend:
+    """
+    Versioned session records.
+    - load(sid) -> (record, version) or None
+    - save(sid, record, expected_version) -> new version; expected_version=0 creates the
+      record. Raises SessionConflict when the stored version is no longer expected_version.
+    - delete(sid)
+    Records are JSON-serializable dicts; every load returns a private copy.
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self.loads = 0
+        self.saves = 0
+        self.conflicts = 0
+
+    def load(self, session_id: str) -> Optional[Tuple[Dict[str, Any], int]]:
+        self.loads += 1
+        raw = self._load(session_id)
+        if raw is None:
+            return None
+        data, version = raw
+        return json.loads(data), version
+
+    def save(self, session_id: str, record: Dict[str, Any], expected_version: int) -> int:
+        if not self._cas(session_id, dump_record(record), expected_version):
+            self.conflicts += 1
+            raise SessionConflict(f"Session {session_id} changed since version {expected_version}")
+        self.saves += 1
+        return expected_version + 1
+
+    def delete(self, session_id: str):
+        raise NotImplementedError
+
+    def _load(self, session_id: str) -> Optional[Tuple[str, int]]:
+        raise NotImplementedError
+
+    def _cas(self, session_id: str, data: str, expected_version: int) -> bool:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, "loads": self.loads, "saves": self.saves, "conflicts": self.conflicts}
+
+
+class InProcessBackend(SessionBackend):
+    """Dict of serialized records; same semantics as the shared backends, no I/O."""
+
+    name = "inprocess"
+
+    def __init__(self):
+        super().__init__()
+        self._data: Dict[str, Tuple[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def _load(self, session_id):
+        with self._lock:
+            return self._data.get(session_id)
+
+    def _cas(self, session_id, data, expected_version):
+        with self._lock:
+            current = self._data.get(session_id)
+            if (current[1] if current else 0) != expected_version:
+                return False
+            self._data[session_id] = (data, expected_version + 1)
+            return True
+
+    def delete(self, session_id):
+        with self._lock:
+            self._data.pop(session_id, None)
+
+
+class SQLiteSessionBackend(SessionBackend):
+    """session_state table on a SQLite file shared by the worker processes (WAL, pooled connections)."""
+
+    name = "sqlite"
+
+    def __init__(self, db_path: Path = None, store: SQLiteStore = None):
+        super().__init__()
+        if store is None:
+            db_path = Path(db_path or "storage/session_state.db")
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            store = SQLiteStore(db_path)
+        self.store = store
+
+    def _load(self, session_id):
+        return self.store.load_state(session_id)
+
+    def _cas(self, session_id, data, expected_version):
+        return self.store.cas_state(session_id, data, expected_version)
+
+    def delete(self, session_id):
+        self.store.delete_state(session_id)
+
+
+class RedisSessionBackend(SessionBackend):
+    """
+    One string key per session holding "<version>\\n<json>". save() is WATCH / GET /
+    MULTI / SET / EXEC, so a write that raced another worker fails instead of overwriting.
+    """
+
+    name = "redis"
+
+    def __init__(self, client=None, url: str = None, prefix: str = "interview:session:", ttl: int = 86400):
+        super().__init__()
+        if client is None:
+            if not REDIS_AVAILABLE:
+                raise RuntimeError("redis package not installed (pip install redis), or use REDIS_URL=fake://")
+            client = redis.Redis.from_url(url or "redis://localhost:6379/0")
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+
+    @staticmethod
+    def _split(raw) -> Tuple[str, int]:
+        if isinstance(raw, bytes):
+            raw = raw.decode("utf-8")
+        version, _, data = raw.partition("\n")
+        return data, int(version)
+
+    def _load(self, session_id):
+        raw = self.client.get(self.prefix + session_id)
+        return None if raw is None else self._split(raw)
+
+    def _cas(self, session_id, data, expected_version):
+        key = self.prefix + session_id
+        with self.client.pipeline() as pipe:
+            try:
+                pipe.watch(key)
+                raw = pipe.get(key)
+                if (0 if raw is None else self._split(raw)[1]) != expected_version:
+                    return False
+                pipe.multi()
+                pipe.set(key, f"{expected_version + 1}\n{data}", ex=self.ttl or None)
+                pipe.execute()
+                return True
+            except WatchError:
+                return False
+
+    def delete(self, session_id):
+        self.client.delete(self.prefix + session_id)
+
+
+class FakeRedis:
+    """
+    In-process stand-in for the redis-py calls RedisSessionBackend makes (get/set/delete
+    and WATCH/MULTI/EXEC pipelines), for local runs without a server. Expiry is ignored.
+    """
+
+    def __init__(self):
+        self._data: Dict[str, bytes] = {}
+        self._changes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            return self._data.get(key)
+
+    def set(self, key, value, ex=None):
+        with self._lock:
+            self._set(key, value)
+        return True
+
+    def _set(self, key, value):
+        self._data[key] = value.encode("utf-8") if isinstance(value, str) else value
+        self._changes[key] = self._changes.get(key, 0) + 1
+
+    def delete(self, *keys):
+        with self._lock:
+            removed = 0
+            for key in keys:
+                if self._data.pop(key, None) is not None:
+                    removed += 1
+                    self._changes[key] = self._changes.get(key, 0) + 1
+            return removed
+
+    def pipeline(self):
+        return _FakePipeline(self)
+
+
+class _FakePipeline:
+    def __init__(self, server: FakeRedis):
+        self.server = server
+        self._watched: Dict[str, int] = {}
+        self._queued = []
+        self._in_multi = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.reset()
+        return False
+
+    def reset(self):
+        self._watched, self._queued, self._in_multi = {}, [], False
+
+    def watch(self, *keys):
+        with self.server._lock:
+            for key in keys:
+                self._watched[key] = self.server._changes.get(key, 0)
+
+    def get(self, key):
+        if self._in_multi:
+            self._queued.append(("get", key))
+            return self
+        return self.server.get(key)
+
+    def multi(self):
+        self._in_multi = True
+
+    def set(self, key, value, ex=None):
+        self._queued.append(("set", key, value))
+        return self
+
+    def execute(self):
+        server = self.server
+        with server._lock:
+            if any(server._changes.get(k, 0) != n for k, n in self._watched.items()):
+                self.reset()
+                raise WatchError("Watched variable changed.")
+            results = []
+            for op in self._queued:
+                if op[0] == "set":
+                    server._set(op[1], op[2])
+                    results.append(True)
+                else:
+                    results.append(server._data.get(op[1]))
+        self.reset()
+        return results
+
+
+def backend_from_env() -> Optional[SessionBackend]:
+    """
+    SESSION_BACKEND = local (default: resident sessions, no backend) | inprocess | sqlite | redis
+    SESSION_BACKEND_PATH (sqlite file, default storage/session_state.db)
+    REDIS_URL (default redis://localhost:6379/0; fake:// uses FakeRedis)
+    """
+    kind = os.getenv("SESSION_BACKEND", "local").lower()
+    if kind in ("", "local", "off"):
+        return None
+    if kind == "inprocess":
+        return InProcessBackend()
+    if kind == "sqlite":
+        return SQLiteSessionBackend(Path(os.getenv("SESSION_BACKEND_PATH", "storage/session_state.db")))
+    if kind == "redis":
+        url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+        if url.startswith("fake://"):
+            return RedisSessionBackend(client=FakeRedis())
+        return RedisSessionBackend(url=url)
+    raise ValueError(f"Unknown SESSION_BACKEND: {kind}")
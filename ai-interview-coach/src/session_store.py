@@ -0,0 +1,151 @@
+# session_store.py
+# Bounded in-memory session map with idle-TTL + LRU eviction, spill-on-evict and lazy reload.
+import time
+from collections import OrderedDict
+from threading import RLock
+from typing import Any, Callable, Dict, Optional
+
+
+class BoundedSessionStore:
+    """
+    Dict-like map of live sessions.
+    - Entries idle longer than idle_ttl seconds, or beyond max_sessions (least recently
+      used first), are evicted and handed to on_evict(key, value, reason) to be spilled.
+    - get() on a missing key calls loader(key) to bring a spilled session back.
+    `in` only checks resident entries; use get() when a spilled session should be reloaded.
+    """
+
+    def __init__(self, max_sessions: int = 1000, idle_ttl: float = 1800.0,
+                 on_evict: Callable[[str, Any, str], None] = None,
+                 loader: Callable[[str], Optional[Any]] = None):
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.on_evict = on_evict
+        self.loader = loader
+        self._data: "OrderedDict[str, list]" = OrderedDict()  # key -> [value, last_access]
+        self._lock = RLock()
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.evicted_idle = 0
+        self.evicted_lru = 0
+        self.spill_errors = 0
+
+    # ------------------------------
+    # dict-style access
+    # ------------------------------
+    def get(self, key: str, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                item[1] = time.monotonic()
+                self._data.move_to_end(key)
+                self.hits += 1
+                return item[0]
+            self.misses += 1
+        if self.loader is None:
+            return default
+        value = self.loader(key)
+        if value is None:
+            return default
+        with self._lock:
+            self.reloads += 1
+            # the loader may already have inserted it (e.g. MemoryAgent.load_session)
+            if key not in self._data:
+                self._data[key] = [value, time.monotonic()]
+            value = self._data[key][0]
+        self._evict_overflow()
+        return value
+
+    def __getitem__(self, key: str):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: Any):
+        with self._lock:
+            self._data[key] = [value, time.monotonic()]
+            self._data.move_to_end(key)
+        self._evict_overflow()
+
+    def __delitem__(self, key: str):
+        with self._lock:
+            del self._data[key]
+
+    def pop(self, key: str, default=None):
+        with self._lock:
+            item = self._data.pop(key, None)
+        return default if item is None else item[0]
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def keys(self):
+        with self._lock:
+            return list(self._data.keys())
+
+    def items(self):
+        with self._lock:
+            return [(k, v[0]) for k, v in self._data.items()]
+
+    def values(self):
+        with self._lock:
+            return [v[0] for v in self._data.values()]
+
+    # ------------------------------
+    # eviction
+    # ------------------------------
+    def _evict_overflow(self):
+        victims = []
+        now = time.monotonic()
+        with self._lock:
+            # oldest entries sit at the front, so expiry checks stop at the first fresh one
+            while self._data:
+                key, (value, last) = next(iter(self._data.items()))
+                if self.idle_ttl and now - last > self.idle_ttl:
+                    reason = "idle"
+                    self.evicted_idle += 1
+                elif len(self._data) > self.max_sessions:
+                    reason = "lru"
+                    self.evicted_lru += 1
+                else:
+                    break
+                self._data.popitem(last=False)
+                victims.append((key, value, reason))
+        for key, value, reason in victims:
+            self._spill(key, value, reason)
+
+    def sweep(self) -> int:
+        """Evict idle sessions now (also happens lazily on every insert/reload). Returns how many."""
+        before = self.evicted_idle + self.evicted_lru
+        self._evict_overflow()
+        return self.evicted_idle + self.evicted_lru - before
+
+    def _spill(self, key: str, value: Any, reason: str):
+        if self.on_evict is None:
+            return
+        try:
+            self.on_evict(key, value, reason)
+        except Exception:
+            self.spill_errors += 1
+            # keep the session rather than lose it
+            with self._lock:
+                self._data.setdefault(key, [value, time.monotonic()])
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "max_sessions": self.max_sessions,
+                "hits": self.hits,
+                "misses": self.misses,
+                "reloads": self.reloads,
+                "evicted_idle": self.evicted_idle,
+                "evicted_lru": self.evicted_lru,
+                "spill_errors": self.spill_errors,
+            }
@@ -0,0 +1,176 @@
+# similarity_index.py
+# Offline, deterministic answer similarity: hashed character n-gram TF-IDF vectors of the
+# bank's reference answers, stored as one contiguous float32 matrix (optionally memory-mapped).
+import json
+import math
+import re
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except Exception:
+    NUMPY_AVAILABLE = False
+
+DEFAULT_DIM = 2048
+NGRAM_RANGE = (3, 5)
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def _normalize(text: str) -> str:
+    return " " + _NON_WORD.sub(" ", (text or "").lower()).strip() + " "
+
+
+def term_counts(text: str, dim: int = DEFAULT_DIM) -> Dict[int, float]:
+    """Hashed character n-gram counts (crc32 so buckets are stable across processes)."""
+    s = _normalize(text)
+    counts: Dict[int, float] = {}
+    lo, hi = NGRAM_RANGE
+    for n in range(lo, hi + 1):
+        for i in range(len(s) - n + 1):
+            gram = s[i:i + n]
+            if gram.strip():
+                b = zlib.crc32(gram.encode("utf-8")) % dim
+                counts[b] = counts.get(b, 0.0) + 1.0
+    return counts
+
+
+class ReferenceIndex:
+    """
+    One L2-normalized TF-IDF row per question's reference answer.
+    - similarity(question_id, answer) -> cosine in [0, 1] (one dot product)
+    - row_for(question_id=None, question_text=None) -> row number or None
+    - save(path) / load(path, mmap=True) for a prebuilt, memory-mapped matrix
+    Needs NumPy for the dense matrix; without it rows are kept as sparse dicts.
+    """
+
+    def __init__(self, ids: List[str], texts: List[str], idf: List[float], matrix, dim: int = DEFAULT_DIM):
+        self.ids = ids
+        self.dim = dim
+        self.idf = np.asarray(idf, dtype=np.float32) if NUMPY_AVAILABLE else list(idf)
+        self.matrix = matrix
+        self._by_id = {qid: i for i, qid in enumerate(ids)}
+        self._by_text = {t: i for i, t in enumerate(texts)}
+        self.texts = texts
+
+    # ------------------------------
+    # construction
+    # ------------------------------
+    @classmethod
+    def from_bank(cls, bank: Dict[str, Dict[str, List[Dict[str, Any]]]], dim: int = DEFAULT_DIM):
+        """bank: parsed JSON bank, or anything with iter_questions() (e.g. compact_bank.CompactBank)."""
+        if hasattr(bank, "iter_questions"):
+            return cls.from_questions(bank.iter_questions(), dim)
+        questions = [q for levels in bank.values() for qs in levels.values() for q in qs]
+        return cls.from_questions(questions, dim)
+
+    @classmethod
+    def from_questions(cls, questions: Iterable[Dict[str, Any]], dim: int = DEFAULT_DIM):
+        ids, texts, docs = [], [], []
+        for q in questions:
+            ids.append(q.get("id"))
+            texts.append(q.get("q", ""))
+            docs.append(term_counts(q.get("answer", ""), dim))
+        n = len(docs)
+        df = [0] * dim
+        for d in docs:
+            for b in d:
+                df[b] += 1
+        idf = [math.log((1 + n) / (1 + df[b])) + 1.0 for b in range(dim)]
+        if NUMPY_AVAILABLE:
+            matrix = np.zeros((n, dim), dtype=np.float32)
+            for i, d in enumerate(docs):
+                if d:
+                    idx = np.fromiter(d.keys(), dtype=np.int64, count=len(d))
+                    matrix[i, idx] = np.fromiter(d.values(), dtype=np.float32, count=len(d))
+            matrix *= np.asarray(idf, dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            np.divide(matrix, norms, out=matrix, where=norms > 0)
+        else:
+            matrix = [cls._sparse_unit(d, idf) for d in docs]
+        return cls(ids, texts, idf, matrix, dim)
+
+    @staticmethod
+    def _sparse_unit(counts: Dict[int, float], idf) -> Dict[int, float]:
+        vec = {b: c * idf[b] for b, c in counts.items()}
+        norm = math.sqrt(sum(v * v for v in vec.values()))
+        return {b: v / norm for b, v in vec.items()} if norm else {}
+
+    # ------------------------------
+    # persistence (NumPy only)
+    # ------------------------------
+    def save(self, path: Path):
+        """Write <path>.npy (matrix) and <path>.json (ids, texts, idf)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.save(path.with_suffix(".npy"), np.ascontiguousarray(self.matrix, dtype=np.float32))
+        with open(path.with_suffix(".json"), "w", encoding="utf-8") as f:
+            json.dump({"dim": self.dim, "ids": self.ids, "texts": self.texts, "idf": [float(x) for x in self.idf]}, f)
+
+    @classmethod
+    def load(cls, path: Path, mmap: bool = True):
+        path = Path(path)
+        with open(path.with_suffix(".json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        matrix = np.load(path.with_suffix(".npy"), mmap_mode="r" if mmap else None)
+        return cls(meta["ids"], meta["texts"], meta["idf"], matrix, meta["dim"])
+
+    @classmethod
+    def load_or_build(cls, bank_path: Path, bank: Dict, cache_path: Optional[Path] = None, dim: int = DEFAULT_DIM):
+        """Reuse a saved index newer than the bank file, otherwise build (and save when possible)."""
+        if cache_path is not None and NUMPY_AVAILABLE:
+            cache_path = Path(cache_path)
+            npy = cache_path.with_suffix(".npy")
+            if npy.exists() and npy.stat().st_mtime >= Path(bank_path).stat().st_mtime:
+                return cls.load(cache_path)
+            index = cls.from_bank(bank, dim)
+            index.save(cache_path)
+            return cls.load(cache_path)
+        return cls.from_bank(bank, dim)
+
+    # ------------------------------
+    # scoring
+    # ------------------------------
+    def row_for(self, question_id: str = None, question_text: str = None) -> Optional[int]:
+        if question_id is not None and question_id in self._by_id:
+            return self._by_id[question_id]
+        if question_text is not None:
+            return self._by_text.get(question_text)
+        return None
+
+    def _query(self, text: str) -> Tuple[Any, Any]:
+        counts = term_counts(text, self.dim)
+        if not counts:
+            return None, None
+        if NUMPY_AVAILABLE:
+            idx = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+            w = np.fromiter(counts.values(), dtype=np.float32, count=len(counts)) * self.idf[idx]
+            norm = float(np.sqrt(w @ w))
+            return idx, w / norm
+        return self._sparse_unit(counts, self.idf), None
+
+    def similarity_to_row(self, row: int, text: str) -> float:
+        idx, w = self._query(text)
+        if idx is None:
+            return 0.0
+        if NUMPY_AVAILABLE:
+            # gather the row's entries at the query's buckets: a single dot product
+            return max(0.0, float(self.matrix[row, idx] @ w))
+        ref = self.matrix[row]
+        return max(0.0, sum(v * ref.get(b, 0.0) for b, v in idx.items()))
+
+    def similarity(self, question_id: str, text: str) -> Optional[float]:
+        row = self.row_for(question_id)
+        return None if row is None else self.similarity_to_row(row, text)
+
+
+def text_similarity(a: str, b: str, dim: int = DEFAULT_DIM) -> float:
+    """Cosine of two texts' n-gram vectors without IDF (for questions missing from the index)."""
+    va, vb = term_counts(a, dim), term_counts(b, dim)
+    na = math.sqrt(sum(v * v for v in va.values()))
+    nb = math.sqrt(sum(v * v for v in vb.values()))
+    if not na or not nb:
+        return 0.0
+    return sum(v * vb.get(k, 0.0) for k, v in va.items()) / (na * nb)
@@ -0,0 +1,238 @@
+# skill_model.py
+# Adaptive difficulty: Elo-style skill estimates per (user, topic) and a rating-sorted
+# question index that finds the most informative next question in O(log n).
+#
+# A question's rating is its "rating" field, else the default for its difficulty bucket.
+# The expected score of a candidate on a question is the Elo curve
+#     E = 1 / (1 + 10 ** ((question_rating - skill) / 400))
+# and a graded answer (score/10) moves the estimate by K * (score/10 - E). K shrinks with
+# the number of answers, so early answers move the estimate quickly and it then settles.
+# The information an answer carries, E * (1 - E), peaks where question_rating == skill:
+# the scheduler therefore serves the unseen question rated closest to the current estimate.
+import os
+import math
+import random
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from question_deck import Deck
+
+DIFFICULTY_RATINGS = {"easy": 1000.0, "medium": 1300.0, "hard": 1600.0}
+INITIAL_RATING = 1300.0
+SCALE = 400.0
+
+
+def expected_score(skill: float, rating: float) -> float:
+    return 1.0 / (1.0 + 10.0 ** ((rating - skill) / SCALE))
+
+
+def question_rating(question: Dict[str, Any], difficulty: str = None) -> float:
+    rating = question.get("rating")
+    if rating is not None:
+        return float(rating)
+    return DIFFICULTY_RATINGS.get(difficulty, INITIAL_RATING)
+
+
+def difficulty_for(rating: float) -> str:
+    """Closest difficulty label for a rating (for display)."""
+    return min(DIFFICULTY_RATINGS, key=lambda d: abs(DIFFICULTY_RATINGS[d] - rating))
+
+
+class SkillEstimate:
+    __slots__ = ("rating", "n")
+
+    def __init__(self, rating: float = INITIAL_RATING, n: int = 0):
+        self.rating = rating
+        self.n = n
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"rating": round(self.rating, 1), "n": self.n, "difficulty": difficulty_for(self.rating)}
+
+
+class SkillTracker:
+    """
+    Bounded cache of (user, topic) -> SkillEstimate in front of the memory store.
+    loader(user, topic) -> (rating, n) or None reads the stored estimate; saver(user, topic,
+    rating, n) persists one. Entries expire after SKILL_CACHE_TTL seconds and at most
+    SKILL_CACHE_MAX are kept (least recently used go first), so estimates written by other
+    worker processes are picked up. During a session the session state holds the estimate
+    it adapts to (OrchestratorAgent): step() computes an update, remember() publishes it.
+    K for the n-th answer is max(k_min, k_max / sqrt(n + 1)) (SKILL_K_MAX / SKILL_K_MIN env).
+    """
+
+    def __init__(self, loader: Callable[[str, str], Optional[Tuple[float, int]]] = None,
+                 saver: Callable[[str, str, float, int], None] = None,
+                 k_max: float = None, k_min: float = None, max_entries: int = None, ttl: float = None):
+        self.loader = loader
+        self.saver = saver
+        self.k_max = float(os.getenv("SKILL_K_MAX", "400") if k_max is None else k_max)
+        self.k_min = float(os.getenv("SKILL_K_MIN", "32") if k_min is None else k_min)
+        self.max_entries = int(os.getenv("SKILL_CACHE_MAX", "10000") if max_entries is None else max_entries)
+        self.ttl = float(os.getenv("SKILL_CACHE_TTL", "300") if ttl is None else ttl)
+        # (user, topic) -> (estimate, cached at), least recently used first
+        self._estimates: "OrderedDict[Tuple[str, str], Tuple[SkillEstimate, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.updates = 0
+        self.loads = 0
+
+    def _cached(self, key: Tuple[str, str]) -> Optional[SkillEstimate]:
+        entry = self._estimates.get(key)
+        if entry is None or time.monotonic() - entry[1] >= self.ttl:
+            return None
+        self._estimates.move_to_end(key)
+        return entry[0]
+
+    def _put(self, key: Tuple[str, str], est: SkillEstimate):
+        self._estimates[key] = (est, time.monotonic())
+        self._estimates.move_to_end(key)
+        while len(self._estimates) > self.max_entries:
+            self._estimates.popitem(last=False)
+
+    def get(self, user_id: str, topic: str, fresh: bool = False) -> SkillEstimate:
+        """Cached estimate, or the stored one (fresh=True always reads the store)."""
+        key = (user_id, topic)
+        if not fresh:
+            with self._lock:
+                est = self._cached(key)
+            if est is not None:
+                return est
+        saved = self.loader(user_id, topic) if self.loader is not None else None
+        est = SkillEstimate(*saved) if saved else SkillEstimate()
+        with self._lock:
+            self.loads += 1
+            self._put(key, est)
+        return est
+
+    def step(self, est: SkillEstimate, rating: float, score: float) -> SkillEstimate:
+        """est after one graded answer (score 0-10) to a question rated `rating`; est is unchanged."""
+        outcome = min(1.0, max(0.0, score / 10.0))
+        k = max(self.k_min, self.k_max / math.sqrt(est.n + 1))
+        return SkillEstimate(est.rating + k * (outcome - expected_score(est.rating, rating)), est.n + 1)
+
+    def remember(self, user_id: str, topic: str, est: SkillEstimate):
+        """Cache est as the user's current estimate and persist it."""
+        with self._lock:
+            self._put((user_id, topic), est)
+            self.updates += 1
+        if self.saver is not None:
+            self.saver(user_id, topic, est.rating, est.n)
+
+    def update(self, user_id: str, topic: str, rating: float, score: float) -> SkillEstimate:
+        """Fold in one graded answer against the cached estimate (get, step, remember)."""
+        key = (user_id, topic)
+        est = self.get(user_id, topic)
+        with self._lock:
+            est = self.step(self._cached(key) or est, rating, score)
+            self._put(key, est)
+            self.updates += 1
+        if self.saver is not None:
+            self.saver(user_id, topic, est.rating, est.n)
+        return est
+
+    def stats(self) -> Dict[str, Any]:
+        return {"cached": len(self._estimates), "loads": self.loads, "updates": self.updates}
+
+
+class _DomainRatings:
+    """One domain's questions sorted by rating; levels[k] is the k-th distinct rating and
+    entries starts[k]:starts[k + 1] share it (a whole bucket when questions carry no rating)."""
+    __slots__ = ("levels", "starts", "ids", "refs")
+
+    def __init__(self, levels: List[float], starts: List[int], ids: List[str], refs: List[Tuple[str, int]]):
+        self.levels = levels
+        self.starts = starts
+        self.ids = ids
+        self.refs = refs
+
+
+class RatingIndex:
+    """
+    Per-domain questions sorted by rating (parallel lists of ids and bucket positions,
+    grouped into runs of equal rating), built lazily the first time a domain is asked for.
+    nearest() bisects to the skill and walks outwards run by run.
+    Works over QuestionIndex or CompactBank; questions are fetched only once chosen.
+    """
+
+    def __init__(self, index):
+        self.index = index
+        self._domains: Dict[str, _DomainRatings] = {}
+        self._lock = threading.Lock()
+
+    def _build(self, domain: str) -> _DomainRatings:
+        entries = []
+        # CompactBank.iter_bucket reads rows without churning its question cache
+        iter_bucket = getattr(self.index, "iter_bucket", self.index.bucket)
+        for difficulty in self.index.difficulties.get(domain, ()):
+            for pos, q in enumerate(iter_bucket(domain, difficulty)):
+                entries.append((question_rating(q, difficulty), q.get("id"), difficulty, pos))
+        entries.sort(key=lambda e: e[0])
+        levels, starts = [], []
+        for i, e in enumerate(entries):
+            if not levels or e[0] != levels[-1]:
+                levels.append(e[0])
+                starts.append(i)
+        starts.append(len(entries))
+        return _DomainRatings(levels, starts, [e[1] for e in entries], [(e[2], e[3]) for e in entries])
+
+    def domain(self, domain: str) -> _DomainRatings:
+        table = self._domains.get(domain)
+        if table is None:
+            built = self._build(domain)
+            with self._lock:
+                table = self._domains.setdefault(domain, built)
+        return table
+
+    @staticmethod
+    def _outward(levels: List[float], target: float):
+        """Run numbers in order of distance from target."""
+        hi = bisect_left(levels, target)
+        lo = hi - 1
+        while lo >= 0 or hi < len(levels):
+            if hi >= len(levels) or (lo >= 0 and target - levels[lo] <= levels[hi] - target):
+                yield lo
+                lo -= 1
+            else:
+                yield hi
+                hi += 1
+
+    def nearest(self, domain: str, target: float, seen=(), rng: random.Random = None,
+                candidates: int = 3, decks: Dict = None) -> Optional[Tuple[Dict[str, Any], str]]:
+        """
+        A random unseen question among the closest-rated ones: runs are taken nearest first
+        until they hold at least `candidates` questions, and the pick is uniform over them
+        (over a whole tied run, so equal skills do not all get the same question).
+        decks is the caller's per-session {(domain, run): Deck}, drawing without replacement.
+        Returns (question, difficulty) or None when the domain is exhausted.
+        """
+        table = self.domain(domain)
+        rng = rng or random
+        decks = {} if decks is None else decks
+        order = self._outward(table.levels, target)
+        pool = []
+        while True:
+            pool = [(k, deck) for k, deck in pool if deck.remaining]
+            remaining = sum(deck.remaining for _, deck in pool)
+            while remaining < candidates:
+                k = next(order, None)
+                if k is None:
+                    break
+                deck = decks.get((domain, k))
+                if deck is None:
+                    deck = decks[(domain, k)] = Deck(table.starts[k + 1] - table.starts[k])
+                if deck.remaining:
+                    pool.append((k, deck))
+                    remaining += deck.remaining
+            if not pool:
+                return None
+            r = rng.randrange(remaining)
+            for k, deck in pool:
+                r -= deck.remaining
+                if r < 0:
+                    break
+            i = table.starts[k] + deck.draw(rng)
+            if table.ids[i] not in seen:
+                difficulty, pos = table.refs[i]
+                return self.index.bucket(domain, difficulty)[pos], difficulty
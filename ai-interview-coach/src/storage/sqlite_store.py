@@ -1,52 +1,630 @@
 # sqlite_store.py — FINAL THREAD-SAFE VERSION
+import os
 import sqlite3
 import json
+import time
+import random
+import threading
 from pathlib import Path
 
+SCHEMA_VERSION = 5
+
+# v2: normalized tables. v1 was a single sessions(session_id, user_id, data JSON) table.
+# v3: session_state, versioned live-session records for SQLiteSessionBackend.
+# v4: skills, per-(user, topic) Elo estimates for adaptive difficulty (skill_model.py).
+# v5: per-user profile aggregates (user_profiles, user_domain_stats, user_weaknesses,
+#     user_recent_scores), maintained per interaction; replaces 'profile_<user>' blob rows.
+# answers scoring below this count as a weakness (per session and per user profile)
+WEAK_SCORE = 6
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS sessions (
+        session_id TEXT PRIMARY KEY,
+        user_id TEXT,
+        domain TEXT,
+        created_at REAL,
+        updated_at REAL,
+        kind TEXT NOT NULL DEFAULT 'session',
+        extra TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS interactions (
+        id INTEGER PRIMARY KEY,
+        session_id TEXT NOT NULL,
+        seq INTEGER NOT NULL,
+        question_id TEXT,
+        question_text TEXT,
+        reference_answer TEXT,
+        user_answer TEXT,
+        score INTEGER,
+        feedback TEXT,
+        suggestions TEXT,
+        evaluation TEXT,
+        created_at REAL,
+        UNIQUE (session_id, seq)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS weaknesses (
+        session_id TEXT NOT NULL,
+        question_id TEXT NOT NULL,
+        count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (session_id, question_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS session_state (
+        session_id TEXT PRIMARY KEY,
+        version INTEGER NOT NULL,
+        data TEXT NOT NULL,
+        updated_at REAL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS skills (
+        user_id TEXT NOT NULL,
+        topic TEXT NOT NULL,
+        rating REAL NOT NULL,
+        n INTEGER NOT NULL,
+        updated_at REAL,
+        PRIMARY KEY (user_id, topic)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS user_profiles (
+        user_id TEXT PRIMARY KEY,
+        interactions INTEGER NOT NULL DEFAULT 0,
+        extra TEXT,
+        updated_at REAL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS user_domain_stats (
+        user_id TEXT NOT NULL,
+        domain TEXT NOT NULL,
+        n INTEGER NOT NULL,
+        mean REAL NOT NULL,
+        m2 REAL NOT NULL,
+        last_at REAL,
+        PRIMARY KEY (user_id, domain)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS user_weaknesses (
+        user_id TEXT NOT NULL,
+        question_id TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (user_id, question_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS user_recent_scores (
+        user_id TEXT NOT NULL,
+        slot INTEGER NOT NULL,
+        domain TEXT,
+        question_id TEXT,
+        score INTEGER,
+        created_at REAL,
+        PRIMARY KEY (user_id, slot)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_sessions_user ON sessions(user_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_interactions_question ON interactions(question_id, score)",
+    "CREATE INDEX IF NOT EXISTS idx_interactions_created ON interactions(created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_weaknesses_question ON weaknesses(question_id)",
+]
+
 class SQLiteStore:
-    def __init__(self, db_path: Path):
+    """
+    Session store on SQLite.
+    - One connection per thread (thread-local pool), opened once and reused.
+    - WAL journal so readers never block on a writer, with tuned pragmas.
+    - busy_timeout plus a retry/backoff policy for "database is locked".
+    pooled=False / wal=False reproduce the old connect-per-call behaviour (used by the benchmark).
+    """
+
+    def __init__(self, db_path: Path, pooled: bool = True, wal: bool = True,
+                 busy_timeout_ms: int = 5000, cache_size_kb: int = 8192, max_retries: int = 5):
         self.db_path = str(db_path)
+        self.pooled = pooled
+        self.wal = wal
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cache_size_kb = cache_size_kb
+        self.max_retries = max_retries
+        # recent scores kept per user profile (a ring of this many slots)
+        self.recent_window = int(os.getenv("PROFILE_RECENT_WINDOW", "20"))
+        self._local = threading.local()
+        self._conns = []
+        self._conns_lock = threading.Lock()
         self._init_db()
 
+    def _configure(self, conn):
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        if self.wal:
+            # NORMAL is durable across app crashes in WAL mode; only an OS crash can drop the last commits
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute(f"PRAGMA cache_size = -{int(self.cache_size_kb)}")
+            conn.execute("PRAGMA temp_store = MEMORY")
+        return conn
+
     def _get_conn(self):
-        # Create a NEW connection each time (Thread-safe for Streamlit)
-        return sqlite3.connect(self.db_path, check_same_thread=False)
+        if not self.pooled:
+            # Create a NEW connection each time (legacy behaviour)
+            return self._configure(sqlite3.connect(self.db_path, check_same_thread=False))
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._configure(sqlite3.connect(self.db_path, check_same_thread=False))
+            self._local.conn = conn
+            with self._conns_lock:
+                self._conns.append(conn)
+        return conn
+
+    def _release(self, conn):
+        if not self.pooled:
+            conn.close()
+
+    def _run(self, fn):
+        """
+        Run fn(conn) inside a transaction, retrying with jittered exponential
+        backoff when SQLite reports the database as locked/busy.
+        """
+        delay = 0.01
+        for attempt in range(self.max_retries + 1):
+            conn = self._get_conn()
+            try:
+                with conn:
+                    return fn(conn)
+            except sqlite3.OperationalError as e:
+                msg = str(e).lower()
+                if attempt >= self.max_retries or ("locked" not in msg and "busy" not in msg):
+                    raise
+                time.sleep(delay + random.uniform(0, delay))
+                delay = min(delay * 2, 1.0)
+            finally:
+                self._release(conn)
 
     def _init_db(self):
-        conn = self._get_conn()
-        cur = conn.cursor()
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS sessions (
-                session_id TEXT PRIMARY KEY,
-                user_id TEXT,
-                data TEXT
-            )
+        if self.wal:
+            conn = self._get_conn()
+            # journal_mode is persistent in the file; setting it once is enough
+            conn.execute("PRAGMA journal_mode = WAL")
+            self._release(conn)
+        self._run(self._migrate)
+
+    def _migrate(self, conn):
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        cols = [r[1] for r in conn.execute("PRAGMA table_info(sessions)")]
+        legacy = "data" in cols and "kind" not in cols
+        if legacy:
+            conn.execute("ALTER TABLE sessions RENAME TO sessions_blob_v1")
+        for stmt in SCHEMA:
+            conn.execute(stmt)
+        if legacy:
+            # v1 kept each session as one JSON blob: split every row into the normalized tables
+            for session_id, user_id, data in conn.execute(
+                    "SELECT session_id, user_id, data FROM sessions_blob_v1").fetchall():
+                try:
+                    session_dict = json.loads(data) if data else {}
+                except ValueError:
+                    session_dict = {"raw": data}
+                self._write_session(conn, session_id, user_id, session_dict)
+            conn.execute("DROP TABLE sessions_blob_v1")
+        if version < 5:
+            self._backfill_profiles(conn)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _backfill_profiles(self, conn):
+        """v5: build the profile aggregates from stored interactions; move profile blobs over."""
+        scored = """
+            FROM interactions i JOIN sessions s ON s.session_id = i.session_id WHERE s.kind = 'session'
+        """
+        conn.execute(f"""
+            INSERT OR REPLACE INTO user_profiles (user_id, interactions, updated_at)
+            SELECT COALESCE(s.user_id, 'unknown'), COUNT(*), MAX(i.created_at) {scored}
+            GROUP BY COALESCE(s.user_id, 'unknown')
+        """)
+        conn.execute(f"""
+            INSERT OR REPLACE INTO user_domain_stats (user_id, domain, n, mean, m2, last_at)
+            SELECT COALESCE(s.user_id, 'unknown'), COALESCE(s.domain, 'unknown'), COUNT(i.score), AVG(i.score),
+                   MAX(0.0, SUM(i.score * i.score) - COUNT(i.score) * AVG(i.score) * AVG(i.score)), MAX(i.created_at)
+            {scored} AND i.score IS NOT NULL
+            GROUP BY COALESCE(s.user_id, 'unknown'), COALESCE(s.domain, 'unknown')
+        """)
+        conn.execute(f"""
+            INSERT OR REPLACE INTO user_weaknesses (user_id, question_id, count)
+            SELECT COALESCE(s.user_id, 'unknown'), i.question_id, COUNT(*)
+            {scored} AND i.score < ? AND i.question_id IS NOT NULL
+            GROUP BY COALESCE(s.user_id, 'unknown'), i.question_id
+        """, (WEAK_SCORE,))
+        # the k-th interaction of a user sits in ring slot (k - 1) % window, as live updates do
+        conn.execute(f"""
+            INSERT OR REPLACE INTO user_recent_scores (user_id, slot, domain, question_id, score, created_at)
+            SELECT user_id, (k - 1) % ?, domain, question_id, score, created_at FROM (
+                SELECT COALESCE(s.user_id, 'unknown') AS user_id, COALESCE(s.domain, 'unknown') AS domain,
+                       i.question_id, i.score, i.created_at,
+                       ROW_NUMBER() OVER (PARTITION BY COALESCE(s.user_id, 'unknown') ORDER BY i.created_at, i.id) AS k,
+                       COUNT(*) OVER (PARTITION BY COALESCE(s.user_id, 'unknown')) AS total
+                {scored}
+            ) WHERE k > total - ?
+        """, (self.recent_window, self.recent_window))
+        conn.execute("""
+            INSERT INTO user_profiles (user_id, interactions, extra, updated_at)
+            SELECT user_id, 0, extra, updated_at FROM sessions
+            WHERE kind = 'blob' AND session_id = 'profile_' || user_id
+            ON CONFLICT(user_id) DO UPDATE SET extra = excluded.extra
         """)
-        conn.commit()
-        conn.close()
+        conn.execute("DELETE FROM sessions WHERE kind = 'blob' AND session_id = 'profile_' || user_id")
+
+    def close(self):
+        """Close every pooled connection (call on shutdown)."""
+        with self._conns_lock:
+            conns, self._conns = self._conns, []
+        for conn in conns:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        self._local = threading.local()
+
+    # -----------------------------
+    # ROW HELPERS (run inside a transaction)
+    # -----------------------------
+    @staticmethod
+    def _upsert_session_row(conn, session_id, user_id, domain, created_at, kind="session", extra=None):
+        conn.execute("""
+            INSERT INTO sessions (session_id, user_id, domain, created_at, updated_at, kind, extra)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(session_id) DO UPDATE SET
+                user_id = excluded.user_id, domain = excluded.domain,
+                created_at = COALESCE(excluded.created_at, sessions.created_at),
+                updated_at = excluded.updated_at, kind = excluded.kind,
+                extra = COALESCE(excluded.extra, sessions.extra)
+        """, (session_id, user_id, domain, created_at, time.time(), kind, extra))
+
+    @staticmethod
+    def _interaction_row(session_id: str, seq: int, entry: dict) -> tuple:
+        q = entry.get("question") or {}
+        ev = entry.get("evaluation") or {}
+        score = ev.get("score")
+        return (
+            session_id, seq, q.get("id"), q.get("q"), q.get("answer"), entry.get("user_answer"),
+            int(score) if score is not None else None, ev.get("feedback"),
+            json.dumps(ev.get("suggestions", []), default=str), json.dumps(ev, default=str),
+            entry.get("time", time.time()),
+        )
+
+    @staticmethod
+    def _insert_interactions(conn, rows):
+        conn.executemany("""
+            INSERT OR REPLACE INTO interactions
+                (session_id, seq, question_id, question_text, reference_answer, user_answer,
+                 score, feedback, suggestions, evaluation, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+
+    def _write_session(self, conn, session_id: str, user_id: str, session_dict: dict):
+        """Replace every row of one session with the contents of a session dict."""
+        if "history" not in session_dict:
+            # not an interview session (e.g. a profile): keep the dict as-is
+            self._upsert_session_row(conn, session_id, user_id, session_dict.get("domain"),
+                                     session_dict.get("created_at"), "blob", json.dumps(session_dict, default=str))
+            return
+        extra = {k: v for k, v in session_dict.items()
+                 if k not in ("user_id", "domain", "created_at", "history", "weaknesses")}
+        self._upsert_session_row(conn, session_id, user_id, session_dict.get("domain"),
+                                 session_dict.get("created_at"), "session",
+                                 json.dumps(extra, default=str) if extra else None)
+        conn.execute("DELETE FROM interactions WHERE session_id = ?", (session_id,))
+        conn.execute("DELETE FROM weaknesses WHERE session_id = ?", (session_id,))
+        self._insert_interactions(conn, [self._interaction_row(session_id, i, e)
+                                         for i, e in enumerate(session_dict.get("history") or [])])
+        conn.executemany(
+            "INSERT INTO weaknesses (session_id, question_id, count) VALUES (?, ?, ?)",
+            [(session_id, qid, int(n)) for qid, n in (session_dict.get("weaknesses") or {}).items()]
+        )
 
     # -----------------------------
     # SAVE SESSION (Thread-safe)
     # -----------------------------
     def save_session(self, session_id: str, user_id: str, session_dict: dict):
-        conn = self._get_conn()
-        cur = conn.cursor()
-        cur.execute(
-            "REPLACE INTO sessions (session_id, user_id, data) VALUES (?, ?, ?)",
-            (session_id, user_id, json.dumps(session_dict))
-        )
-        conn.commit()
-        conn.close()
+        """Full rewrite of one session (compatibility API; prefer the incremental calls below)."""
+        self._run(lambda conn: self._write_session(conn, session_id, user_id, session_dict))
+
+    def upsert_session(self, session_id: str, user_id: str, domain: str = None, created_at: float = None,
+                       extra: dict = None):
+        """Create/update the session header row only."""
+        payload = json.dumps(extra, default=str) if extra else None
+        self._run(lambda conn: self._upsert_session_row(conn, session_id, user_id, domain, created_at,
+                                                        "session", payload))
+
+    def save_session_extra(self, session_id: str, user_id: str, domain: str, extra: dict):
+        """Attach auxiliary state (e.g. the orchestrator's per-session state) to the session row."""
+        payload = json.dumps(extra, default=str)
+        self._run(lambda conn: self._upsert_session_row(conn, session_id, user_id, domain, None,
+                                                        "session", payload))
+
+    def load_session_extra(self, session_id: str):
+        row = self._run(lambda conn: conn.execute(
+            "SELECT extra FROM sessions WHERE session_id = ? AND kind = 'session'", (session_id,)
+        ).fetchone())
+        return json.loads(row[0]) if row and row[0] else None
+
+    def append_interactions(self, session_id: str, start_seq: int, entries: list, weaknesses: dict = None):
+        """
+        Append history entries (numbered from start_seq) as one row each, and
+        optionally set the weakness counters they changed, in one transaction.
+        """
+        rows = [self._interaction_row(session_id, start_seq + i, e) for i, e in enumerate(entries)]
+
+        def write(conn):
+            self._insert_interactions(conn, rows)
+            if weaknesses:
+                conn.executemany("""
+                    INSERT INTO weaknesses (session_id, question_id, count) VALUES (?, ?, ?)
+                    ON CONFLICT(session_id, question_id) DO UPDATE SET count = excluded.count
+                """, [(session_id, qid, int(n)) for qid, n in weaknesses.items()])
+        self._run(write)
+
+    def append_interaction(self, session_id: str, seq: int, entry: dict):
+        self.append_interactions(session_id, seq, [entry])
+
+    def write_batch(self, sessions: list, interactions: list, weaknesses: list, skills: list = (),
+                    profiles: list = ()):
+        """
+        Commit a write-behind batch in one transaction.
+        sessions: (session_id, user_id, domain, created_at); interactions: (session_id, seq, entry);
+        weaknesses: (session_id, question_id, count); skills: (user_id, topic, rating, n);
+        profiles: (user_id, domain, question_id, score, created_at), applied in order.
+        """
+        rows = [self._interaction_row(sid, seq, entry) for sid, seq, entry in interactions]
+
+        def write(conn):
+            for session_id, user_id, domain, created_at in sessions:
+                self._upsert_session_row(conn, session_id, user_id, domain, created_at)
+            self._insert_interactions(conn, rows)
+            conn.executemany("""
+                INSERT INTO weaknesses (session_id, question_id, count) VALUES (?, ?, ?)
+                ON CONFLICT(session_id, question_id) DO UPDATE SET count = excluded.count
+            """, weaknesses)
+            if skills:
+                self._upsert_skills(conn, skills)
+            if profiles:
+                self._apply_profile_updates(conn, profiles)
+        self._run(write)
+
+    # -----------------------------
+    # USER PROFILE AGGREGATES
+    # -----------------------------
+    def _apply_profile_updates(self, conn, updates):
+        """
+        Fold scored answers into the per-user aggregates; a constant number of primary-key
+        upserts per answer. Domain mean/variance use Welford's update (m2 = sum of squared
+        deviations): the right-hand sides of an upsert see the row's old values.
+        """
+        for user_id, domain, question_id, score, created_at in updates:
+            conn.execute("""
+                INSERT INTO user_profiles (user_id, interactions, updated_at) VALUES (?, 1, ?)
+                ON CONFLICT(user_id) DO UPDATE SET interactions = interactions + 1, updated_at = excluded.updated_at
+            """, (user_id, created_at))
+            conn.execute("""
+                INSERT INTO user_domain_stats (user_id, domain, n, mean, m2, last_at) VALUES (?, ?, 1, ?, 0, ?)
+                ON CONFLICT(user_id, domain) DO UPDATE SET
+                    n = n + 1,
+                    mean = mean + (excluded.mean - mean) / (n + 1),
+                    m2 = m2 + (excluded.mean - mean) * (excluded.mean - (mean + (excluded.mean - mean) / (n + 1))),
+                    last_at = excluded.last_at
+            """, (user_id, domain, float(score), created_at))
+            if score < WEAK_SCORE and question_id:
+                conn.execute("""
+                    INSERT INTO user_weaknesses (user_id, question_id, count) VALUES (?, ?, 1)
+                    ON CONFLICT(user_id, question_id) DO UPDATE SET count = count + 1
+                """, (user_id, question_id))
+            conn.execute("""
+                INSERT OR REPLACE INTO user_recent_scores (user_id, slot, domain, question_id, score, created_at)
+                VALUES (?, (SELECT interactions - 1 FROM user_profiles WHERE user_id = ?) % ?, ?, ?, ?, ?)
+            """, (user_id, user_id, self.recent_window, domain, question_id, int(score), created_at))
+
+    def update_profiles(self, updates: list):
+        """Apply (user_id, domain, question_id, score, created_at) updates in one transaction."""
+        self._run(lambda conn: self._apply_profile_updates(conn, updates))
+
+    def load_profile(self, user_id: str) -> dict:
+        """
+        Aggregates and saved fields of one user, read by primary key (cost independent of
+        how many sessions the user has). Empty dict for an unknown user.
+        """
+        def read(conn):
+            head = conn.execute("SELECT interactions, extra FROM user_profiles WHERE user_id = ?",
+                                (user_id,)).fetchone()
+            if head is None:
+                return {}
+            profile = json.loads(head[1]) if head[1] else {}
+            profile["interactions"] = head[0]
+            profile["domains"] = {
+                domain: {"n": n, "mean": mean, "variance": m2 / (n - 1) if n > 1 else 0.0, "last_at": last_at}
+                for domain, n, mean, m2, last_at in conn.execute(
+                    "SELECT domain, n, mean, m2, last_at FROM user_domain_stats WHERE user_id = ?", (user_id,))
+            }
+            profile["weaknesses"] = dict(conn.execute(
+                "SELECT question_id, count FROM user_weaknesses WHERE user_id = ?", (user_id,)).fetchall())
+            profile["recent_scores"] = [
+                {"time": at, "domain": domain, "question_id": qid, "score": score}
+                for domain, qid, score, at in conn.execute(
+                    "SELECT domain, question_id, score, created_at FROM user_recent_scores WHERE user_id = ? "
+                    "ORDER BY created_at", (user_id,))
+            ]
+            return profile
+        return self._run(read)
+
+    def save_profile_extra(self, user_id: str, extra: dict):
+        """Store free-form profile fields next to the aggregates."""
+        payload = json.dumps(extra, default=str)
+        self._run(lambda conn: conn.execute("""
+            INSERT INTO user_profiles (user_id, interactions, extra, updated_at) VALUES (?, 0, ?, ?)
+            ON CONFLICT(user_id) DO UPDATE SET extra = excluded.extra, updated_at = excluded.updated_at
+        """, (user_id, payload, time.time())))
+
+    # -----------------------------
+    # SKILL ESTIMATES
+    # -----------------------------
+    @staticmethod
+    def _upsert_skills(conn, skills):
+        now = time.time()
+        conn.executemany("""
+            INSERT INTO skills (user_id, topic, rating, n, updated_at) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(user_id, topic) DO UPDATE SET rating = excluded.rating, n = excluded.n,
+                updated_at = excluded.updated_at
+        """, [(u, t, r, n, now) for u, t, r, n in skills])
+
+    def save_skills(self, skills: list):
+        """Upsert (user_id, topic, rating, n) rows."""
+        self._run(lambda conn: self._upsert_skills(conn, skills))
+
+    def load_skill(self, user_id: str, topic: str):
+        """(rating, n) for one user and topic, or None."""
+        return self._run(lambda conn: conn.execute(
+            "SELECT rating, n FROM skills WHERE user_id = ? AND topic = ?", (user_id, topic)
+        ).fetchone())
 
     # -----------------------------
     # LOAD SESSION
     # -----------------------------
     def load_session(self, session_id: str):
-        conn = self._get_conn()
-        cur = conn.cursor()
-        cur.execute("SELECT data FROM sessions WHERE session_id = ?", (session_id,))
-        row = cur.fetchone()
-        conn.close()
-        if not row:
-            return None
-        return json.loads(row[0])
+        def read(conn):
+            head = conn.execute(
+                "SELECT user_id, domain, created_at, kind, extra FROM sessions WHERE session_id = ?",
+                (session_id,)
+            ).fetchone()
+            if not head:
+                return None
+            user_id, domain, created_at, kind, extra = head
+            if kind == "blob":
+                return json.loads(extra) if extra else {}
+            history = [{
+                "time": created,
+                "question": {"id": qid, "q": qtext, "answer": ref or ""},
+                "evaluation": json.loads(ev) if ev else {},
+                **({"user_answer": ans} if ans is not None else {}),
+            } for qid, qtext, ref, ans, ev, created in conn.execute("""
+                SELECT question_id, question_text, reference_answer, user_answer, evaluation, created_at
+                FROM interactions WHERE session_id = ? ORDER BY seq
+            """, (session_id,))]
+            weaknesses = dict(conn.execute(
+                "SELECT question_id, count FROM weaknesses WHERE session_id = ?", (session_id,)
+            ).fetchall())
+            data = json.loads(extra) if extra else {}
+            data.update({"user_id": user_id, "domain": domain, "created_at": created_at,
+                         "history": history, "weaknesses": weaknesses})
+            return data
+        return self._run(read)
+
+    # -----------------------------
+    # LIVE SESSION STATE (versioned, compare-and-set)
+    # -----------------------------
+    def load_state(self, session_id: str):
+        """(data_json, version) of a live session record, or None."""
+        return self._run(lambda conn: conn.execute(
+            "SELECT data, version FROM session_state WHERE session_id = ?", (session_id,)
+        ).fetchone())
+
+    def cas_state(self, session_id: str, data: str, expected_version: int) -> bool:
+        """
+        Write data as version expected_version + 1 if the stored version is still
+        expected_version (0 = create). False when another writer got there first.
+        """
+        def write(conn):
+            if expected_version == 0:
+                cur = conn.execute(
+                    "INSERT OR IGNORE INTO session_state (session_id, version, data, updated_at) VALUES (?, 1, ?, ?)",
+                    (session_id, data, time.time()))
+            else:
+                cur = conn.execute(
+                    "UPDATE session_state SET version = version + 1, data = ?, updated_at = ? "
+                    "WHERE session_id = ? AND version = ?",
+                    (data, time.time(), session_id, expected_version))
+            return cur.rowcount == 1
+        return self._run(write)
+
+    def delete_state(self, session_id: str):
+        self._run(lambda conn: conn.execute("DELETE FROM session_state WHERE session_id = ?", (session_id,)))
+
+    # -----------------------------
+    # QUERIES (indexed)
+    # -----------------------------
+    def list_user_sessions(self, user_id: str):
+        return self._run(lambda conn: [r[0] for r in conn.execute(
+            "SELECT session_id FROM sessions WHERE user_id = ? AND kind = 'session' ORDER BY created_at",
+            (user_id,)
+        )])
+
+    def iter_interactions(self, chunk_size: int = 5000, after_id: int = 0, columns=None):
+        """
+        Stream interaction rows in id order, chunk_size rows at a time (keyset
+        pagination, so memory stays bounded and concurrent appends are fine).
+        Yields lists of tuples: (id, *columns).
+        """
+        cols = ", ".join(columns or ("session_id", "question_id", "question_text", "user_answer", "score"))
+        last = after_id
+        while True:
+            rows = self._run(lambda conn: conn.execute(
+                f"SELECT id, {cols} FROM interactions WHERE id > ? ORDER BY id LIMIT ?", (last, chunk_size)
+            ).fetchall())
+            if not rows:
+                return
+            yield rows
+            last = rows[-1][0]
+
+    def max_interaction_id(self) -> int:
+        return self._run(lambda conn: conn.execute("SELECT COALESCE(MAX(id), 0) FROM interactions").fetchone()[0])
+
+    def iter_session_interactions(self, chunk_size: int = 5000, after_id: int = 0, upto_id: int = None):
+        """
+        Stream scored interaction rows session by session ((session_id, seq) order, keyset
+        pagination on the UNIQUE (session_id, seq) index), so a session's rows are contiguous.
+        With after_id only sessions having a row with id > after_id are read, with all their
+        rows; rows with id > upto_id are left out. Yields lists of
+        (id, session_id, seq, question_id, score, domain).
+        """
+        upto_id = self.max_interaction_id() if upto_id is None else upto_id
+        touched = "AND i.session_id IN (SELECT session_id FROM interactions WHERE id > ? AND id <= ?)" if after_id else ""
+        sql = f"""
+            SELECT i.id, i.session_id, i.seq, i.question_id, i.score, s.domain
+            FROM interactions i LEFT JOIN sessions s ON s.session_id = i.session_id
+            WHERE (i.session_id, i.seq) > (?, ?) AND i.id <= ? AND i.score IS NOT NULL {touched}
+            ORDER BY i.session_id, i.seq LIMIT ?
+        """
+        last = ("", -1)
+        while True:
+            params = (*last, upto_id) + ((after_id, upto_id) if after_id else ()) + (chunk_size,)
+            rows = self._run(lambda conn: conn.execute(sql, params).fetchall())
+            if not rows:
+                return
+            yield rows
+            last = (rows[-1][1], rows[-1][2])
+
+    def update_interaction_scores(self, updates):
+        """Batched re-grade write-back: updates are (score, feedback, suggestions_json, evaluation_json, id)."""
+        self._run(lambda conn: conn.executemany(
+            "UPDATE interactions SET score = ?, feedback = ?, suggestions = ?, evaluation = ? WHERE id = ?",
+            updates
+        ))
+
+    def average_score_per_question(self):
+        """[(question_id, average_score, attempts)] across all users."""
+        return self._run(lambda conn: conn.execute("""
+            SELECT question_id, AVG(score), COUNT(score) FROM interactions
+            WHERE question_id IS NOT NULL GROUP BY question_id ORDER BY question_id
+        """).fetchall())
+
+    def question_attempts_for_user(self, user_id: str, question_id: str):
+        """[(session_id, score, created_at)] for one user and question."""
+        return self._run(lambda conn: conn.execute("""
+            SELECT i.session_id, i.score, i.created_at FROM interactions i
+            JOIN sessions s ON s.session_id = i.session_id
+            WHERE s.user_id = ? AND i.question_id = ? ORDER BY i.created_at
+        """, (user_id, question_id)).fetchall())
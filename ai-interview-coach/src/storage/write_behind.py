@@ -0,0 +1,135 @@
+# write_behind.py
+# Background writer that batches append-only session records into single SQLite transactions.
+import time
+import atexit
+import threading
+from typing import Any, Dict, List, Tuple
+
+from utils import logger
+from instrumentation import metrics
+
+
+class WriteBehindQueue:
+    """
+    Write-behind buffer in front of SQLiteStore.write_batch().
+    - put(kind, record): enqueue ("session" | "interaction" | "weakness" | "skill" | "profile") records, never blocks on disk
+    - flush(): block until everything enqueued so far is committed
+    A background thread commits a batch when max_batch records are waiting or the
+    oldest one is max_delay seconds old, so writes trickle out during the session.
+    """
+
+    def __init__(self, store, max_batch: int = 100, max_delay: float = 0.2, max_retries: int = 3):
+        self.store = store
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_retries = max_retries
+        self._items: List[Tuple[str, Any]] = []
+        self._first_at = None
+        self._cond = threading.Condition()
+        self._enqueued = 0
+        self._written = 0
+        self._flush_requested = False
+        self._closed = False
+        self.batches = 0
+        self.errors = 0
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._loop, name="write-behind", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def put(self, kind: str, record: Any):
+        with self._cond:
+            if not self._items:
+                # wake the writer so it starts the max_delay countdown
+                self._first_at = time.monotonic()
+                self._cond.notify_all()
+            self._items.append((kind, record))
+            self._enqueued += 1
+            if len(self._items) >= self.max_batch:
+                self._cond.notify_all()
+
+    def flush(self, timeout: float = None) -> bool:
+        """Wait until all records enqueued before this call are written. Returns False on timeout."""
+        with self._cond:
+            target = self._enqueued
+            if self._written >= target:
+                return True
+            self._flush_requested = True
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: self._written >= target, timeout)
+
+    def close(self):
+        if self._closed:
+            return
+        self.flush(timeout=10)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout=1)
+
+    def _ready(self) -> bool:
+        if not self._items:
+            return False
+        return (self._flush_requested or self._closed or len(self._items) >= self.max_batch
+                or time.monotonic() - self._first_at >= self.max_delay)
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while not self._ready():
+                    if self._closed:
+                        return
+                    timeout = None
+                    if self._items:
+                        timeout = max(0.0, self.max_delay - (time.monotonic() - self._first_at))
+                    self._cond.wait(timeout)
+                batch, self._items = self._items, []
+                self._flush_requested = False
+            self._write(batch)
+            with self._cond:
+                self._written += len(batch)
+                self._cond.notify_all()
+
+    def _write(self, batch: List[Tuple[str, Any]]):
+        sessions: Dict[str, tuple] = {}
+        interactions: List[tuple] = []
+        weaknesses: Dict[tuple, int] = {}
+        skills: Dict[tuple, tuple] = {}
+        profiles: List[tuple] = []
+        for kind, record in batch:
+            if kind == "session":
+                sessions[record[0]] = record  # keep the latest header per session
+            elif kind == "interaction":
+                interactions.append(record)
+            elif kind == "weakness":
+                weaknesses[(record[0], record[1])] = record[2]
+            elif kind == "skill":
+                skills[(record[0], record[1])] = record  # only the latest estimate matters
+            elif kind == "profile":
+                profiles.append(record)  # aggregate updates: every one counts, in order
+        for attempt in range(self.max_retries + 1):
+            try:
+                with metrics.span("store.write_batch"):
+                    self.store.write_batch(list(sessions.values()), interactions,
+                                           [(sid, qid, n) for (sid, qid), n in weaknesses.items()],
+                                           list(skills.values()), profiles)
+                self.batches += 1
+                return
+            except Exception as e:
+                self.errors += 1
+                if attempt >= self.max_retries:
+                    self.dropped += len(batch)
+                    logger.exception("Write-behind batch of %d records dropped: %s", len(batch), e)
+                    return
+                time.sleep(0.05 * (2 ** attempt))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "pending": len(self._items),
+                "enqueued": self._enqueued,
+                "written": self._written,
+                "batches": self.batches,
+                "errors": self.errors,
+                "dropped": self.dropped,
+            }
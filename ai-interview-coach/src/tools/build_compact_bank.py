@@ -0,0 +1,25 @@
+# build_compact_bank.py
+# Convert a JSON question bank into the memory-mapped compact format (see compact_bank.py).
+#
+#   cd src && python -m tools.build_compact_bank tools/question_bank.json tools/question_bank.qbank
+#
+# Point the app at the result with QUESTION_BANK_PATH=tools/question_bank.qbank.
+import argparse
+import json
+from pathlib import Path
+
+from compact_bank import convert_bank
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Build a compact, memory-mapped question bank from JSON.")
+    ap.add_argument("source", type=Path, help="question_bank.json")
+    ap.add_argument("output", type=Path, help="output .qbank file")
+    ap.add_argument("--no-reference-index", action="store_true",
+                    help="skip prebuilding the similarity index (built at startup instead)")
+    args = ap.parse_args()
+    print(json.dumps(convert_bank(args.source, args.output, not args.no_reference_index), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+# cohort_report.py
+# Cohort analytics over the interview database (see analytics.py).
+#
+#   cd src && python -m tools.cohort_report --db storage/interview_sessions.db --out reports/
+#
+# Aggregates are kept in --state between runs, so each run only reads interactions stored
+# since the previous one (--full rebuilds, e.g. after tools/rescore.py). Prints the weakest
+# topics per domain and writes question_stats, difficulty_stats and topic_stats to --out.
+import argparse
+import json
+from pathlib import Path
+
+from analytics import CohortAnalytics, load_question_meta
+from storage.sqlite_store import SQLiteStore
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Score distributions, weakest topics and question discrimination.")
+    ap.add_argument("--db", type=Path, default=Path("storage/interview_sessions.db"))
+    ap.add_argument("--bank", type=Path, default=Path("tools/question_bank.json"),
+                    help="question bank (JSON or compact) for difficulty and topic labels")
+    ap.add_argument("--state", type=Path, default=Path("storage/cohort_state.npz"))
+    ap.add_argument("--full", action="store_true", help="ignore the saved state and rebuild from every row")
+    ap.add_argument("--out", type=Path, help="directory for the exported tables")
+    ap.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    ap.add_argument("--chunk-size", type=int, default=50000)
+    ap.add_argument("--top", type=int, default=3, help="weakest topics listed per domain")
+    ap.add_argument("--min-answers", type=int, default=5, help="ignore topics with fewer answers")
+    args = ap.parse_args()
+
+    meta = load_question_meta(args.bank) if args.bank.exists() else {}
+    store = SQLiteStore(args.db)
+    analytics = CohortAnalytics.load_state(store, args.state, meta)
+    report = {"refresh": analytics.refresh(args.chunk_size, full=args.full)}
+    analytics.save_state(args.state)
+    report["weakest_topics"] = analytics.weakest_topics(args.top, args.min_answers)
+    if args.out:
+        report["exported"] = analytics.export(args.out, args.format, args.min_answers)
+    store.close()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
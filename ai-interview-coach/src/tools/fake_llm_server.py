@@ -0,0 +1,121 @@
+# fake_llm_server.py
+# Local stand-in for a remote LLM grading endpoint (the HttpLLMAdapter protocol), with
+# injectable latency, slow-tail requests, throttling (429) and server errors (500).
+# Requests with "stream": true get the JSON reply written in small pieces over the latency.
+#
+#   cd src && python -m tools.fake_llm_server --port 8765 --latency 0.2 --slow-rate 0.05 --error-rate 0.1
+#   LLM_ADAPTER=http LLM_HTTP_URL=http://127.0.0.1:8765/evaluate streamlit run app.py
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict
+
+from tools.scoring_utils import mock_evaluate_answer, stable_rng
+
+
+class FakeLLMConfig:
+    def __init__(self, latency: float = 0.2, jitter: float = 0.05, slow_rate: float = 0.0,
+                 slow_latency: float = 3.0, error_rate: float = 0.0, throttle_rate: float = 0.0,
+                 seed: int = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+
+
+def _grade(item: Dict[str, Any]) -> Dict[str, Any]:
+    q, a = item.get("question", ""), item.get("answer", "")
+    return mock_evaluate_answer(q, a, stable_rng(q, a or ""))
+
+
+def make_handler(cfg: FakeLLMConfig):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _reply(self, status: int, body: Dict[str, Any]):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _stream(self, body: Dict[str, Any], duration: float, piece: int = 12):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            pieces = [data[i:i + piece] for i in range(0, len(data), piece)]
+            for p in pieces:
+                self.wfile.write(p)
+                self.wfile.flush()
+                time.sleep(duration / len(pieces))
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            with cfg.lock:
+                cfg.requests += 1
+                roll = cfg.rng.random()
+                slow = cfg.rng.random() < cfg.slow_rate
+                delay = max(0.0, cfg.latency + cfg.rng.uniform(-cfg.jitter, cfg.jitter))
+            delay = cfg.slow_latency if slow else delay
+            stream = bool(payload.get("stream"))
+            # streamed replies spend most of the latency emitting tokens, not before the first one
+            time.sleep(delay * 0.2 if stream else delay)
+            if roll < cfg.throttle_rate:
+                return self._reply(429, {"error": "rate limited"})
+            if roll < cfg.throttle_rate + cfg.error_rate:
+                return self._reply(500, {"error": "internal error"})
+            if stream:
+                return self._stream(_grade(payload), delay * 0.8)
+            if "items" in payload:
+                return self._reply(200, {"results": [_grade(it) for it in payload["items"]]})
+            return self._reply(200, _grade(payload))
+
+    return Handler
+
+
+def start_server(host: str = "127.0.0.1", port: int = 0, **config):
+    """Serve on a daemon thread; returns (server, url). port=0 picks a free port."""
+    cfg = FakeLLMConfig(**config)
+    server = ThreadingHTTPServer((host, port), make_handler(cfg))
+    server.daemon_threads = True
+    server.config = cfg
+    threading.Thread(target=server.serve_forever, name="fake-llm", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/evaluate"
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Fake LLM grading server with latency/error injection.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency", type=float, default=0.2, help="base seconds per request")
+    ap.add_argument("--jitter", type=float, default=0.05)
+    ap.add_argument("--slow-rate", type=float, default=0.0, help="fraction of requests taking --slow-latency")
+    ap.add_argument("--slow-latency", type=float, default=3.0)
+    ap.add_argument("--error-rate", type=float, default=0.0, help="fraction answered with HTTP 500")
+    ap.add_argument("--throttle-rate", type=float, default=0.0, help="fraction answered with HTTP 429")
+    args = ap.parse_args()
+    cfg = FakeLLMConfig(args.latency, args.jitter, args.slow_rate, args.slow_latency,
+                        args.error_rate, args.throttle_rate)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(cfg))
+    print(f"fake LLM listening on http://{args.host}:{args.port}/evaluate")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
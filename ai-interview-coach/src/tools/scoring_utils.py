@@ -1,85 +1,161 @@
 # scoring_utils.py
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, List, Set
+from collections import deque, Counter
+from pathlib import Path
+import json
 import random
+import hashlib
+
+# Per-domain keyword tables, one JSON file per domain:
+# {"priority": int, "fallback": bool, "detect": [question words], "categories": {name: [keywords]}}
+KEYWORDS_DIR = Path(__file__).parent / "keywords"
+
+# Above this many distinct patterns a single Aho-Corasick pass beats one
+# C-level substring scan per keyword; below it the scans are faster in CPython.
+AC_MIN_PATTERNS = 64
+
 
 def normalize_score(raw: float) -> int:
     """Convert raw 0–1 score to a 0–10 integer."""
     return max(0, min(10, int(round(raw * 10))))
 
 
-def mock_evaluate_answer(question: str, answer: str) -> Dict[str, Any]:
-    """Mock evaluator for Java / Python / DSA answers."""
-    
-    if not answer or len(answer.strip()) < 5:
-        return {
-            "score": 0,
-            "feedback": "Answer too short.",
-            "suggestions": ["Provide more detail in your explanation."]
-        }
+def stable_rng(*parts: str) -> random.Random:
+    """Random generator seeded from the given strings (same input -> same noise, across processes)."""
+    digest = hashlib.sha1("\x1f".join(parts).encode("utf-8")).digest()
+    return random.Random(int.from_bytes(digest[:8], "big"))
 
-    answer_lower = answer.lower()
 
-    # ------------------------------------------------------------
-    # DOMAIN SPECIFIC KEYWORDS (Java, Python, DSA)
-    # ------------------------------------------------------------
-    
-    KEYWORDS = {
-        "java": {
-            "OOP": ["encapsulation", "inheritance", "polymorphism", "abstraction"],
-            "collections": ["arraylist", "linkedlist", "hashmap", "set", "iterator"],
-            "memory": ["heap", "stack", "garbage collector", "gc", "jvm"],
-            "threads": ["multithreading", "synchronized", "thread", "runnable", "concurrency"],
-            "jvm": ["bytecode", "classloader", "jit", "jre"],
-        },
-
-        "python": {
-            "basics": ["indentation", "dynamic typing", "lists", "tuples", "dict", "set"],
-            "oop": ["class", "object", "inheritance", "polymorphism", "method overriding"],
-            "advanced": ["decorators", "generators", "lambda", "list comprehension"],
-            "modules": ["import", "pip", "virtualenv", "package"],
-            "memory": ["garbage collector", "reference counting"],
-        },
-
-        "dsa": {
-            "arrays": ["array", "index", "time complexity", "big o"],
-            "linkedlist": ["node", "pointer", "head", "tail", "insertion"],
-            "sorting": ["merge sort", "quick sort", "bubble sort", "insertion sort", "nlogn"],
-            "trees": ["binary tree", "bst", "traversal", "dfs", "bfs", "height"],
-            "graphs": ["dfs", "bfs", "adjacency", "shortest path", "dijkstra"],
-            "dp": ["dynamic programming", "recursion", "memoization", "tabulation"],
-        }
+class AhoCorasick:
+    """
+    Multi-pattern substring matcher compiled to a DFA (failure links folded into
+    the transition tables), so find() is one pass over the text.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns: List[str] = list(patterns)
+        goto: List[Dict[str, int]] = [{}]
+        out: List[Set[int]] = [set()]
+        for i, pat in enumerate(self.patterns):
+            state = 0
+            for ch in pat:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    goto.append({})
+                    out.append(set())
+                    nxt = goto[state][ch] = len(goto) - 1
+                state = nxt
+            out[state].add(i)
+
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [None] * len(goto)
+        delta[0] = dict(goto[0])
+        queue = deque(goto[0].values())
+        while queue:
+            r = queue.popleft()
+            # transitions of the failure state, overridden by this state's own edges
+            delta[r] = dict(delta[fail[r]])
+            delta[r].update(goto[r])
+            for ch, s in goto[r].items():
+                fail[s] = delta[fail[r]].get(ch, 0)
+                out[s] |= out[fail[s]]
+                queue.append(s)
+        self._delta = delta
+        self._out = [frozenset(o) if o else None for o in out]
+
+    def find(self, text: str) -> Set[int]:
+        """Indexes of every pattern occurring in text."""
+        delta, outs = self._delta, self._out
+        found: Set[int] = set()
+        state = 0
+        for ch in text:
+            state = delta[state].get(ch, 0)
+            o = outs[state]
+            if o is not None:
+                found |= o
+        return found
+
+
+class KeywordMatcher:
+    """
+    Compiled keyword set for one domain. Keywords listed under several
+    categories are matched once and counted with their multiplicity.
+    """
+
+    def __init__(self, keywords: Iterable[str], use_automaton: bool = None):
+        weights = Counter(kw.lower() for kw in keywords)
+        self.keywords = tuple(weights)
+        self.weights = tuple(weights[k] for k in self.keywords)
+        if use_automaton is None:
+            use_automaton = len(self.keywords) >= AC_MIN_PATTERNS
+        self.automaton = AhoCorasick(self.keywords) if use_automaton else None
+
+    def matches(self, text_lower: str) -> List[int]:
+        """Indexes (into self.keywords) of the keywords found in an already-lowercased text."""
+        if self.automaton is not None:
+            return sorted(self.automaton.find(text_lower))
+        return [i for i, kw in enumerate(self.keywords) if kw in text_lower]
+
+    def count_hits(self, text_lower: str) -> int:
+        if self.automaton is not None:
+            return sum(self.weights[i] for i in self.automaton.find(text_lower))
+        return sum(w for kw, w in zip(self.keywords, self.weights) if kw in text_lower)
+
+
+def load_keyword_tables(directory: Path = None) -> Dict[str, Dict[str, Any]]:
+    """Read every <domain>.json keyword table from directory (default: tools/keywords)."""
+    directory = Path(directory or KEYWORDS_DIR)
+    tables = {}
+    for path in sorted(directory.glob("*.json")):
+        with open(path, "r", encoding="utf-8") as f:
+            tables[path.stem] = json.load(f)
+    return tables
+
+
+def compile_keywords(tables: Dict[str, Dict[str, Any]]):
+    """Build the matchers and the domain-detection order from keyword tables."""
+    matchers = {
+        domain: KeywordMatcher(kw for words in t.get("categories", {}).values() for kw in words)
+        for domain, t in tables.items()
     }
+    detect = tuple(
+        (domain, tuple(w.lower() for w in t.get("detect", [])))
+        for domain, t in sorted(tables.items(), key=lambda kv: kv[1].get("priority", 0))
+        if t.get("detect")
+    )
+    fallback = next((d for d, t in tables.items() if t.get("fallback")), None) or next(iter(tables), None)
+    return matchers, detect, fallback
 
-    # ------------------------------------------------------------
-    # DETECT DOMAIN
-    # ------------------------------------------------------------
-    detected_domain = None
-    q_lower = question.lower()
 
-    if any(word in q_lower for word in ["java", "jvm", "oop", "jdk"]):
-        detected_domain = "java"
-    elif any(word in q_lower for word in ["python", "py", "indent", "list"]):
-        detected_domain = "python"
-    else:
-        detected_domain = "dsa"  # fallback
+def reload_keywords(directory: Path = None):
+    """Recompile the module-level keyword tables (e.g. after editing the JSON files)."""
+    global KEYWORD_TABLES, _MATCHERS, _DETECT, _FALLBACK_DOMAIN
+    tables = load_keyword_tables(directory)
+    matchers, detect, fallback = compile_keywords(tables)
+    KEYWORD_TABLES, _MATCHERS, _DETECT, _FALLBACK_DOMAIN = tables, matchers, detect, fallback
 
-    # ------------------------------------------------------------
-    # SCORE BASED ON KEYWORD MATCHES
-    # ------------------------------------------------------------
-    hit = 0
 
-    for category, words in KEYWORDS[detected_domain].items():
-        for kw in words:
-            if kw.lower() in answer_lower:
-                hit += 1
+KEYWORD_TABLES: Dict[str, Dict[str, Any]] = {}
+_MATCHERS: Dict[str, KeywordMatcher] = {}
+_DETECT = ()
+_FALLBACK_DOMAIN = None
+reload_keywords()
 
-    # Base score with randomness + hits
-    base = min(1.0, 0.4 + 0.18 * hit + random.uniform(-0.1, 0.1))
-    score = normalize_score(base)
 
-    # ------------------------------------------------------------
-    # FEEDBACK & SUGGESTIONS
-    # ------------------------------------------------------------
+def detect_domain(question: str) -> str:
+    q_lower = question.lower()
+    for domain, words in _DETECT:
+        for word in words:
+            if word in q_lower:
+                return domain
+    return _FALLBACK_DOMAIN  # fallback
+
+
+def keyword_hits(domain: str, answer_lower: str) -> int:
+    return _MATCHERS[domain].count_hits(answer_lower)
+
+
+def feedback_for(score: int, detected_domain: str) -> Dict[str, Any]:
     if score >= 7:
         feedback = f"Strong answer! You covered important {detected_domain.upper()} concepts."
         suggestions = ["Add a short example or pseudo-code to make it even better."]
@@ -93,9 +169,37 @@ def mock_evaluate_answer(question: str, answer: str) -> Dict[str, Any]:
             "Provide definitions, examples, and use cases.",
             "Explain in simple steps."
         ]
+    return {"feedback": feedback, "suggestions": suggestions}
 
-    return {
-        "score": score,
-        "feedback": feedback,
-        "suggestions": suggestions
-    }
+
+def mock_evaluate_answer(question: str, answer: str, rng: random.Random = None) -> Dict[str, Any]:
+    """Mock evaluator for Java / Python / DSA answers.
+    Pass rng (e.g. stable_rng(question, answer)) to make the score noise reproducible."""
+
+    if not answer or len(answer.strip()) < 5:
+        return {
+            "score": 0,
+            "feedback": "Answer too short.",
+            "suggestions": ["Provide more detail in your explanation."]
+        }
+
+    answer_lower = answer.lower()
+
+    # ------------------------------------------------------------
+    # DETECT DOMAIN (keyword tables are compiled once, at import)
+    # ------------------------------------------------------------
+    detected_domain = detect_domain(question)
+
+    # ------------------------------------------------------------
+    # SCORE BASED ON KEYWORD MATCHES
+    # ------------------------------------------------------------
+    hit = keyword_hits(detected_domain, answer_lower)
+
+    # Base score with randomness + hits
+    base = min(1.0, 0.4 + 0.18 * hit + (rng or random).uniform(-0.1, 0.1))
+    score = normalize_score(base)
+
+    # ------------------------------------------------------------
+    # FEEDBACK & SUGGESTIONS
+    # ------------------------------------------------------------
+    return {"score": score, **feedback_for(score, detected_domain)}
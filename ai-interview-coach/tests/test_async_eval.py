@@ -0,0 +1,96 @@
+# test_async_eval.py
+#   cd ai-interview-coach && python -m unittest discover tests
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC))
+
+from orchestrator_agent import OrchestratorAgent  # noqa: E402
+
+BANK = SRC / "tools" / "question_bank.json"
+
+
+class _SlowGrader:
+    """Stands in for EvaluatorAgent.aevaluate: records how many gradings overlap, per loop."""
+
+    def __init__(self, latency: float = 0.02):
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.in_flight = {}
+        self.peak = {}
+
+    async def __call__(self, question, answer):
+        loop = asyncio.get_running_loop()
+        with self.lock:
+            self.in_flight[loop] = self.in_flight.get(loop, 0) + 1
+            self.peak[loop] = max(self.peak.get(loop, 0), self.in_flight[loop])
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            with self.lock:
+                self.in_flight[loop] -= 1
+        return {"score": 5, "feedback": "ok", "suggestions": []}
+
+
+class EvalSemaphoreTest(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)  # the orchestrator's SQLite store goes to ./storage
+        self.orch = OrchestratorAgent(BANK, llm_adapter="mock", max_concurrent_evals=2, batch_window_ms=0)
+        self.grader = _SlowGrader()
+        self.orch.evaluator.aevaluate = self.grader
+
+    def tearDown(self):
+        self.orch.deadlines.close()
+        self.orch.memory.flush()
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    async def _round(self, n: int):
+        sids = [self.orch.start_session(f"user{i}", "java") for i in range(n)]
+        for sid in sids:
+            self.orch.ask_next(sid)
+        return await asyncio.gather(*(self.orch.asubmit_answer(sid, "an answer") for sid in sids))
+
+    def test_bound_holds_on_every_loop(self):
+        # each asyncio.run is a new loop; a semaphore bound to the first one would raise here
+        for _ in range(3):
+            results = asyncio.run(self._round(6))
+            self.assertEqual([r["score"] for r in results], [5] * 6)
+        self.assertEqual(len(self.grader.peak), 3)
+        self.assertTrue(all(peak == 2 for peak in self.grader.peak.values()), self.grader.peak)
+
+    def test_loops_in_threads_each_get_the_bound(self):
+        errors = []
+
+        def run():
+            try:
+                asyncio.run(self._round(6))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=run) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(self.grader.peak), 3)
+        self.assertTrue(all(peak <= 2 for peak in self.grader.peak.values()), self.grader.peak)
+
+    def test_closed_loops_are_dropped(self):
+        for _ in range(3):
+            asyncio.run(self._round(3))
+        # the last loop is still registered until a new one arrives; older ones are pruned
+        self.assertLessEqual(len(self.orch._eval_semaphores), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+# test_grading_cascade.py
+#   cd ai-interview-coach && python -m unittest discover tests
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from evaluator_agent import EvaluatorAgent  # noqa: E402
+from grading_cascade import (GradingCascade, RuleTier, SimilarityTier, TIMEOUT_ANSWER,  # noqa: E402
+                             cascade_from_spec)
+from llm_adapters import SimilarityLLM  # noqa: E402
+
+
+class _FixedSimilarity(SimilarityLLM):
+    """The answer text is the similarity, so a test can place it anywhere on [0, 1]."""
+
+    def similarity(self, question_text, user_answer, correct_answer, question_id=None):
+        return float(user_answer)
+
+
+class SimilarityConfidenceTest(unittest.TestCase):
+    def setUp(self):
+        self.tier = SimilarityTier(_FixedSimilarity(low=0.2, high=0.6))
+
+    def confidence(self, sim: float):
+        verdict = self.tier.grade("q", str(sim), "ref")
+        return None if verdict is None else verdict[1]
+
+    def test_abstains_inside_the_band(self):
+        for sim in (0.21, 0.4, 0.59):
+            self.assertIsNone(self.confidence(sim))
+
+    def test_zero_at_the_band_edges_one_at_the_extremes(self):
+        self.assertAlmostEqual(self.confidence(0.2), 0.0)
+        self.assertAlmostEqual(self.confidence(0.6), 0.0)
+        self.assertAlmostEqual(self.confidence(0.0), 1.0)
+        self.assertAlmostEqual(self.confidence(1.0), 1.0)
+        self.assertAlmostEqual(self.confidence(0.1), 0.5)
+        self.assertAlmostEqual(self.confidence(0.8), 0.5)
+
+
+class CascadeGatingTest(unittest.TestCase):
+    def test_threshold_gates_the_similarity_tier(self):
+        cascade = GradingCascade([(SimilarityTier(_FixedSimilarity(low=0.2, high=0.6)), 0.5)])
+        settled = {sim: cascade.grade("q", str(sim), "ref") is not None
+                   for sim in (0.05, 0.15, 0.4, 0.65, 0.9)}
+        self.assertEqual(settled, {0.05: True, 0.15: False, 0.4: False, 0.65: False, 0.9: True})
+        stats = cascade.stats()
+        self.assertEqual(stats["total"], 5)
+        self.assertEqual(stats["tiers"]["similarity"], {"hits": 2, "hit_rate": 0.4})
+        self.assertEqual(stats["fallthrough"], {"count": 3, "rate": 0.6})
+
+    def test_lower_threshold_settles_more(self):
+        strict = GradingCascade([(SimilarityTier(_FixedSimilarity(low=0.2, high=0.6)), 0.9)])
+        loose = GradingCascade([(SimilarityTier(_FixedSimilarity(low=0.2, high=0.6)), 0.1)])
+        answers = [str(s / 20) for s in range(21)]
+        hits = lambda c: sum(c.grade("q", a, "ref") is not None for a in answers)
+        self.assertLess(hits(strict), hits(loose))
+
+    def test_rules_settle_timeouts_short_and_verbatim_answers(self):
+        rules = RuleTier()
+        self.assertEqual(rules.grade("q", TIMEOUT_ANSWER, "ref")[0]["score"], 0)
+        self.assertEqual(rules.grade("q", "no", "ref")[0]["score"], 0)
+        reference = "A thread is the smallest unit of execution scheduled by the OS."
+        result, confidence = rules.grade("q", reference, reference)
+        self.assertEqual(result["score"], 10)
+        self.assertGreaterEqual(confidence, 0.9)
+        self.assertIsNone(rules.grade("q", "something else entirely, at length", reference))
+
+    def test_spec_parsing(self):
+        self.assertIsNone(cascade_from_spec("off"))
+        cascade = cascade_from_spec("rules,similarity:0.7")
+        self.assertEqual(cascade.names, ["rules", "similarity"])
+        self.assertEqual([t for _, t in cascade.tiers], [0.9, 0.7])
+        self.assertEqual(cascade_from_spec("rules,similarity", skip=("similarity",)).names, ["rules"])
+        with self.assertRaises(ValueError):
+            cascade_from_spec("rules,oracle")
+
+
+class EvaluatorCascadeTest(unittest.TestCase):
+    def test_settled_answers_never_reach_the_adapter(self):
+        evaluator = EvaluatorAgent("mock", cache=None, cascade=cascade_from_spec("rules"))
+
+        def adapter_called(*args, **kwargs):
+            raise AssertionError("adapter called for an answer the rules settle")
+
+        evaluator.llm.evaluate = adapter_called
+        question = {"id": "j1", "q": "What is a thread?", "answer": "The smallest unit of execution."}
+        self.assertEqual(evaluator.evaluate(question, TIMEOUT_ANSWER)["score"], 0)
+        self.assertEqual(evaluator.evaluate(question, "The smallest unit of execution.")["score"], 10)
+        self.assertEqual(evaluator.cascade.stats()["tiers"]["rules"]["hits"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
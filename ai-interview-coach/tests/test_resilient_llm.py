@@ -0,0 +1,114 @@
+# test_resilient_llm.py
+#   cd ai-interview-coach && python -m unittest discover tests
+import sys
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from llm_adapters import HttpLLMAdapter, MockLLM  # noqa: E402
+from resilient_llm import CircuitBreaker, ResilientLLM, TokenBucket  # noqa: E402
+from tools.fake_llm_server import start_server  # noqa: E402
+
+ARGS = ("What is OOP in Java?", "objects, classes and inheritance", "")
+
+
+class ResilientAgainstFakeServerTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server, cls.url = start_server(latency=0.01, jitter=0.0, seed=1)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        cfg = self.server.config
+        cfg.latency, cfg.error_rate, cfg.throttle_rate, cfg.slow_rate = 0.01, 0.0, 0.0, 0.0
+
+    def client(self, **kwargs) -> ResilientLLM:
+        kwargs.setdefault("backoff_base", 0.001)
+        return ResilientLLM(HttpLLMAdapter(self.url, timeout=5), fallback=MockLLM(), **kwargs)
+
+    def test_healthy_backend_answers_directly(self):
+        llm = self.client()
+        result = llm.evaluate(*ARGS)
+        self.assertIn("score", result)
+        self.assertFalse(result.get("fallback", False))
+        self.assertEqual((llm.stats()["attempts"], llm.stats()["fallbacks"]), (1, 0))
+
+    def test_errors_are_retried_then_fall_back(self):
+        self.server.config.error_rate = 1.0
+        llm = self.client(max_retries=2, breaker=CircuitBreaker(failure_threshold=10))
+        result = llm.evaluate(*ARGS)
+        self.assertTrue(result["fallback"])
+        stats = llm.stats()
+        self.assertEqual((stats["attempts"], stats["retries"], stats["errors"]), (3, 2, 3))
+
+    def test_open_breaker_fails_fast_without_calling_the_backend(self):
+        self.server.config.error_rate = 1.0
+        llm = self.client(max_retries=2, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+        llm.evaluate(*ARGS)
+        self.assertEqual(llm.breaker.state, "open")
+        # the breaker opened on the second failure, so the third attempt was already refused
+        self.assertEqual((llm.stats()["attempts"], llm.stats()["short_circuited"]), (2, 1))
+        before = self.server.config.requests
+        start = time.monotonic()
+        self.assertTrue(llm.evaluate(*ARGS)["fallback"])
+        self.assertLess(time.monotonic() - start, 0.1)
+        self.assertEqual(self.server.config.requests, before)
+        self.assertEqual(llm.stats()["short_circuited"], 2)
+
+    def test_deadline_bounds_a_slow_call(self):
+        self.server.config.latency = 1.0
+        llm = self.client(timeout=0.1, max_retries=0)
+        start = time.monotonic()
+        self.assertTrue(llm.evaluate(*ARGS)["fallback"])
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual(llm.stats()["timeouts"], 1)
+
+
+class _StreamingInner:
+    name = "fake-stream"
+
+    def evaluate(self, *args):
+        return {"score": 7, "feedback": "fine", "suggestions": []}
+
+    def evaluate_stream_raw(self, *args):
+        yield {"type": "score", "score": 7}
+        yield {"type": "feedback", "text": "fine"}
+        yield {"type": "result", "result": self.evaluate(*args)}
+
+
+class HalfOpenStreamTest(unittest.TestCase):
+    def setUp(self):
+        self.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+        self.breaker.record_failure()  # open; the next allow() is the half-open trial
+        self.llm = ResilientLLM(_StreamingInner(), fallback=MockLLM(), breaker=self.breaker)
+
+    def test_abandoned_stream_releases_the_trial(self):
+        stream = self.llm.evaluate_stream(*ARGS)
+        next(stream)
+        stream.close()
+        self.assertEqual(self.breaker.state, "half_open")
+        self.assertTrue(self.breaker.allow())
+
+    def test_completed_stream_closes_the_breaker(self):
+        events = list(self.llm.evaluate_stream(*ARGS))
+        self.assertEqual(events[-1]["type"], "result")
+        self.assertEqual(self.breaker.state, "closed")
+
+
+class TokenBucketTest(unittest.TestCase):
+    def test_burst_then_wait_bounded_by_timeout(self):
+        bucket = TokenBucket(rate=10, burst=2)
+        self.assertTrue(bucket.acquire(0))
+        self.assertTrue(bucket.acquire(0))
+        self.assertFalse(bucket.acquire(0.01))
+        self.assertTrue(bucket.acquire(0.5))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+# test_session_backend.py
+#   cd ai-interview-coach && python -m unittest discover tests
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC))
+
+from api_server import APIServer  # noqa: E402
+from orchestrator_agent import OrchestratorAgent  # noqa: E402
+from session_backend import SessionConflict, SQLiteSessionBackend  # noqa: E402
+
+BANK = SRC / "tools" / "question_bank.json"
+
+
+class _ContendedBackend(SQLiteSessionBackend):
+    """Before each of the next `contended` saves another worker writes the record first."""
+
+    contended = 0
+
+    def save(self, session_id, record, expected_version):
+        if self.contended and expected_version:
+            self.contended -= 1
+            current, version = self.load(session_id)
+            current.setdefault("other_writes", 0)
+            current["other_writes"] += 1
+            super().save(session_id, current, version)
+        return super().save(session_id, record, expected_version)
+
+
+class _Case(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+        self.backend = _ContendedBackend(Path(self.tmp.name) / "state.db")
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+
+class SQLiteCompareAndSetTest(_Case):
+    def test_versions_and_conflicts(self):
+        self.assertEqual(self.backend.save("s1", {"n": 1}, 0), 1)
+        with self.assertRaises(SessionConflict):
+            self.backend.save("s1", {"n": 1}, 0)  # already created
+        self.assertEqual(self.backend.load("s1"), ({"n": 1}, 1))
+        self.assertEqual(self.backend.save("s1", {"n": 2}, 1), 2)
+        with self.assertRaises(SessionConflict):
+            self.backend.save("s1", {"n": 3}, 1)  # stale version
+        self.assertEqual(self.backend.load("s1"), ({"n": 2}, 2))
+        self.assertEqual(self.backend.stats()["conflicts"], 2)
+
+
+class OrchestratorRetryTest(_Case):
+    def setUp(self):
+        super().setUp()
+        self.orch = OrchestratorAgent(BANK, llm_adapter="mock", session_backend=self.backend)
+        self.orch.cas_retries = 3
+        self.sid = self.orch.start_session("ann", "java")
+        self.orch.ask_next(self.sid)
+
+    def tearDown(self):
+        self.orch.deadlines.close()
+        self.orch.memory.flush()
+        super().tearDown()
+
+    def test_lost_race_is_retried_on_the_newer_copy(self):
+        self.backend.contended = 2
+        self.orch.submit_answer(self.sid, "Threads share the heap of the JVM process.")
+        record, _ = self.backend.load(self.sid)
+        # the other writer's changes survive and the answer is recorded exactly once
+        self.assertEqual(record["other_writes"], 2)
+        self.assertEqual(len(record["history"]), 1)
+        self.assertEqual(len(record["orchestrator"]["scores"]), 1)
+        self.assertEqual(record["orchestrator"]["skills"]["java"][1], 1)
+
+    def test_exhausted_retries_raise(self):
+        self.backend.contended = 100
+        with self.assertRaises(SessionConflict):
+            self.orch.submit_answer(self.sid, "Threads share the heap of the JVM process.")
+
+    def test_api_answers_409_when_retries_run_out(self):
+        app = APIServer(self.orch)
+        self.backend.contended = 100
+        status, body = asyncio.run(_call(app, "POST", f"/sessions/{self.sid}/next"))
+        self.assertEqual(status, 409)
+        self.assertIn("kept changing", body["error"])
+        self.backend.contended = 0
+        status, body = asyncio.run(_call(app, "POST", f"/sessions/{self.sid}/next"))
+        self.assertEqual(status, 200)
+        self.assertEqual(set(body), {"id", "q", "difficulty", "time_remaining"})
+
+
+async def _call(app, method: str, path: str, body: dict = None):
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": json.dumps(body or {}).encode(), "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    await app({"type": "http", "method": method, "path": path}, receive, send)
+    return sent[0]["status"], json.loads(sent[1]["body"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+# test_skill_model.py
+#   cd ai-interview-coach && python -m unittest discover tests
+import random
+import sys
+import unittest
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from interviewer_agent import QuestionIndex, QuestionSampler  # noqa: E402
+from skill_model import INITIAL_RATING, RatingIndex, SkillTracker  # noqa: E402
+
+
+def _bank(per_bucket: int) -> dict:
+    # no "rating" fields: every question of a bucket ties at the difficulty default
+    return {"python": {level: [{"id": f"{level}{i}", "q": "?", "answer": ""} for i in range(per_bucket)]
+                       for level in ("easy", "medium", "hard")}}
+
+
+class RatingIndexTiesTest(unittest.TestCase):
+    def setUp(self):
+        self.index = QuestionIndex(_bank(200))
+        self.ratings = RatingIndex(self.index)
+
+    def test_fresh_sessions_spread_over_tied_bucket(self):
+        rng = random.Random(0)
+        picks = Counter()
+        for _ in range(2000):
+            sampler = QuestionSampler(self.index, random.Random(rng.random()), self.ratings)
+            q, difficulty = sampler.draw_near("python", 1300.0)
+            self.assertEqual(difficulty, "medium")
+            picks[q["id"]] += 1
+        # uniform over 200 questions: ~10 picks each
+        self.assertGreater(len(picks), 180)
+        self.assertLess(max(picks.values()), 40)
+
+    def test_one_session_exhausts_nearest_run_first(self):
+        sampler = QuestionSampler(self.index, random.Random(1), self.ratings)
+        drawn = [sampler.draw_near("python", 1300.0) for _ in range(300)]
+        ids = [q["id"] for q, _ in drawn]
+        self.assertEqual(len(set(ids)), len(ids))
+        # neighbouring runs join the pool only once fewer than `candidates` medium ones are left
+        self.assertTrue(all(d == "medium" for _, d in drawn[:198]))
+        self.assertGreaterEqual(sum(d == "medium" for _, d in drawn), 198)
+
+    def test_distinct_ratings_pick_among_closest(self):
+        bank = {"dsa": {"medium": [{"id": f"q{i}", "q": "?", "answer": "", "rating": 1000 + 10 * i}
+                                   for i in range(100)]}}
+        index = QuestionIndex(bank)
+        ratings = RatingIndex(index)
+        picks = Counter(ratings.nearest("dsa", 1500.0, rng=random.Random(i))[0]["id"] for i in range(300))
+        self.assertEqual(set(picks), {"q49", "q50", "q51"})
+
+
+class SkillTrackerCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.store = {}
+        self.tracker = SkillTracker(loader=lambda u, t: self.store.get((u, t)),
+                                    saver=lambda u, t, r, n: self.store.__setitem__((u, t), (r, n)),
+                                    max_entries=2, ttl=60)
+
+    def test_cache_is_bounded(self):
+        for user in ("a", "b", "c"):
+            self.tracker.update(user, "java", 1300.0, 10)
+        self.assertEqual(self.tracker.stats()["cached"], 2)
+        # evicted estimates come back from the store
+        self.assertEqual(self.tracker.get("a", "java").n, 1)
+
+    def test_expired_and_fresh_reads_see_other_writers(self):
+        self.tracker.update("a", "java", 1300.0, 10)
+        self.store[("a", "java")] = (1500.0, 7)  # written by another worker
+        self.assertEqual(self.tracker.get("a", "java").n, 1)
+        self.assertEqual(self.tracker.get("a", "java", fresh=True).n, 7)
+        self.tracker.ttl = 0
+        self.store[("a", "java")] = (1600.0, 8)
+        self.assertEqual(self.tracker.get("a", "java").rating, 1600.0)
+
+    def test_step_leaves_estimate_unchanged(self):
+        est = self.tracker.get("new", "java")
+        moved = self.tracker.step(est, 1300.0, 10)
+        self.assertEqual((est.rating, est.n), (INITIAL_RATING, 0))
+        self.assertGreater(moved.rating, INITIAL_RATING)
+        self.assertEqual(moved.n, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()